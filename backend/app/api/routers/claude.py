@@ -0,0 +1,294 @@
+"""
+Claude integration API routes (background enhancement jobs).
+"""
+import json
+import time
+from typing import Any, AsyncIterator, Dict
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionRunner, get_read_runner, get_runner
+from app.db.models import ClaudeJob
+from app.db.repositories.claude_repository import JOB_COMPLETED
+from app.services.claude_job_service import ClaudeJobService, batch_progress
+from app.services.enhancement_cache import EnhancementCacheService
+from app.services.job_queue import claude_job_queue
+from app.models.claude_job import (
+    ClaudeRewriteRequest,
+    ClaudeBatchRequest,
+    ClaudeBatchProgressResponse,
+    ClaudeJobResponse,
+    ClaudeJobResultResponse,
+    EnhancementCacheStatsResponse,
+    EnhancementCacheClearResponse
+)
+from app.models.prompt import PromptResponse
+
+router = APIRouter(prefix="/api/claude", tags=["claude"])
+
+
+def _job_data(job: ClaudeJob) -> Dict[str, Any]:
+    """Build the status response fields for a job."""
+    return {
+        "job_id": job.id,
+        "prompt_id": job.prompt_id,
+        "status": job.status,
+        "error_message": job.error_message,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at
+    }
+
+
+@router.post("/rewrite", response_model=ClaudeJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_rewrite(request: ClaudeRewriteRequest, db: SessionRunner = Depends(get_read_runner)):
+    """
+    Submit a prompt for enhancement; the Claude CLI runs in the background.
+
+    Args:
+        request: Prompt ID with optional content, custom instruction and cache bypass
+        db: Database session runner
+
+    Returns:
+        The queued job (poll GET /api/claude/status/{job_id} or follow
+        GET /api/claude/stream/{job_id}); already completed if the result
+        was cached
+    """
+    job_id = await claude_job_queue.submit(
+        request.prompt_id,
+        content=request.content,
+        instruction=request.custom_instruction,
+        bypass_cache=request.bypass_cache
+    )
+
+    def load(session: Session) -> Dict[str, Any]:
+        return _job_data(ClaudeJobService(session).get_job(job_id))
+
+    return await db.run(load)
+
+
+@router.get("/status/{job_id}", response_model=ClaudeJobResponse)
+async def get_job_status(job_id: str, db: SessionRunner = Depends(get_read_runner)):
+    """
+    Get the status of a job.
+
+    Args:
+        job_id: Job ID
+        db: Database session runner
+
+    Returns:
+        Job status (pending, processing, completed or failed)
+    """
+    def load(session: Session) -> Dict[str, Any]:
+        return _job_data(ClaudeJobService(session).get_job(job_id))
+
+    return await db.run(load)
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _outcome_event(job: ClaudeJob) -> str:
+    """Build the final "done" or "error" event of a finished job."""
+    if job.status == JOB_COMPLETED:
+        return _sse_event("done", {
+            "job_id": job.id,
+            "original": job.original_content,
+            "enhanced": job.enhanced_content
+        })
+    return _sse_event("error", {
+        "job_id": job.id,
+        "code": "CLAUDE_CLI_ERROR",
+        "message": job.error_message or f"Job is {job.status}"
+    })
+
+
+@router.get("/stream/{job_id}")
+async def stream_job(job_id: str, db: SessionRunner = Depends(get_read_runner)):
+    """
+    Follow the output of a job as Server-Sent Events.
+
+    Events: "status" ({"job_id", "status"}) at once, then "chunk"
+    ({"text"}) for the CLI output produced so far and each piece after it,
+    then "done" ({"job_id", "original", "enhanced"}) or "error" ({"job_id",
+    "code", "message"}). The first chunk also carries "ttfb_ms", the time
+    from the request to the first output, which is logged as well. A job
+    that has already finished (or was served from the cache) gets its
+    final event right after the status. Disconnecting does not stop the job.
+
+    Args:
+        job_id: Job ID (from POST /api/claude/rewrite)
+        db: Database session runner
+
+    Returns:
+        text/event-stream response
+
+    Raises:
+        ClaudeJobNotFoundException: If job not found
+    """
+    started = time.perf_counter()
+
+    def load(session: Session) -> ClaudeJob:
+        return ClaudeJobService(session).get_job(job_id)
+
+    # Subscribe before loading so output produced in between is not missed
+    listener = claude_job_queue.subscribe(job_id)
+    try:
+        job = await db.run(load)
+    except Exception:
+        if listener is not None:
+            claude_job_queue.unsubscribe(job_id, listener)
+        raise
+
+    async def events() -> AsyncIterator[str]:
+        # Sent before waiting on the job, so headers go out at once
+        yield _sse_event("status", {"job_id": job_id, "status": job.status})
+        if listener is None:
+            yield _outcome_event(job)
+            return
+        try:
+            chunk = await listener.get()
+            if chunk is not None:
+                ttfb_ms = round((time.perf_counter() - started) * 1000, 1)
+                print(f"[STREAM] Job {job_id}: first output after {ttfb_ms} ms")
+                yield _sse_event("chunk", {"text": chunk, "ttfb_ms": ttfb_ms})
+                chunk = await listener.get()
+            while chunk is not None:
+                yield _sse_event("chunk", {"text": chunk})
+                chunk = await listener.get()
+        finally:
+            claude_job_queue.unsubscribe(job_id, listener)
+        yield _outcome_event(await db.run(load))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/result/{job_id}", response_model=ClaudeJobResultResponse)
+async def get_job_result(job_id: str, db: SessionRunner = Depends(get_read_runner)):
+    """
+    Get the enhanced content of a completed job.
+
+    Args:
+        job_id: Job ID
+        db: Database session runner
+
+    Returns:
+        Original and enhanced content
+
+    Raises:
+        ClaudeJobPendingException: If the job has not finished yet
+        ClaudeCLIException: If the job failed
+    """
+    def load(session: Session) -> Dict[str, Any]:
+        job = ClaudeJobService(session).get_completed_job(job_id)
+        data = _job_data(job)
+        data["original_content"] = job.original_content
+        data["enhanced_content"] = job.enhanced_content
+        return data
+
+    return await db.run(load)
+
+
+@router.post("/accept/{job_id}", response_model=PromptResponse)
+async def accept_job(job_id: str, db: SessionRunner = Depends(get_runner)):
+    """
+    Apply a completed job's enhanced content to its prompt (creates a new version).
+
+    Args:
+        job_id: Job ID
+        db: Database session runner
+
+    Returns:
+        Updated prompt
+    """
+    def accept(session: Session) -> PromptResponse:
+        return PromptResponse.model_validate(ClaudeJobService(session).accept_job(job_id))
+
+    return await db.run(accept)
+
+
+@router.post("/batch", response_model=ClaudeBatchProgressResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_batch(request: ClaudeBatchRequest, db: SessionRunner = Depends(get_read_runner)):
+    """
+    Enhance every prompt in a folder and its subfolders.
+
+    One job per prompt runs on the background workers; each result is
+    applied to its prompt as a new version when its job completes.
+
+    Args:
+        request: Folder ID with optional custom instruction and cache bypass
+        db: Database session runner
+
+    Returns:
+        Initial progress of the batch (poll GET /api/claude/batch/{batch_id})
+    """
+    batch_id, job_count = await claude_job_queue.submit_batch(
+        request.folder_id,
+        instruction=request.custom_instruction,
+        bypass_cache=request.bypass_cache
+    )
+    if job_count == 0:
+        return batch_progress(batch_id, {})
+
+    def load(session: Session) -> Dict[str, Any]:
+        return ClaudeJobService(session).get_batch_progress(batch_id)
+
+    return await db.run(load)
+
+
+@router.get("/batch/{batch_id}", response_model=ClaudeBatchProgressResponse)
+async def get_batch_progress(batch_id: str, db: SessionRunner = Depends(get_read_runner)):
+    """
+    Get the aggregate progress of a bulk enhancement.
+
+    Args:
+        batch_id: Batch ID
+        db: Database session runner
+
+    Returns:
+        Job counts per status, applied/skipped counts and overall progress
+    """
+    def load(session: Session) -> Dict[str, Any]:
+        return ClaudeJobService(session).get_batch_progress(batch_id)
+
+    return await db.run(load)
+
+
+@router.get("/cache/stats", response_model=EnhancementCacheStatsResponse)
+async def get_cache_stats(db: SessionRunner = Depends(get_read_runner)):
+    """
+    Get enhancement cache size and hit/miss/bypass counters.
+
+    Args:
+        db: Database session runner
+
+    Returns:
+        Cache statistics (counters since this process started)
+    """
+    def load(session: Session) -> Dict[str, Any]:
+        return EnhancementCacheService(session).get_stats()
+
+    return await db.run(load)
+
+
+@router.delete("/cache", response_model=EnhancementCacheClearResponse)
+async def clear_cache(db: SessionRunner = Depends(get_runner)):
+    """
+    Delete every cached enhancement result.
+
+    Args:
+        db: Database session runner
+
+    Returns:
+        Number of entries deleted
+    """
+    def clear(session: Session) -> Dict[str, Any]:
+        return {"deleted": EnhancementCacheService(session).clear()}
+
+    return await db.run(clear)
@@ -1,78 +1,105 @@
 """
 Folder API routes.
 """
-from fastapi import APIRouter, Depends, status
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.database import SessionRunner, get_read_runner, get_runner
 from app.services.folder_service import FolderService
+from app.services.folder_tree_cache import CachedFolderTree
 from app.models.folder import (
     FolderCreate,
     FolderUpdate,
     FolderMove,
     FolderReorder,
     FolderResponse,
+    FolderStatsTreeResponse,
     FolderTreeResponse
 )
 
 router = APIRouter(prefix="/api/folders", tags=["folders"])
 
 
-@router.get("", response_model=FolderTreeResponse)
-def get_folder_tree(db: Session = Depends(get_db)):
+def _tree_response(tree: CachedFolderTree, if_none_match: Optional[str] = None) -> Response:
+    """Send a cached folder tree, or 304 if the client already has this version."""
+    headers = {"ETag": tree.etag, "Cache-Control": "no-cache"}
+    if if_none_match and tree.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=tree.body, media_type="application/json", headers=headers)
+
+
+@router.get("", response_model=Union[FolderTreeResponse, FolderStatsTreeResponse])
+async def get_folder_tree(
+    include_counts: bool = Query(False, description="Add prompt_count and subtree_prompt_count to every folder"),
+    if_none_match: Optional[str] = Header(None),
+    db: SessionRunner = Depends(get_read_runner)
+):
     """
     Get complete folder tree.
 
+    The serialized tree is cached until the next folder change and carries
+    an ETag; a matching If-None-Match header gets 304 Not Modified.
+
+    Args:
+        include_counts: Include per-folder and subtree prompt counts
+        if_none_match: ETag from a previous response
+        db: Database session runner
+
     Returns:
         Folder tree with nested structure
     """
-    service = FolderService(db)
-    folders = service.get_folder_tree()
-    return {"folders": folders}
+    def load(session: Session) -> CachedFolderTree:
+        return FolderService(session).get_folder_tree_json(include_counts)
+
+    return _tree_response(await db.run(load), if_none_match)
 
 
 @router.get("/{folder_id}", response_model=FolderResponse)
-def get_folder(folder_id: int, db: Session = Depends(get_db)):
+async def get_folder(folder_id: int, db: SessionRunner = Depends(get_read_runner)):
     """
     Get a single folder by ID.
 
     Args:
         folder_id: Folder ID
-        db: Database session
+        db: Database session runner
 
     Returns:
         Folder details
     """
-    service = FolderService(db)
-    folder = service.get_folder_by_id(folder_id)
-    return folder
+    def load(session: Session) -> FolderResponse:
+        return FolderResponse.model_validate(FolderService(session).get_folder_by_id(folder_id))
+
+    return await db.run(load)
 
 
 @router.post("", response_model=FolderResponse, status_code=status.HTTP_201_CREATED)
-def create_folder(folder_data: FolderCreate, db: Session = Depends(get_db)):
+async def create_folder(folder_data: FolderCreate, db: SessionRunner = Depends(get_runner)):
     """
     Create a new folder.
 
     Args:
         folder_data: Folder creation data
-        db: Database session
+        db: Database session runner
 
     Returns:
         Created folder
     """
-    service = FolderService(db)
-    folder = service.create_folder(
-        name=folder_data.name,
-        parent_id=folder_data.parent_id
-    )
-    return folder
+    def create(session: Session) -> FolderResponse:
+        folder = FolderService(session).create_folder(
+            name=folder_data.name,
+            parent_id=folder_data.parent_id
+        )
+        return FolderResponse.model_validate(folder)
+
+    return await db.run(create)
 
 
 @router.put("/{folder_id}", response_model=FolderResponse)
-def update_folder(
+async def update_folder(
     folder_id: int,
     folder_data: FolderUpdate,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Update a folder's name.
@@ -80,34 +107,38 @@ def update_folder(
     Args:
         folder_id: Folder ID
         folder_data: Folder update data
-        db: Database session
+        db: Database session runner
 
     Returns:
         Updated folder
     """
-    service = FolderService(db)
-    folder = service.update_folder(folder_id, folder_data.name)
-    return folder
+    def update(session: Session) -> FolderResponse:
+        folder = FolderService(session).update_folder(folder_id, folder_data.name)
+        return FolderResponse.model_validate(folder)
+
+    return await db.run(update)
 
 
 @router.delete("/{folder_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_folder(folder_id: int, db: Session = Depends(get_db)):
+async def delete_folder(folder_id: int, db: SessionRunner = Depends(get_runner)):
     """
     Delete a folder (cascades to children and prompts).
 
     Args:
         folder_id: Folder ID
-        db: Database session
+        db: Database session runner
     """
-    service = FolderService(db)
-    service.delete_folder(folder_id)
+    def delete(session: Session) -> None:
+        FolderService(session).delete_folder(folder_id)
+
+    await db.run(delete)
 
 
 @router.post("/{folder_id}/move", response_model=FolderResponse)
-def move_folder(
+async def move_folder(
     folder_id: int,
     move_data: FolderMove,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Move a folder to a new parent.
@@ -115,20 +146,22 @@ def move_folder(
     Args:
         folder_id: Folder ID to move
         move_data: Move operation data
-        db: Database session
+        db: Database session runner
 
     Returns:
         Updated folder
     """
-    service = FolderService(db)
-    folder = service.move_folder(folder_id, move_data.new_parent_id)
-    return folder
+    def move(session: Session) -> FolderResponse:
+        folder = FolderService(session).move_folder(folder_id, move_data.new_parent_id)
+        return FolderResponse.model_validate(folder)
+
+    return await db.run(move)
 
 
 @router.post("/reorder", response_model=FolderTreeResponse)
-def reorder_folders(
+async def reorder_folders(
     reorder_data: FolderReorder,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Reorder a folder within its parent.
@@ -138,7 +171,7 @@ def reorder_folders(
 
     Args:
         reorder_data: Reorder operation data (folder_id, new_position, parent_id)
-        db: Database session
+        db: Database session runner
 
     Returns:
         Complete folder tree with updated display_order
@@ -147,15 +180,17 @@ def reorder_folders(
         404: If folder or parent not found
         400: If folder is not in the specified parent
     """
-    service = FolderService(db)
-
-    # Perform reordering
-    service.reorder_folders(
-        folder_id=reorder_data.folder_id,
-        new_position=reorder_data.new_position,
-        parent_id=reorder_data.parent_id
-    )
-
-    # Return complete folder tree
-    folders = service.get_folder_tree()
-    return {"folders": folders}
+    def reorder(session: Session) -> CachedFolderTree:
+        service = FolderService(session)
+
+        # Perform reordering
+        service.reorder_folders(
+            folder_id=reorder_data.folder_id,
+            new_position=reorder_data.new_position,
+            parent_id=reorder_data.parent_id
+        )
+
+        # Return complete folder tree (also primes the cache for the next GET)
+        return service.get_folder_tree_json()
+
+    return _tree_response(await db.run(reorder))
@@ -1,13 +1,18 @@
 """
 Prompt API routes.
 """
-from typing import Optional, List
-from fastapi import APIRouter, Depends, Query, status
+import asyncio
+from typing import Any, Dict, Optional, List, Union
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
-from app.services.prompt_service import PromptService
-from app.services.claude_service import ClaudeService
+from app.core.config import settings
+from app.db.database import SessionRunner, get_read_runner, get_runner
+from app.db.models import ClaudeJob, Prompt
+from app.db.repositories.claude_repository import JOB_COMPLETED, JOB_PENDING, JOB_PROCESSING
+from app.services.claude_job_service import ClaudeJobService
+from app.services.job_queue import claude_job_queue
+from app.services.prompt_service import PromptService, rebalance_folder_order
 from app.models.prompt import (
     PromptCreate,
     PromptUpdate,
@@ -16,62 +21,77 @@ from app.models.prompt import (
     PromptReorder,
     EasyAccessReorder,
     PromptResponse,
-    PromptListResponse
+    PromptListResponse,
+    PromptSummaryListResponse,
+    PromptSearchResponse,
+    TagCountResponse,
+    SearchFacetsResponse
 )
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/prompts", tags=["prompts"])
 
+# view=summary omits content/original_content from list responses
+VIEW_PATTERN = "^(full|summary)$"
 
-def generate_snippet(content: str, query: str, max_length: int = 150) -> str:
-    """
-    Generate context snippet around matched query text.
-
-    Args:
-        content: Full content text
-        query: Search query to find
-        max_length: Maximum snippet length
 
-    Returns:
-        Context snippet with query match
-    """
-    if not content or not query:
-        return content[:max_length] + ("..." if len(content) > max_length else "")
+def _summary_data(prompt: Prompt) -> Dict[str, Any]:
+    """Build the summary response fields for a prompt (no content columns)."""
+    return {
+        "id": prompt.id,
+        "folder_id": prompt.folder_id,
+        "title": prompt.title,
+        "description": prompt.description,
+        "tags": prompt.tag_list,
+        "is_ai_enhanced": prompt.is_ai_enhanced,
+        "is_easy_access": prompt.is_easy_access,
+        "created_at": prompt.created_at,
+        "updated_at": prompt.updated_at
+    }
 
-    query_lower = query.lower()
-    content_lower = content.lower()
 
-    # Find first match
-    pos = content_lower.find(query_lower)
-    if pos == -1:
-        # No match found, return start of content
-        return content[:max_length] + ("..." if len(content) > max_length else "")
+def _prompt_data(prompt: Prompt, versions: Optional[list] = None) -> Dict[str, Any]:
+    """Build the full response fields for a prompt."""
+    data = _summary_data(prompt)
+    data["content"] = prompt.content
+    data["original_content"] = prompt.original_content
+    data["versions"] = [_version_data(version) for version in versions or []]
+    return data
 
-    # Extract context around match (50 chars before, 100 chars after query)
-    start = max(0, pos - 50)
-    end = min(len(content), pos + len(query) + 100)
 
-    snippet = content[start:end]
+def _version_data(version) -> Dict[str, Any]:
+    """Build the response fields for a version."""
+    return {
+        "id": version.id,
+        "version_number": version.version_number,
+        "content": version.content,
+        "created_by": version.created_by,
+        "created_at": version.created_at
+    }
 
-    # Add ellipsis if truncated
-    if start > 0:
-        snippet = "..." + snippet
-    if end < len(content):
-        snippet = snippet + "..."
 
-    return snippet
+def _list_data(prompts: List[Prompt], view: str) -> List[Dict[str, Any]]:
+    """Serialize a list of prompts for the requested view."""
+    if view == "summary":
+        return [_summary_data(prompt) for prompt in prompts]
+    # Don't load versions in list view for performance
+    return [_prompt_data(prompt) for prompt in prompts]
 
 
-@router.get("/search", response_model=PromptListResponse)
-def search_prompts(
+@router.get("/search", response_model=PromptSearchResponse)
+async def search_prompts(
     q: str = Query(..., min_length=1, description="Search query"),
     folder_id: Optional[int] = Query(None, description="Filter by folder"),
     tags: Optional[List[str]] = Query(None, description="Filter by tags"),
+    tag_mode: str = Query("all", pattern="^(all|any)$", description="Match all tags (AND) or any (OR)"),
     created_after: Optional[str] = Query(None, description="Filter by created date (ISO: YYYY-MM-DD)"),
     created_before: Optional[str] = Query(None, description="Filter by created date (ISO: YYYY-MM-DD)"),
     limit: int = Query(50, ge=1, le=10000),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    sort: str = Query("relevance", pattern="^(relevance|updated)$", description="Result order"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (sort=updated)"),
+    include_total: bool = Query(True, description="Count all matches"),
+    db: SessionRunner = Depends(get_read_runner)
 ):
     """
     Search prompts by query string with advanced filters.
@@ -79,102 +99,160 @@ def search_prompts(
     Args:
         q: Search query (searches title, description, content, tags)
         folder_id: Optional folder filter
-        tags: Optional tag filters
+        tags: Optional tag filters (exact, case-insensitive)
+        tag_mode: "all" requires every tag, "any" requires at least one
         created_after: Optional date filter (prompts created on or after this date)
         created_before: Optional date filter (prompts created on or before this date)
         limit: Number of results (1-10000)
         offset: Pagination offset
-        db: Database session
+        sort: "relevance" (BM25 rank) or "updated" (most recently updated first)
+        cursor: next_cursor from a previous page; keyset pagination for sort=updated
+        include_total: Set to false to skip counting all matches
+        db: Database session runner
 
     Returns:
-        List of matching prompts with pagination info and context snippets
+        List of matching prompts with pagination info, context snippets and
+        match offsets (start, end) for highlighting
     """
-    service = PromptService(db)
-    prompts, total = service.search_prompts(
-        q, folder_id, tags, created_after, created_before, limit, offset
-    )
+    def search(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        hits, total, next_cursor = service.search_prompts(
+            q, folder_id, tags, created_after, created_before, limit, offset,
+            sort=sort, cursor=cursor, include_total=include_total,
+            match_all_tags=(tag_mode == "all")
+        )
 
-    # Convert tags string to list and add snippet for each prompt
-    prompts_data = []
-    for prompt in prompts:
-        # Generate snippet showing matched context
-        snippet = generate_snippet(prompt.content, q)
-
-        prompts_data.append({
-            "id": prompt.id,
-            "folder_id": prompt.folder_id,
-            "title": prompt.title,
-            "description": prompt.description,
-            "content": prompt.content,
-            "snippet": snippet,  # Add context snippet
-            "tags": [t.strip() for t in prompt.tags.split(',') if t.strip()] if prompt.tags else [],
-            "original_content": prompt.original_content,
-            "is_ai_enhanced": prompt.is_ai_enhanced,
-            "is_easy_access": prompt.is_easy_access,
-            "created_at": prompt.created_at,
-            "updated_at": prompt.updated_at,
-            "versions": []
-        })
+        # Convert tags string to list and attach snippet/match offsets for each prompt
+        prompts_data = []
+        for hit in hits:
+            data = _summary_data(hit["prompt"])
+            data["snippet"] = hit["snippet"]
+            data["title_matches"] = hit["title_matches"]
+            data["snippet_matches"] = hit["snippet_matches"]
+            prompts_data.append(data)
 
-    return {
-        "prompts": prompts_data,
-        "total": total,
-        "limit": limit,
-        "offset": offset
-    }
+        return {
+            "prompts": prompts_data,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor
+        }
+
+    return await db.run(search)
 
 
-@router.get("", response_model=PromptListResponse)
-def list_prompts(
+@router.get("/search/facets", response_model=SearchFacetsResponse)
+async def get_search_facets(
+    q: str = Query("", description="Search query (empty for all prompts)"),
+    folder_id: Optional[int] = Query(None, description="Filter by folder"),
+    tags: Optional[List[str]] = Query(None, description="Filter by tags"),
+    tag_mode: str = Query("all", pattern="^(all|any)$", description="Match all tags (AND) or any (OR)"),
+    created_after: Optional[str] = Query(None, description="Filter by created date (ISO: YYYY-MM-DD)"),
+    created_before: Optional[str] = Query(None, description="Filter by created date (ISO: YYYY-MM-DD)"),
+    date_bucket: str = Query("month", pattern="^(day|month|year)$", description="Created date histogram bucket"),
+    db: SessionRunner = Depends(get_read_runner)
+):
+    """
+    Get facet counts for a search: tags, folders (with subtree totals) and
+    a created-date histogram, computed in one pass over the matches.
+
+    Args:
+        q: Search query (same semantics as /search)
+        folder_id: Optional folder filter
+        tags: Optional tag filters
+        tag_mode: "all" requires every tag, "any" requires at least one
+        created_after: Optional date filter (prompts created on or after this date)
+        created_before: Optional date filter (prompts created on or before this date)
+        date_bucket: "day", "month" or "year"
+        db: Database session runner
+
+    Returns:
+        Facet counts for the matching prompts
+    """
+    def facets(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        return service.get_search_facets(
+            q, folder_id, tags, created_after, created_before,
+            match_all_tags=(tag_mode == "all"),
+            date_bucket=date_bucket
+        )
+
+    return await db.run(facets)
+
+
+@router.get("/tags", response_model=TagCountResponse)
+async def list_tag_counts(db: SessionRunner = Depends(get_read_runner)):
+    """
+    Get every tag with the number of prompts using it.
+
+    Args:
+        db: Database session runner
+
+    Returns:
+        Tags with prompt counts, most used first
+    """
+    def tag_counts(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        tag_counts = service.get_tag_counts()
+        return {"tags": [{"name": name, "count": count} for name, count in tag_counts]}
+
+    return await db.run(tag_counts)
+
+
+@router.get("", response_model=Union[PromptListResponse, PromptSummaryListResponse])
+async def list_prompts(
     folder_id: Optional[int] = Query(None),
     limit: int = Query(50, ge=1, le=10000),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    include_total: bool = Query(True, description="Count all prompts"),
+    view: str = Query("full", pattern=VIEW_PATTERN, description="full or summary (no content)"),
+    db: SessionRunner = Depends(get_read_runner)
 ):
     """
     List prompts with optional folder filter and pagination.
 
+    Pass the returned next_cursor back as cursor to fetch the following page
+    by keyset (constant cost per page) instead of offset.
+
     Args:
         folder_id: Filter by folder ID
-        limit: Number of results (1-100)
-        offset: Pagination offset
-        db: Database session
+        limit: Number of results (1-10000)
+        offset: Pagination offset (ignored when cursor is given)
+        cursor: next_cursor from a previous page
+        include_total: Set to false to skip counting all prompts
+        view: "summary" omits content and original_content (fetch them via
+              GET /api/prompts/{id})
+        db: Database session runner
 
     Returns:
         List of prompts with pagination info
     """
-    service = PromptService(db)
-    prompts, total = service.get_prompts(folder_id, limit, offset)
-
-    # Convert tags string to list for each prompt
-    prompts_data = []
-    for prompt in prompts:
-        prompts_data.append({
-            "id": prompt.id,
-            "folder_id": prompt.folder_id,
-            "title": prompt.title,
-            "description": prompt.description,
-            "content": prompt.content,
-            "tags": [t.strip() for t in prompt.tags.split(',') if t.strip()] if prompt.tags else [],
-            "original_content": prompt.original_content,
-            "is_ai_enhanced": prompt.is_ai_enhanced,
-            "is_easy_access": prompt.is_easy_access,
-            "created_at": prompt.created_at,
-            "updated_at": prompt.updated_at,
-            "versions": []  # Don't load versions in list view for performance
-        })
+    def list_page(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        prompts, total, next_cursor = service.get_prompts(
+            folder_id, limit, offset, cursor=cursor, include_total=include_total,
+            summary=(view == "summary")
+        )
 
-    return {
-        "prompts": prompts_data,
-        "total": total,
-        "limit": limit,
-        "offset": offset
-    }
+        prompts_data = _list_data(prompts, view)
+
+        return {
+            "prompts": prompts_data,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor
+        }
+
+    return await db.run(list_page)
 
 
 class PromptEnhanceRequest(BaseModel):
     """Request model for prompt enhancement."""
     custom_instruction: Optional[str] = None
+    bypass_cache: bool = False  # Run the CLI even if the result is cached
 
 
 class PromptEnhanceResponse(BaseModel):
@@ -184,52 +262,65 @@ class PromptEnhanceResponse(BaseModel):
 
 
 @router.post("/{prompt_id}/enhance", response_model=PromptEnhanceResponse)
-def enhance_prompt(
+async def enhance_prompt(
     prompt_id: int,
     request: PromptEnhanceRequest,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_read_runner)
 ):
     """
     Enhance a prompt using Claude CLI.
 
+    The enhancement runs as a Claude job on the background workers, ahead
+    of batch jobs; this route awaits it for up to CLAUDE_TIMEOUT seconds
+    without holding a worker thread.
+
     Args:
         prompt_id: Prompt ID to enhance
-        request: Enhancement request with optional custom instruction
-        db: Database session
+        request: Enhancement request with optional custom instruction and cache bypass
+        db: Database session runner
 
     Returns:
         Original and enhanced prompt text
+
+    Raises:
+        HTTPException: 503 with the job ID and status if the job has not
+            finished in time (follow it at /api/claude/status/{job_id});
+            500 if it failed
     """
-    prompt_service = PromptService(db)
-    claude_service = ClaudeService()
+    print(f"[ENHANCE] Starting enhancement for prompt {prompt_id}")
+    job_id = await claude_job_queue.submit(
+        prompt_id,
+        instruction=request.custom_instruction,
+        bypass_cache=request.bypass_cache
+    )
+    try:
+        await claude_job_queue.wait(job_id, settings.CLAUDE_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
 
-    # Get the prompt
-    prompt = prompt_service.get_prompt_by_id(prompt_id)
+    def load(session: Session) -> ClaudeJob:
+        return ClaudeJobService(session).get_job(job_id)
 
-    # Enhance using Claude CLI
-    try:
-        print(f"[ENHANCE] Starting enhancement for prompt {prompt_id}")
-        print(f"[ENHANCE] Original content: {prompt.content[:100]}...")
-        enhanced = claude_service.enhance_prompt(
-            original_prompt=prompt.content,
-            enhancement_instruction=request.custom_instruction
+    job = await db.run(load)
+    if job.status in (JOB_PENDING, JOB_PROCESSING):
+        print(f"[ENHANCE] Job {job_id} is still {job.status}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"message": "Enhancement has not finished yet", "job_id": job_id, "status": job.status}
         )
-        print(f"[ENHANCE] Success! Enhanced content: {enhanced[:100]}...")
-
-        return {
-            "original": prompt.content,
-            "enhanced": enhanced
-        }
-    except Exception as e:
-        print(f"[ENHANCE ERROR] {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        from fastapi import HTTPException
+    if job.status != JOB_COMPLETED:
+        print(f"[ENHANCE ERROR] Job {job_id}: {job.error_message}")
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to enhance prompt: {str(e)}"
+            detail=f"Failed to enhance prompt: {job.error_message}"
         )
 
+    print(f"[ENHANCE] Success! Enhanced content: {job.enhanced_content[:100]}...")
+    return {
+        "original": job.original_content,
+        "enhanced": job.enhanced_content
+    }
+
 
 class PromptApplyEnhancementRequest(BaseModel):
     """Request model for applying enhancement."""
@@ -237,10 +328,10 @@ class PromptApplyEnhancementRequest(BaseModel):
 
 
 @router.post("/{prompt_id}/apply-enhancement", response_model=PromptResponse)
-def apply_enhancement(
+async def apply_enhancement(
     prompt_id: int,
     request: PromptApplyEnhancementRequest,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Apply an enhanced version to a prompt (creates new version).
@@ -248,70 +339,54 @@ def apply_enhancement(
     Args:
         prompt_id: Prompt ID
         request: Request with enhanced content
-        db: Database session
+        db: Database session runner
 
     Returns:
         Updated prompt
     """
-    service = PromptService(db)
+    def apply(session: Session) -> Dict[str, Any]:
+        prompt = PromptService(session).apply_enhancement(prompt_id, request.enhanced_content)
+        return _prompt_data(prompt, prompt.versions)
 
-    # Update the prompt with enhanced content (will create version automatically)
-    prompt = service.update_prompt(
-        prompt_id=prompt_id,
-        content=request.enhanced_content
-    )
-
-    # Mark as AI enhanced
-    prompt.is_ai_enhanced = True
-    prompt = service.repo.update(prompt)
+    return await db.run(apply)
 
-    return prompt
 
-
-@router.get("/easy-access/list", response_model=PromptListResponse)
-def list_easy_access_prompts(db: Session = Depends(get_db)):
+@router.get("/easy-access/list", response_model=Union[PromptListResponse, PromptSummaryListResponse])
+async def list_easy_access_prompts(
+    view: str = Query("full", pattern=VIEW_PATTERN, description="full or summary (no content)"),
+    db: SessionRunner = Depends(get_read_runner)
+):
     """
     Get all prompts marked as easy access.
 
     Args:
-        db: Database session
+        view: "summary" omits content and original_content
+        db: Database session runner
 
     Returns:
         List of easy access prompts (max 8)
     """
-    service = PromptService(db)
-    prompts = service.get_easy_access_prompts()
-
-    # Convert tags string to list for each prompt
-    prompts_data = []
-    for prompt in prompts:
-        prompts_data.append({
-            "id": prompt.id,
-            "folder_id": prompt.folder_id,
-            "title": prompt.title,
-            "description": prompt.description,
-            "content": prompt.content,
-            "tags": [t.strip() for t in prompt.tags.split(',') if t.strip()] if prompt.tags else [],
-            "original_content": prompt.original_content,
-            "is_ai_enhanced": prompt.is_ai_enhanced,
-            "is_easy_access": prompt.is_easy_access,
-            "created_at": prompt.created_at,
-            "updated_at": prompt.updated_at,
-            "versions": []
-        })
+    def easy_access(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        prompts = service.get_easy_access_prompts(summary=(view == "summary"))
 
-    return {
-        "prompts": prompts_data,
-        "total": len(prompts_data),
-        "limit": 8,
-        "offset": 0
-    }
+        prompts_data = _list_data(prompts, view)
+
+        return {
+            "prompts": prompts_data,
+            "total": len(prompts_data),
+            "limit": 8,
+            "offset": 0
+        }
+
+    return await db.run(easy_access)
 
 
-@router.post("/easy-access/reorder", response_model=PromptListResponse)
-def reorder_easy_access_prompts(
+@router.post("/easy-access/reorder", response_model=Union[PromptListResponse, PromptSummaryListResponse])
+async def reorder_easy_access_prompts(
     reorder_data: EasyAccessReorder,
-    db: Session = Depends(get_db)
+    view: str = Query("full", pattern=VIEW_PATTERN, description="full or summary (no content)"),
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Reorder easy access prompts.
@@ -322,7 +397,8 @@ def reorder_easy_access_prompts(
 
     Args:
         reorder_data: Reorder operation data (prompt_id, new_position)
-        db: Database session
+        view: "summary" omits content and original_content
+        db: Database session runner
 
     Returns:
         List of all easy access prompts with updated easy_access_order
@@ -331,117 +407,85 @@ def reorder_easy_access_prompts(
         404: If prompt not found
         400: If prompt is not marked as easy access
     """
-    service = PromptService(db)
-    prompts = service.reorder_easy_access_prompts(
-        reorder_data.prompt_id,
-        reorder_data.new_position
-    )
+    def reorder(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        prompts = service.reorder_easy_access_prompts(
+            reorder_data.prompt_id,
+            reorder_data.new_position,
+            summary=(view == "summary")
+        )
 
-    # Convert tags string to list for each prompt
-    prompts_data = []
-    for prompt in prompts:
-        prompts_data.append({
-            "id": prompt.id,
-            "folder_id": prompt.folder_id,
-            "title": prompt.title,
-            "description": prompt.description,
-            "content": prompt.content,
-            "tags": [t.strip() for t in prompt.tags.split(',') if t.strip()] if prompt.tags else [],
-            "original_content": prompt.original_content,
-            "is_ai_enhanced": prompt.is_ai_enhanced,
-            "is_easy_access": prompt.is_easy_access,
-            "created_at": prompt.created_at,
-            "updated_at": prompt.updated_at,
-            "versions": []
-        })
+        prompts_data = _list_data(prompts, view)
 
-    return {
-        "prompts": prompts_data,
-        "total": len(prompts_data),
-        "limit": 8,
-        "offset": 0
-    }
+        return {
+            "prompts": prompts_data,
+            "total": len(prompts_data),
+            "limit": 8,
+            "offset": 0
+        }
+
+    return await db.run(reorder)
 
 
 @router.get("/{prompt_id}", response_model=PromptResponse)
-def get_prompt(prompt_id: int, db: Session = Depends(get_db)):
+async def get_prompt(prompt_id: int, db: SessionRunner = Depends(get_read_runner)):
     """
     Get a single prompt by ID with version history.
 
     Args:
         prompt_id: Prompt ID
-        db: Database session
+        db: Database session runner
 
     Returns:
         Prompt details with versions
     """
-    service = PromptService(db)
-    prompt = service.get_prompt_by_id(prompt_id)
+    def load(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        prompt = service.get_prompt_by_id(prompt_id)
 
-    # Convert tags string to list for response
-    response_data = {
-        "id": prompt.id,
-        "folder_id": prompt.folder_id,
-        "title": prompt.title,
-        "description": prompt.description,
-        "content": prompt.content,
-        "tags": [t.strip() for t in prompt.tags.split(',') if t.strip()] if prompt.tags else [],
-        "original_content": prompt.original_content,
-        "is_ai_enhanced": prompt.is_ai_enhanced,
-        "is_easy_access": prompt.is_easy_access,
-        "created_at": prompt.created_at,
-        "updated_at": prompt.updated_at,
-        "versions": prompt.versions
-    }
-    return response_data
+        # Convert tags string to list for response
+        response_data = _prompt_data(prompt, prompt.versions)
+        return response_data
+
+    return await db.run(load)
 
 
 @router.post("", response_model=PromptResponse, status_code=status.HTTP_201_CREATED)
-def create_prompt(prompt_data: PromptCreate, db: Session = Depends(get_db)):
+async def create_prompt(prompt_data: PromptCreate, db: SessionRunner = Depends(get_runner)):
     """
     Create a new prompt.
 
     Args:
         prompt_data: Prompt creation data
-        db: Database session
+        db: Database session runner
 
     Returns:
         Created prompt
     """
-    service = PromptService(db)
-    prompt = service.create_prompt(
-        folder_id=prompt_data.folder_id,
-        title=prompt_data.title,
-        description=prompt_data.description,
-        content=prompt_data.content,
-        tags=prompt_data.tags
-    )
+    def create(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        prompt = service.create_prompt(
+            folder_id=prompt_data.folder_id,
+            title=prompt_data.title,
+            description=prompt_data.description,
+            content=prompt_data.content,
+            tags=prompt_data.tags
+        )
 
-    # TODO: If auto_enhance is True, trigger Claude enhancement job
+        # TODO: If auto_enhance is True, trigger Claude enhancement job
 
-    # Convert tags string to list for response
-    response_data = {
-        "id": prompt.id,
-        "folder_id": prompt.folder_id,
-        "title": prompt.title,
-        "description": prompt.description,
-        "content": prompt.content,
-        "tags": [t.strip() for t in prompt.tags.split(',') if t.strip()] if prompt.tags else [],
-        "original_content": prompt.original_content,
-        "is_ai_enhanced": prompt.is_ai_enhanced,
-        "is_easy_access": prompt.is_easy_access,
-        "created_at": prompt.created_at,
-        "updated_at": prompt.updated_at,
-        "versions": prompt.versions
-    }
-    return response_data
+        # Convert tags string to list for response
+        response_data = _prompt_data(prompt, prompt.versions)
+        return response_data
+
+    return await db.run(create)
 
 
 @router.put("/{prompt_id}", response_model=PromptResponse)
-def update_prompt(
+async def update_prompt(
     prompt_id: int,
     prompt_data: PromptUpdate,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Update an existing prompt.
@@ -449,40 +493,46 @@ def update_prompt(
     Args:
         prompt_id: Prompt ID
         prompt_data: Prompt update data
-        db: Database session
+        db: Database session runner
 
     Returns:
         Updated prompt
     """
-    service = PromptService(db)
-    prompt = service.update_prompt(
-        prompt_id=prompt_id,
-        title=prompt_data.title,
-        description=prompt_data.description,
-        content=prompt_data.content,
-        tags=prompt_data.tags
-    )
-    return prompt
+    def update(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        prompt = service.update_prompt(
+            prompt_id=prompt_id,
+            title=prompt_data.title,
+            description=prompt_data.description,
+            content=prompt_data.content,
+            tags=prompt_data.tags
+        )
+        return _prompt_data(prompt, prompt.versions)
+
+    return await db.run(update)
 
 
 @router.delete("/{prompt_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_prompt(prompt_id: int, db: Session = Depends(get_db)):
+async def delete_prompt(prompt_id: int, db: SessionRunner = Depends(get_runner)):
     """
     Delete a prompt.
 
     Args:
         prompt_id: Prompt ID
-        db: Database session
+        db: Database session runner
     """
-    service = PromptService(db)
-    service.delete_prompt(prompt_id)
+    def delete(session: Session) -> None:
+        service = PromptService(session)
+        service.delete_prompt(prompt_id)
+
+    return await db.run(delete)
 
 
 @router.post("/{prompt_id}/move", response_model=PromptResponse)
-def move_prompt(
+async def move_prompt(
     prompt_id: int,
     move_data: PromptMove,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Move a prompt to a different folder.
@@ -490,21 +540,24 @@ def move_prompt(
     Args:
         prompt_id: Prompt ID
         move_data: Move operation data
-        db: Database session
+        db: Database session runner
 
     Returns:
         Updated prompt
     """
-    service = PromptService(db)
-    prompt = service.move_prompt(prompt_id, move_data.folder_id)
-    return prompt
+    def move(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        prompt = service.move_prompt(prompt_id, move_data.folder_id)
+        return _prompt_data(prompt, prompt.versions)
+
+    return await db.run(move)
 
 
 @router.post("/{prompt_id}/duplicate", response_model=PromptResponse, status_code=status.HTTP_201_CREATED)
-def duplicate_prompt(
+async def duplicate_prompt(
     prompt_id: int,
     duplicate_data: PromptDuplicate,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Duplicate a prompt.
@@ -512,34 +565,42 @@ def duplicate_prompt(
     Args:
         prompt_id: Prompt ID to duplicate
         duplicate_data: Duplication options
-        db: Database session
+        db: Database session runner
 
     Returns:
         New prompt (copy)
     """
-    service = PromptService(db)
-    prompt = service.duplicate_prompt(
-        prompt_id=prompt_id,
-        title=duplicate_data.title,
-        folder_id=duplicate_data.folder_id
-    )
-    return prompt
+    def duplicate(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+        prompt = service.duplicate_prompt(
+            prompt_id=prompt_id,
+            title=duplicate_data.title,
+            folder_id=duplicate_data.folder_id
+        )
+        return _prompt_data(prompt, prompt.versions)
+
+    return await db.run(duplicate)
 
 
-@router.post("/reorder", response_model=PromptListResponse)
-def reorder_prompts(
+@router.post("/reorder", response_model=Union[PromptListResponse, PromptSummaryListResponse])
+async def reorder_prompts(
     reorder_data: PromptReorder,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    view: str = Query("full", pattern=VIEW_PATTERN, description="full or summary (no content)"),
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Reorder a prompt within its folder.
 
-    Moves the specified prompt to a new position and adjusts other prompts
-    in the folder accordingly. All prompts will have their display_order updated.
+    Moves the specified prompt to a new position. Only the moved prompt's
+    display_order is written; when the order keys around it get too close,
+    the folder is renumbered in the background after the response.
 
     Args:
         reorder_data: Reorder operation data (prompt_id, new_position, folder_id)
-        db: Database session
+        background_tasks: Background task queue for key rebalancing
+        view: "summary" omits content and original_content
+        db: Database session runner
 
     Returns:
         List of all prompts in the folder with updated display_order
@@ -548,51 +609,42 @@ def reorder_prompts(
         404: If prompt or folder not found
         400: If prompt is not in the specified folder
     """
-    service = PromptService(db)
+    def reorder(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+
+        try:
+            # Perform reordering
+            updated_prompts, rebalance_needed = service.reorder_prompts(
+                prompt_id=reorder_data.prompt_id,
+                new_position=reorder_data.new_position,
+                folder_id=reorder_data.folder_id,
+                summary=(view == "summary")
+            )
+            if rebalance_needed:
+                background_tasks.add_task(rebalance_folder_order, reorder_data.folder_id)
 
-    try:
-        # Perform reordering
-        updated_prompts = service.reorder_prompts(
-            prompt_id=reorder_data.prompt_id,
-            new_position=reorder_data.new_position,
-            folder_id=reorder_data.folder_id
-        )
+            # Convert to response format
+            prompts_data = _list_data(updated_prompts, view)
 
-        # Convert to response format
-        prompts_data = []
-        for prompt in updated_prompts:
-            prompts_data.append({
-                "id": prompt.id,
-                "folder_id": prompt.folder_id,
-                "title": prompt.title,
-                "description": prompt.description,
-                "content": prompt.content,
-                "tags": [t.strip() for t in prompt.tags.split(',') if t.strip()] if prompt.tags else [],
-                "original_content": prompt.original_content,
-                "is_ai_enhanced": prompt.is_ai_enhanced,
-                "is_easy_access": prompt.is_easy_access,
-                "created_at": prompt.created_at,
-                "updated_at": prompt.updated_at,
-                "versions": []
-            })
+            return {
+                "prompts": prompts_data,
+                "total": len(prompts_data),
+                "limit": len(prompts_data),
+                "offset": 0
+            }
 
-        return {
-            "prompts": prompts_data,
-            "total": len(prompts_data),
-            "limit": len(prompts_data),
-            "offset": 0
-        }
+        except ValueError as e:
+            from fastapi import HTTPException
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    except ValueError as e:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await db.run(reorder)
 
 
 @router.patch("/{prompt_id}/easy-access", response_model=PromptResponse)
-def toggle_easy_access(
+async def toggle_easy_access(
     prompt_id: int,
     enable: bool = Query(..., description="Enable or disable easy access"),
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_runner)
 ):
     """
     Toggle easy access status for a prompt.
@@ -603,7 +655,7 @@ def toggle_easy_access(
     Args:
         prompt_id: Prompt ID
         enable: True to enable easy access, False to disable
-        db: Database session
+        db: Database session runner
 
     Returns:
         Updated prompt
@@ -612,24 +664,27 @@ def toggle_easy_access(
         400: If trying to enable and already at 8-prompt limit
         404: If prompt not found
     """
-    service = PromptService(db)
-
-    # Get the prompt
-    prompt = service.get_prompt_by_id(prompt_id)
-
-    # If enabling, check the limit
-    if enable and not prompt.is_easy_access:
-        # Count current easy access prompts
-        easy_access_count = service.count_easy_access_prompts()
-        if easy_access_count >= 8:
-            from fastapi import HTTPException
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Maximum of 8 prompts can be marked as easy access. Please disable another prompt first."
-            )
-
-    # Update the flag
-    prompt.is_easy_access = enable
-    updated_prompt = service.repo.update(prompt)
-
-    return updated_prompt
+    def toggle(session: Session) -> Dict[str, Any]:
+        service = PromptService(session)
+
+        # Get the prompt
+        prompt = service.get_prompt_by_id(prompt_id)
+
+        # If enabling, check the limit
+        if enable and not prompt.is_easy_access:
+            # Count current easy access prompts
+            easy_access_count = service.count_easy_access_prompts()
+            if easy_access_count >= 8:
+                from fastapi import HTTPException
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Maximum of 8 prompts can be marked as easy access. Please disable another prompt first."
+                )
+
+        # Update the flag
+        prompt.is_easy_access = enable
+        updated_prompt = service.repo.update(prompt)
+
+        return _prompt_data(updated_prompt, updated_prompt.versions)
+
+    return await db.run(toggle)
\ No newline at end of file
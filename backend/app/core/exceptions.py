@@ -69,11 +69,32 @@ class ClaudeJobPendingException(AppException):
         )
 
 
+class ClaudeBatchNotFoundException(AppException):
+    """Raised when a bulk enhancement batch is not found."""
+
+    def __init__(self, batch_id: str):
+        super().__init__(
+            message=f"Claude batch with ID {batch_id} not found",
+            code="CLAUDE_BATCH_NOT_FOUND"
+        )
+
+
 class ClaudeCLIException(AppException):
     """Raised when Claude CLI encounters an error."""
 
     def __init__(self, message: str):
+        self.detail = message
         super().__init__(
             message=f"Claude CLI error: {message}",
             code="CLAUDE_CLI_ERROR"
         )
+
+
+class InvalidCursorException(AppException):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, cursor: str):
+        super().__init__(
+            message=f"Invalid pagination cursor: {cursor}",
+            code="INVALID_CURSOR"
+        )
@@ -0,0 +1,47 @@
+"""
+Fractional order keys for user-sorted lists.
+
+Items are sorted by a float key. Moving an item gives it a key between its
+new neighbours, so only the moved row is written. Repeated moves into the
+same gap halve it each time; once a gap gets narrower than REBALANCE_GAP the
+list is renumbered to evenly spaced keys (ORDER_KEY_STEP apart).
+"""
+from typing import Optional
+
+# Spacing between keys after a rebalance and for items appended to a list
+ORDER_KEY_STEP = 1.0
+
+# Gap below which a list should be renumbered (about 20 halvings of a fresh gap,
+# far above the point where doubles stop having a distinct midpoint)
+REBALANCE_GAP = ORDER_KEY_STEP / 2 ** 20
+
+
+def key_between(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    """
+    Compute an order key that sorts between two neighbours.
+
+    Args:
+        before: Key of the item that will precede the moved item (None at the start)
+        after: Key of the item that will follow the moved item (None at the end)
+
+    Returns:
+        New key, or None if no distinct key fits between the neighbours
+    """
+    if before is None and after is None:
+        return ORDER_KEY_STEP
+    if before is None:
+        return after - ORDER_KEY_STEP
+    if after is None:
+        return before + ORDER_KEY_STEP
+
+    key = (before + after) / 2
+    if not before < key < after:
+        return None
+    return key
+
+
+def needs_rebalance(before: Optional[float], after: Optional[float]) -> bool:
+    """Check whether the gap between two neighbouring keys has become too narrow."""
+    if before is None or after is None:
+        return False
+    return after - before < REBALANCE_GAP
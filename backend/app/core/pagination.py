@@ -0,0 +1,75 @@
+"""
+Opaque cursor helpers for keyset pagination.
+"""
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any, List, Optional
+
+from app.core.exceptions import InvalidCursorException
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor.
+
+    Args:
+        values: Sort key values (datetimes are stored as ISO strings)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous response
+        size: Expected number of sort key values
+
+    Returns:
+        List of sort key values
+
+    Raises:
+        InvalidCursorException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise InvalidCursorException(cursor)
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorException(cursor)
+    return values
+
+
+def parse_cursor_datetime(value: Any, cursor: str) -> datetime:
+    """Parse an ISO datetime stored in a cursor, raising InvalidCursorException if invalid."""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise InvalidCursorException(cursor)
+
+
+def parse_cursor_id(value: Any, cursor: str) -> int:
+    """Check a row ID stored in a cursor, raising InvalidCursorException unless it is an int."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise InvalidCursorException(cursor)
+    return value
+
+
+def parse_cursor_order_key(value: Any, cursor: str) -> Optional[float]:
+    """Check an order key stored in a cursor (finite number or None), raising InvalidCursorException if invalid."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise InvalidCursorException(cursor)
+    return float(value)
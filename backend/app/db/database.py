@@ -1,21 +1,219 @@
 """
 Database configuration and session management.
 """
-from sqlalchemy import create_engine
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 
-# Create SQLAlchemy engine
+T = TypeVar("T")
+
+# Pragmas that only make sense on the writer (journal_mode is stored in the file)
+WRITER_ONLY_PRAGMAS = ("journal_mode", "synchronous")
+
+
+def sqlite_file_path(url: str) -> Optional[str]:
+    """
+    Get the database file of a SQLite URL.
+
+    Args:
+        url: Database URL
+
+    Returns:
+        File path, or None for other databases and in-memory SQLite
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return None
+    if not parsed.database or parsed.database == ":memory:" or parsed.database.startswith("file:"):
+        return None
+    return parsed.database
+
+
+def read_only_url(url: str) -> str:
+    """Turn a SQLite file URL into a read-only (mode=ro) URI connection URL."""
+    path = Path(sqlite_file_path(url)).as_posix()
+    parsed = make_url(url).set(database=f"file:{path}", query={"mode": "ro", "uri": "true"})
+    return parsed.render_as_string(hide_password=False)
+
+
+def pool_options(url: str, read_only: bool = False) -> Dict[str, Any]:
+    """
+    Get the pool settings for an engine.
+
+    A SQLite file gets one pooled writer connection; further writers queue for
+    it (up to SQLITE_WRITE_TIMEOUT) instead of failing with "database is
+    locked". Read-only engines get SQLITE_READ_POOL_SIZE connections.
+
+    Args:
+        url: Database URL
+        read_only: Whether the engine is the read-only pool
+
+    Returns:
+        Keyword arguments for create_engine
+    """
+    if sqlite_file_path(url) is None:
+        return {}
+    if read_only:
+        return {"pool_size": settings.SQLITE_READ_POOL_SIZE, "max_overflow": 0}
+    return {"pool_size": 1, "max_overflow": 0, "pool_timeout": settings.SQLITE_WRITE_TIMEOUT}
+
+
+def sqlite_pragmas(read_only: bool = False) -> Dict[str, str]:
+    """
+    Get the configured SQLite pragma profile.
+
+    Args:
+        read_only: Leave out pragmas that only the writer may set
+
+    Returns:
+        Dict of pragma name -> value, in the order they are applied
+    """
+    pragmas = {
+        "busy_timeout": str(settings.SQLITE_BUSY_TIMEOUT),
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "cache_size": str(settings.SQLITE_CACHE_SIZE),
+        "mmap_size": str(settings.SQLITE_MMAP_SIZE),
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+    if read_only:
+        for name in WRITER_ONLY_PRAGMAS:
+            del pragmas[name]
+    return pragmas
+
+
+def _set_pragmas(dbapi_connection, pragmas: Dict[str, str]) -> None:
+    """Execute PRAGMA statements on a raw SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the pragma profile to a new SQLite connection (connect event handler)."""
+    _set_pragmas(dbapi_connection, sqlite_pragmas())
+
+
+def apply_sqlite_read_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the read-only pragma profile to a new read connection (connect event handler)."""
+    _set_pragmas(dbapi_connection, sqlite_pragmas(read_only=True))
+
+
+def connect_options(url: str) -> Dict[str, Any]:
+    """Get driver connect arguments for a database URL."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"check_same_thread": False}  # Needed for SQLite
+    return {}
+
+
+# Writer engine: all writes (and the reads of write routes) go through it
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Needed for SQLite
+    connect_args=connect_options(settings.DATABASE_URL),
     echo=settings.DEBUG,
+    **pool_options(settings.DATABASE_URL),
 )
 
-# Create SessionLocal class
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+
+# Read engine: read-only connections to the same file (the writer engine
+# when there is no file to open twice, e.g. in-memory SQLite or PostgreSQL,
+# which handles concurrent writers itself)
+if sqlite_file_path(settings.DATABASE_URL) is not None:
+    read_engine = create_engine(
+        read_only_url(settings.DATABASE_URL),
+        connect_args={"check_same_thread": False},
+        echo=settings.DEBUG,
+        **pool_options(settings.DATABASE_URL, read_only=True),
+    )
+    event.listen(read_engine, "connect", apply_sqlite_read_pragmas)
+else:
+    read_engine = engine
+
+
+# Async driver for each sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL to its async driver (sqlite -> sqlite+aiosqlite)."""
+    scheme, separator, rest = url.partition("://")
+    if scheme in ASYNC_DRIVERS:
+        return ASYNC_DRIVERS[scheme] + separator + rest
+    return url
+
+
+def create_async_engines(url: str) -> Tuple[Any, Optional[Any]]:
+    """
+    Create the async counterparts of the writer and read engines.
+
+    Args:
+        url: Sync database URL (mapped to its async driver)
+
+    Returns:
+        Tuple of (async writer engine, async read-only engine), the latter
+        None when reads share the writer (no SQLite file to open twice)
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    # aiosqlite defaults to NullPool; pool explicitly so the writer limit applies
+    async_pool = {"poolclass": AsyncAdaptedQueuePool} if sqlite_file_path(url) else {}
+
+    writer = create_async_engine(
+        async_database_url(url),
+        echo=settings.DEBUG,
+        **async_pool,
+        **pool_options(url),
+    )
+    if writer.dialect.name == "sqlite":
+        event.listen(writer.sync_engine, "connect", apply_sqlite_pragmas)
+
+    if sqlite_file_path(url) is None:
+        return writer, None
+    reader = create_async_engine(
+        async_database_url(read_only_url(url)),
+        echo=settings.DEBUG,
+        **async_pool,
+        **pool_options(url, read_only=True),
+    )
+    event.listen(reader.sync_engine, "connect", apply_sqlite_read_pragmas)
+    return writer, reader
+
+
+# Async engines, only created when DATABASE_ASYNC is enabled
+async_engine = None
+async_read_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine, async_read_engine = create_async_engines(settings.DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+    if async_read_engine is not None:
+        AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False)
+    else:
+        AsyncReadSessionLocal = AsyncSessionLocal
+
+# Create SessionLocal class (writer) and ReadSessionLocal (read-only)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Create Base class for models
 Base = declarative_base()
@@ -23,10 +221,10 @@ Base = declarative_base()
 
 def get_db():
     """
-    Dependency for getting database session.
+    Dependency for getting a database session for routes that write.
 
     Yields:
-        Session: SQLAlchemy database session
+        Session: SQLAlchemy session on the writer engine
     """
     db = SessionLocal()
     try:
@@ -35,34 +233,179 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """
+    Dependency for getting a database session for read-only routes.
+
+    Yields:
+        Session: SQLAlchemy session on the read-only engine
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class SessionRunner:
+    """
+    Runs synchronous ORM work (services, repositories, serialization) for async routes.
+
+    With DATABASE_ASYNC the work runs on an AsyncSession through run_sync, so
+    database I/O is awaited on the event loop. Otherwise it runs on a regular
+    Session in the threadpool, holding a worker only while the work executes.
+    """
+
+    def __init__(self, session, is_async: bool = False):
+        """
+        Initialize runner with a database session.
+
+        Args:
+            session: AsyncSession (is_async) or Session
+            is_async: Whether session is an AsyncSession
+        """
+        self.session = session
+        self.is_async = is_async
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Call func(session, *args, **kwargs) with a synchronous Session.
+
+        Args:
+            func: Function doing the ORM work; must finish serializing ORM objects
+            *args: Extra positional arguments for func
+            **kwargs: Extra keyword arguments for func
+
+        Returns:
+            Whatever func returns
+        """
+        # Close after each unit so its connection goes straight back to the pool
+        # (the writer pool has a single connection shared by every request)
+        if self.is_async:
+            try:
+                return await self.session.run_sync(func, *args, **kwargs)
+            finally:
+                await self.session.close()
+        return await run_in_threadpool(self._run_and_close, func, *args, **kwargs)
+
+    def _run_and_close(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call func with the sync session, then close the session."""
+        try:
+            return func(self.session, *args, **kwargs)
+        finally:
+            self.session.close()
+
+
+async def _open_runner(session_factory, async_session_factory):
+    """Yield a SessionRunner from the async factory when enabled, else the sync one."""
+    if async_session_factory is not None:
+        async with async_session_factory() as session:
+            yield SessionRunner(session, is_async=True)
+    else:
+        db = session_factory()
+        try:
+            yield SessionRunner(db)
+        finally:
+            db.close()
+
+
+async def get_runner():
+    """
+    Dependency for async routes that write: a SessionRunner on the writer engine.
+
+    Yields:
+        SessionRunner: Runner bound to a new writer session
+    """
+    async for runner in _open_runner(SessionLocal, AsyncSessionLocal):
+        yield runner
+
+
+async def get_read_runner():
+    """
+    Dependency for read-only async routes: a SessionRunner on the read engine.
+
+    Yields:
+        SessionRunner: Runner bound to a new read-only session
+    """
+    async for runner in _open_runner(ReadSessionLocal, AsyncReadSessionLocal):
+        yield runner
+
+
+def background_runner() -> SessionRunner:
+    """
+    Create a SessionRunner on the writer engine for work outside a request.
+
+    The runner closes its session after every run(), so it holds no
+    connection between units and needs no cleanup.
+
+    Returns:
+        SessionRunner bound to a new writer session
+    """
+    if AsyncSessionLocal is not None:
+        return SessionRunner(AsyncSessionLocal(), is_async=True)
+    return SessionRunner(SessionLocal())
+
+
+async def dispose_engines():
+    """Close pooled connections of the engines (on shutdown)."""
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
+    engine.dispose()
+
+
+def report_sqlite_pragmas() -> Dict[str, str]:
+    """
+    Read back the effective pragma values and report any that differ from the profile.
+
+    Returns:
+        Dict of pragma name -> effective value
+    """
+    # Numeric codes SQLite reports for named settings
+    named_values = {
+        "synchronous": ["OFF", "NORMAL", "FULL", "EXTRA"],
+        "temp_store": ["DEFAULT", "FILE", "MEMORY"],
+    }
+
+    effective = {}
+    with engine.connect() as connection:
+        for name in sqlite_pragmas():
+            value = str(connection.exec_driver_sql(f"PRAGMA {name}").scalar())
+            if name in named_values and value.isdigit():
+                value = named_values[name][int(value)]
+            effective[name] = value
+
+    mismatched = [
+        name for name, value in sqlite_pragmas().items()
+        if effective[name].upper() != value.upper()
+    ]
+    print("[DB] SQLite pragmas: " + ", ".join(f"{name}={value}" for name, value in effective.items()))
+    for name in mismatched:
+        print(f"[WARNING] PRAGMA {name} is {effective[name]}, configured {sqlite_pragmas()[name]}")
+    return effective
+
+
 def init_db():
-    """Initialize database - create all tables and run migrations."""
-    from app.db.models import Folder, Prompt, Version, ClaudeJob
+    """
+    Initialize database - create all tables and run migrations.
+
+    When the schema_version table says the schema is current, this is a
+    single query: tables, migrations and the root folder are already in place.
+    """
+    from migrations.runner import is_current, run_migrations
+
+    if engine.dialect.name == "sqlite":
+        report_sqlite_pragmas()
+
+    if is_current(engine):
+        return
 
     # Create all tables
+    from app.db import models  # noqa: F401 - registers the tables on Base.metadata
     Base.metadata.create_all(bind=engine)
 
-    # Run migrations
-    try:
-        from migrations import migration_003_add_display_order
-        from migrations import migration_004_add_folder_display_order
-        migration_003_add_display_order.migrate()
-        migration_004_add_folder_display_order.migrate()
-    except Exception as e:
-        print(f"[WARNING] Migration failed: {e}")
-
-    # Create root folder if it doesn't exist
-    db = SessionLocal()
-    try:
-        root_folder = db.query(Folder).filter(Folder.parent_id.is_(None)).first()
-        if not root_folder:
-            root = Folder(
-                name="Root",
-                parent_id=None,
-                path="/"
-            )
-            db.add(root)
-            db.commit()
-            print("[OK] Database initialized with root folder")
-    finally:
-        db.close()
+    # Apply pending migrations (including creating the root folder)
+    run_migrations(engine)
@@ -2,7 +2,8 @@
 SQLAlchemy database models.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from typing import List
+from sqlalchemy import Column, Integer, Float, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -12,12 +13,16 @@ class Folder(Base):
     """Folder model for organizing prompts."""
 
     __tablename__ = "folders"
+    __table_args__ = (
+        # Children of a folder in display order (get_by_parent_id)
+        Index("ix_folders_parent_id_display_order", "parent_id", "display_order", "created_at"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     parent_id = Column(Integer, ForeignKey("folders.id", ondelete="CASCADE"), nullable=True)
     path = Column(String(1000), nullable=False, index=True)
-    display_order = Column(Integer, nullable=True, index=True)  # User-defined sort order within parent
+    display_order = Column(Integer, nullable=True)  # User-defined sort order within parent
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -26,37 +31,116 @@ class Folder(Base):
     prompts = relationship("Prompt", back_populates="folder", cascade="all, delete-orphan")
 
 
+class FolderClosure(Base):
+    """Closure table of the folder hierarchy: one row per (ancestor, descendant) pair."""
+
+    __tablename__ = "folder_closure"
+    __table_args__ = (
+        Index("ix_folder_closure_descendant_id", "descendant_id", "ancestor_id"),
+    )
+
+    ancestor_id = Column(Integer, ForeignKey("folders.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("folders.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)  # 0 for the folder itself
+
+
+class FolderTreeGeneration(Base):
+    """
+    Single-row counter of folder tree changes.
+
+    Bumped in the same transaction as every folder mutation, so all worker
+    processes agree on whether a cached folder tree is still current.
+    """
+
+    __tablename__ = "folder_tree_generation"
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+
 class Prompt(Base):
     """Prompt model for storing user prompts."""
 
     __tablename__ = "prompts"
+    __table_args__ = (
+        # Easy access list: filter, custom order, then title
+        Index("ix_prompts_easy_access_order_title", "is_easy_access", "easy_access_order", "title"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     folder_id = Column(Integer, ForeignKey("folders.id", ondelete="CASCADE"), nullable=False)
-    title = Column(String(500), nullable=False, index=True)
+    title = Column(String(500), nullable=False)
     description = Column(String(1000), nullable=True)
     content = Column(Text, nullable=False)
     original_content = Column(Text, nullable=True)
     is_ai_enhanced = Column(Boolean, default=False)
-    is_easy_access = Column(Boolean, default=False, index=True)  # Easy access floating toolbar
-    easy_access_order = Column(Integer, nullable=True, index=True)  # Custom order for easy access prompts
-    tags = Column(String(1000), nullable=True)  # Comma-separated tags
-    display_order = Column(Integer, nullable=True, index=True)  # User-defined sort order within folder
+    is_easy_access = Column(Boolean, default=False)  # Easy access floating toolbar
+    easy_access_order = Column(Integer, nullable=True)  # Custom order for easy access prompts
+    tags = Column(String(1000), nullable=True)  # Comma-separated tags (display copy of prompt_tags)
+    display_order = Column(Float, nullable=True)  # Fractional sort key within folder (see app.core.ordering)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     folder = relationship("Folder", back_populates="prompts")
-    versions = relationship("Version", back_populates="prompt", cascade="all, delete-orphan")
+    versions = relationship(
+        "Version",
+        back_populates="prompt",
+        cascade="all, delete-orphan",
+        order_by="Version.version_number"
+    )
     claude_jobs = relationship("ClaudeJob", back_populates="prompt", cascade="all, delete-orphan")
+    tag_links = relationship("PromptTag", cascade="all, delete-orphan")
+
+    @property
+    def tag_list(self) -> List[str]:
+        """Tags as a list, parsed from the comma-separated tags column."""
+        return [t.strip() for t in self.tags.split(',') if t.strip()] if self.tags else []
+
+
+# Prompt list order (display_order NULLS LAST, created_at DESC, id DESC), per folder
+# and across all folders. Also serves MAX(display_order) per folder.
+Index(
+    "ix_prompts_folder_id_list_order",
+    Prompt.folder_id, Prompt.display_order, Prompt.created_at.desc(), Prompt.id.desc()
+)
+Index(
+    "ix_prompts_list_order",
+    Prompt.display_order, Prompt.created_at.desc(), Prompt.id.desc()
+)
+
+
+class Tag(Base):
+    """Normalized tag (lower-cased name) for indexed tag filtering."""
+
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True)
+    # Unbounded: a single tag may be as long as the prompts.tags column allows
+    name = Column(Text, nullable=False, unique=True)
+
+
+class PromptTag(Base):
+    """Association between prompts and tags (inverted index: tag -> prompts)."""
+
+    __tablename__ = "prompt_tags"
+    __table_args__ = (
+        Index("ix_prompt_tags_tag_id_prompt_id", "tag_id", "prompt_id"),
+    )
+
+    prompt_id = Column(Integer, ForeignKey("prompts.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
 
 
 class Version(Base):
     """Version history for prompts."""
 
     __tablename__ = "versions"
+    __table_args__ = (
+        Index("ix_versions_prompt_id_version_number", "prompt_id", "version_number"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     prompt_id = Column(Integer, ForeignKey("prompts.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
     version_number = Column(Integer, nullable=False)
@@ -71,15 +155,41 @@ class ClaudeJob(Base):
     """Claude CLI enhancement jobs."""
 
     __tablename__ = "claude_jobs"
+    __table_args__ = (
+        # Unfinished jobs in submission order (requeued on startup)
+        Index("ix_claude_jobs_status_created_at", "status", "created_at"),
+        # Progress of a bulk enhancement (counts per status)
+        Index("ix_claude_jobs_batch_id_status", "batch_id", "status"),
+    )
 
     id = Column(String(50), primary_key=True)  # UUID
     prompt_id = Column(Integer, ForeignKey("prompts.id", ondelete="CASCADE"), nullable=False)
     original_content = Column(Text, nullable=False)
+    instruction = Column(Text, nullable=True)  # Custom enhancement instruction, None for the default
     enhanced_content = Column(Text, nullable=True)
     status = Column(String(20), nullable=False)  # pending, processing, completed, failed
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+    batch_id = Column(String(50), nullable=True)  # Bulk enhancement the job belongs to
+    applied_at = Column(DateTime, nullable=True)  # When the result was applied to the prompt (batch jobs)
 
     # Relationships
     prompt = relationship("Prompt", back_populates="claude_jobs")
+
+
+class EnhancementCacheEntry(Base):
+    """Cached Claude enhancement results, keyed by content hash."""
+
+    __tablename__ = "enhancement_cache"
+    __table_args__ = (
+        # Least recently used entries first (eviction)
+        Index("ix_enhancement_cache_last_used_at", "last_used_at"),
+    )
+
+    key = Column(String(64), primary_key=True)  # SHA-256 of (instruction, prompt, CLI version)
+    enhanced_content = Column(Text, nullable=False)
+    cli_version = Column(String(100), nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
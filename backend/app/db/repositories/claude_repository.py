@@ -0,0 +1,116 @@
+"""
+Claude job repository - data access layer for enhancement jobs.
+"""
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from app.db.models import ClaudeJob
+
+# Job lifecycle: pending -> processing -> completed | failed
+JOB_PENDING = "pending"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+UNFINISHED_STATUSES = (JOB_PENDING, JOB_PROCESSING)
+
+
+class ClaudeJobRepository:
+    """Repository for Claude job database operations."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize repository with database session.
+
+        Args:
+            db: SQLAlchemy database session
+        """
+        self.db = db
+
+    def get_by_id(self, job_id: str) -> Optional[ClaudeJob]:
+        """
+        Get job by ID.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            ClaudeJob object or None if not found
+        """
+        return self.db.query(ClaudeJob).filter(ClaudeJob.id == job_id).first()
+
+    def get_unfinished(self) -> List[ClaudeJob]:
+        """
+        Get jobs that are pending or processing, oldest first.
+
+        Returns:
+            List of unfinished jobs
+        """
+        return (
+            self.db.query(ClaudeJob)
+            .filter(ClaudeJob.status.in_(UNFINISHED_STATUSES))
+            .order_by(ClaudeJob.created_at)
+            .all()
+        )
+
+    def get_batch_counts(self, batch_id: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Count a batch's jobs per status with a single GROUP BY.
+
+        Args:
+            batch_id: Batch ID
+
+        Returns:
+            Dict of status -> (job count, count of jobs applied to their prompt)
+        """
+        rows = (
+            self.db.query(ClaudeJob.status, func.count(ClaudeJob.id), func.count(ClaudeJob.applied_at))
+            .filter(ClaudeJob.batch_id == batch_id)
+            .group_by(ClaudeJob.status)
+            .all()
+        )
+        return {status: (count, applied) for status, count, applied in rows}
+
+    def create(self, job: ClaudeJob) -> ClaudeJob:
+        """
+        Create a new job.
+
+        Args:
+            job: ClaudeJob object to create
+
+        Returns:
+            Created job
+        """
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def create_many(self, jobs: List[ClaudeJob]) -> List[ClaudeJob]:
+        """
+        Create several jobs in one commit.
+
+        Args:
+            jobs: ClaudeJob objects to create
+
+        Returns:
+            Created jobs
+        """
+        self.db.add_all(jobs)
+        self.db.commit()
+        return jobs
+
+    def update(self, job: ClaudeJob) -> ClaudeJob:
+        """
+        Update an existing job.
+
+        Args:
+            job: ClaudeJob object with updates
+
+        Returns:
+            Updated job
+        """
+        self.db.commit()
+        self.db.refresh(job)
+        return job
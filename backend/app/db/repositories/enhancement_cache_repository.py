@@ -0,0 +1,69 @@
+"""
+Enhancement cache repository - data access layer for cached enhancement results.
+"""
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+
+from app.db.models import EnhancementCacheEntry
+
+
+class EnhancementCacheRepository:
+    """Repository for enhancement cache database operations."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize repository with database session.
+
+        Args:
+            db: SQLAlchemy database session
+        """
+        self.db = db
+
+    def get_by_key(self, key: str) -> Optional[EnhancementCacheEntry]:
+        """
+        Get a cache entry by key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            EnhancementCacheEntry or None if not cached
+        """
+        return self.db.get(EnhancementCacheEntry, key)
+
+    def count(self) -> int:
+        """Count cache entries."""
+        return self.db.scalar(select(func.count()).select_from(EnhancementCacheEntry))
+
+    def delete_least_recently_used(self, count: int) -> int:
+        """
+        Delete the entries used longest ago (not committed).
+
+        Args:
+            count: Number of entries to delete
+
+        Returns:
+            Number of entries deleted
+        """
+        if count <= 0:
+            return 0
+        oldest = (
+            select(EnhancementCacheEntry.key)
+            .order_by(EnhancementCacheEntry.last_used_at)
+            .limit(count)
+            .scalar_subquery()
+        )
+        result = self.db.execute(
+            delete(EnhancementCacheEntry).where(EnhancementCacheEntry.key.in_(oldest))
+        )
+        return result.rowcount
+
+    def delete_all(self) -> int:
+        """
+        Delete every cache entry (not committed).
+
+        Returns:
+            Number of entries deleted
+        """
+        return self.db.execute(delete(EnhancementCacheEntry)).rowcount
@@ -1,10 +1,12 @@
 """
 Folder repository - data access layer for folders.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import delete, func, insert, literal, select, union_all, update
 
-from app.db.models import Folder
+from app.db.models import ClaudeJob, Folder, FolderClosure, FolderTreeGeneration, Prompt, PromptTag, Version
+from app.db.repositories.ordering import reorder_rows
 
 
 class FolderRepository:
@@ -24,9 +26,20 @@ class FolderRepository:
         Get all folders.
 
         Returns:
-            List of all folders
+            List of all folders ordered by display_order
         """
-        return self.db.query(Folder).all()
+        return (self.db.query(Folder)
+                .order_by(Folder.display_order.asc().nulls_last(), Folder.created_at.asc())
+                .all())
+
+    def get_parent_map(self) -> Dict[int, Optional[int]]:
+        """
+        Get the parent of every folder.
+
+        Returns:
+            Dict of folder ID -> parent folder ID (None for top-level folders)
+        """
+        return dict(self.db.query(Folder.id, Folder.parent_id).all())
 
     def get_by_id(self, folder_id: int) -> Optional[Folder]:
         """
@@ -71,6 +84,9 @@ class FolderRepository:
             Created folder
         """
         self.db.add(folder)
+        self.db.flush()
+        self._insert_closure(folder.id, folder.parent_id)
+        self.bump_tree_generation()
         self.db.commit()
         self.db.refresh(folder)
         return folder
@@ -85,19 +101,197 @@ class FolderRepository:
         Returns:
             Updated folder
         """
+        self.bump_tree_generation()
         self.db.commit()
         self.db.refresh(folder)
         return folder
 
+    def reorder(self, folders: List[Folder], folder_id: int, new_position: int) -> List[Folder]:
+        """
+        Move a folder among its siblings and save the new display_order values in one statement.
+
+        Args:
+            folders: Sibling folders in their current order
+            folder_id: ID of the folder to move
+            new_position: New position (0-based index)
+
+        Returns:
+            Sibling folders in their new order
+        """
+        self.bump_tree_generation()
+        return reorder_rows(self.db, Folder.display_order, folders, folder_id, new_position)
+
+    def get_tree_generation(self) -> int:
+        """
+        Get the folder tree generation shared by every worker process.
+
+        Returns:
+            Current generation (0 if the counter row is missing)
+        """
+        generation = self.db.query(FolderTreeGeneration.generation).filter(FolderTreeGeneration.id == 1).scalar()
+        return generation or 0
+
+    def bump_tree_generation(self) -> None:
+        """
+        Mark the folder tree as changed, without committing.
+
+        Runs inside the caller's transaction, so the new generation becomes
+        visible together with the folder change it belongs to.
+        """
+        result = self.db.execute(
+            update(FolderTreeGeneration)
+            .where(FolderTreeGeneration.id == 1)
+            .values(generation=FolderTreeGeneration.generation + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            self.db.add(FolderTreeGeneration(id=1, generation=1))
+            self.db.flush()
+
     def delete(self, folder: Folder) -> None:
         """
-        Delete a folder.
+        Delete a folder with all its descendants and their prompts.
+
+        Selects the subtree from the closure table in a subquery and removes
+        it with one set-based DELETE per table.
 
         Args:
             folder: Folder object to delete
         """
-        self.db.delete(folder)
+        folder_ids = select(FolderClosure.descendant_id).where(FolderClosure.ancestor_id == folder.id)
+        prompt_ids = select(Prompt.id).where(Prompt.folder_id.in_(folder_ids))
+
+        # The session is cleared afterwards, so it needs no synchronizing
+        for statement in (
+            delete(Version).where(Version.prompt_id.in_(prompt_ids)),
+            delete(ClaudeJob).where(ClaudeJob.prompt_id.in_(prompt_ids)),
+            delete(PromptTag).where(PromptTag.prompt_id.in_(prompt_ids)),
+            delete(Prompt).where(Prompt.folder_id.in_(folder_ids)),
+            delete(Folder).where(Folder.id.in_(folder_ids)),
+            # Last, since the subtree subquery reads it (the foreign key may have cascaded already)
+            delete(FolderClosure).where(FolderClosure.descendant_id.in_(folder_ids)),
+        ):
+            self.db.execute(statement.execution_options(synchronize_session=False))
+        self.bump_tree_generation()
         self.db.commit()
+        self.db.expunge_all()
+
+    def get_subtree_ids(self, folder_id: int) -> List[int]:
+        """
+        Get the IDs of a folder and all of its descendants.
+
+        Args:
+            folder_id: Folder ID
+
+        Returns:
+            List of folder IDs (including folder_id itself)
+        """
+        return [
+            row[0] for row in self.db.query(FolderClosure.descendant_id)
+            .filter(FolderClosure.ancestor_id == folder_id)
+            .all()
+        ]
+
+    def is_descendant(self, folder_id: int, ancestor_id: int) -> bool:
+        """
+        Check whether a folder is inside another folder's subtree.
+
+        Args:
+            folder_id: Folder to check
+            ancestor_id: Root of the subtree
+
+        Returns:
+            True if folder_id is ancestor_id or one of its descendants
+        """
+        return self.db.query(FolderClosure).filter(
+            FolderClosure.ancestor_id == ancestor_id,
+            FolderClosure.descendant_id == folder_id
+        ).first() is not None
+
+    def move_subtree(self, folder_id: int, new_parent_id: Optional[int]) -> None:
+        """
+        Re-link a folder's subtree under a new parent in the closure table (not committed).
+
+        Args:
+            folder_id: Root of the subtree being moved
+            new_parent_id: New parent folder ID (None for top level)
+        """
+        subtree_ids = select(FolderClosure.descendant_id).where(
+            FolderClosure.ancestor_id == folder_id
+        )
+
+        # Drop links from the old ancestors into the subtree
+        self.db.execute(
+            delete(FolderClosure)
+            .where(FolderClosure.descendant_id.in_(subtree_ids))
+            .where(FolderClosure.ancestor_id.not_in(subtree_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+        if new_parent_id is None:
+            return
+
+        # Link every ancestor of the new parent to every node of the subtree
+        supertree = aliased(FolderClosure)
+        subtree = aliased(FolderClosure)
+        self.db.execute(
+            insert(FolderClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(
+                    supertree.ancestor_id,
+                    subtree.descendant_id,
+                    supertree.depth + subtree.depth + 1
+                )
+                .select_from(supertree)
+                .join(subtree, subtree.ancestor_id == folder_id)
+                .where(supertree.descendant_id == new_parent_id)
+            )
+        )
+
+    def rewrite_subtree_paths(self, folder_id: int, old_path: str, new_path: str) -> None:
+        """
+        Rewrite the path of a folder and all its descendants in one UPDATE (not committed).
+
+        Args:
+            folder_id: Root of the subtree
+            old_path: Current path of the folder
+            new_path: New path of the folder
+        """
+        self.db.flush()
+
+        old_prefix = old_path.rstrip("/")
+        new_prefix = new_path.rstrip("/")
+        descendant_ids = select(FolderClosure.descendant_id).where(
+            FolderClosure.ancestor_id == folder_id,
+            FolderClosure.depth > 0
+        )
+
+        self.db.query(Folder).filter(Folder.id == folder_id).update(
+            {Folder.path: new_path}, synchronize_session=False
+        )
+        # path = :new || substr(path, len(:old) + 1); descendants are selected through
+        # the closure table rather than LIKE :old || '/%', which is case-insensitive
+        # in SQLite and would also match names containing % or _
+        self.db.query(Folder).filter(Folder.id.in_(descendant_ids)).update(
+            {Folder.path: literal(new_prefix) + func.substr(Folder.path, len(old_prefix) + 1)},
+            synchronize_session=False
+        )
+
+    def _insert_closure(self, folder_id: int, parent_id: Optional[int]) -> None:
+        """Add closure rows for a new leaf folder: itself plus every ancestor of its parent."""
+        rows = select(
+            literal(folder_id), literal(folder_id), literal(0)
+        )
+        if parent_id is not None:
+            rows = union_all(
+                rows,
+                select(
+                    FolderClosure.ancestor_id, literal(folder_id), FolderClosure.depth + 1
+                ).where(FolderClosure.descendant_id == parent_id)
+            )
+        self.db.execute(
+            insert(FolderClosure).from_select(["ancestor_id", "descendant_id", "depth"], rows)
+        )
 
     def exists_by_name_and_parent(self, name: str, parent_id: Optional[int]) -> bool:
         """
@@ -0,0 +1,98 @@
+"""
+Ordered-list reorder primitive shared by repositories.
+
+Moves one row within a user-sorted list and persists the resulting order in
+a single ``UPDATE ... SET <column> = CASE id WHEN ... END`` statement.
+"""
+from datetime import datetime
+from typing import Dict, List, TypeVar
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+T = TypeVar("T")
+
+
+def move_item(items: List[T], item_id: int, new_position: int) -> List[T]:
+    """
+    Return a copy of items with the item whose id is item_id moved to new_position.
+
+    Args:
+        items: Rows in their current order
+        item_id: ID of the row to move
+        new_position: Target index (clamped to the list bounds)
+
+    Returns:
+        Rows in their new order
+    """
+    ordered = list(items)
+    if not ordered:
+        return ordered
+
+    new_position = max(0, min(new_position, len(ordered) - 1))
+    current_position = next((i for i, item in enumerate(ordered) if item.id == item_id), None)
+    if current_position is not None and current_position != new_position:
+        ordered.insert(new_position, ordered.pop(current_position))
+    return ordered
+
+
+def reorder_rows(
+    db: Session,
+    column,
+    items: List[T],
+    item_id: int,
+    new_position: int,
+    start: int = 0
+) -> List[T]:
+    """
+    Move a row within an ordered list and renumber the list in one transaction.
+
+    Only rows whose position value changes are written, all with one
+    UPDATE ... CASE statement. The returned rows carry their new values and
+    are detached from the session, so serializing them does not re-read rows.
+
+    Args:
+        db: SQLAlchemy database session
+        column: Order column (e.g. Folder.display_order)
+        items: Rows in their current order (all loaded through db)
+        item_id: ID of the row to move
+        new_position: Target index (0-based, clamped to the list bounds)
+        start: Order value of the first position
+
+    Returns:
+        Rows in their new order
+    """
+    ordered = move_item(items, item_id, new_position)
+    model = column.class_
+    key = column.key
+
+    changes: Dict[int, int] = {
+        item.id: position
+        for position, item in enumerate(ordered, start=start)
+        if getattr(item, key) != position
+    }
+
+    if changes:
+        now = datetime.utcnow()
+        values = {key: case(changes, value=model.id)}
+        if hasattr(model, "updated_at"):
+            values["updated_at"] = now
+        db.execute(
+            update(model)
+            .where(model.id.in_(changes.keys()))
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+
+        for item in ordered:
+            if item.id in changes:
+                set_committed_value(item, key, changes[item.id])
+                if "updated_at" in values:
+                    set_committed_value(item, "updated_at", now)
+
+    # Detach so the commit does not expire (and later re-load) every row
+    for item in ordered:
+        db.expunge(item)
+    db.commit()
+    return ordered
@@ -1,11 +1,31 @@
 """
 Prompt repository - data access layer for prompts.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
-
-from app.db.models import Prompt, Version
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import String, and_, cast, desc, func, literal, or_, select, union_all, update
+
+from app.core.ordering import ORDER_KEY_STEP
+from app.db import search_index
+from app.db.models import FolderClosure, Prompt, PromptTag, Tag, Version
+from app.db.repositories.ordering import reorder_rows
+from app.db.repositories.tag_repository import TagRepository
+
+# Columns loaded for summary list views (everything except content columns)
+SUMMARY_COLUMNS = (
+    Prompt.id,
+    Prompt.folder_id,
+    Prompt.title,
+    Prompt.description,
+    Prompt.tags,
+    Prompt.is_ai_enhanced,
+    Prompt.is_easy_access,
+    Prompt.easy_access_order,
+    Prompt.display_order,
+    Prompt.created_at,
+    Prompt.updated_at,
+)
 
 
 class PromptRepository:
@@ -23,40 +43,207 @@ class PromptRepository:
     def get_all(
         self,
         folder_id: Optional[int] = None,
-        limit: int = 50,
-        offset: int = 0
-    ) -> tuple[List[Prompt], int]:
+        limit: Optional[int] = 50,
+        offset: int = 0,
+        after: Optional[tuple] = None,
+        with_total: bool = True,
+        summary: bool = False
+    ) -> tuple[List[Prompt], Optional[int]]:
         """
         Get prompts with optional folder filter and pagination.
 
         Prompts are ordered by display_order (ascending), then by created_at (descending)
-        for prompts without a display_order.
+        for prompts without a display_order, with id (descending) as a tie-breaker.
 
         Args:
             folder_id: Filter by folder ID
-            limit: Number of results
-            offset: Pagination offset
+            limit: Number of results (None for all)
+            offset: Pagination offset (ignored when after is given)
+            after: Keyset position (display_order, created_at, id) of the last row
+                   of the previous page
+            with_total: Whether to count all matching rows
+            summary: Load only SUMMARY_COLUMNS (content columns stay unloaded)
 
         Returns:
-            Tuple of (prompts list, total count)
+            Tuple of (prompts list, total count or None if not requested)
         """
         query = self.db.query(Prompt)
+        if summary:
+            query = query.options(load_only(*SUMMARY_COLUMNS))
 
         if folder_id is not None:
             query = query.filter(Prompt.folder_id == folder_id)
 
-        total = query.count()
+        total = self._count(query) if with_total else None
+
+        if after is not None:
+            query = query.filter(self._after_list_position(*after))
+            offset = 0
 
         # Order by display_order first (NULLs last), then by created_at descending
         # This ensures custom-ordered prompts appear first in their order,
         # followed by newly created prompts without display_order
         prompts = query.order_by(
             Prompt.display_order.asc().nullslast(),
-            desc(Prompt.created_at)
+            desc(Prompt.created_at),
+            desc(Prompt.id)
         ).offset(offset).limit(limit).all()
 
         return prompts, total
 
+    def get_order_keys(self, folder_id: int) -> List[tuple[int, Optional[float]]]:
+        """
+        Get the IDs and display_order keys of a folder's prompts in list order.
+
+        Args:
+            folder_id: Folder ID
+
+        Returns:
+            List of (prompt ID, display_order) tuples
+        """
+        return [
+            (prompt_id, display_order)
+            for prompt_id, display_order in self.db.query(Prompt.id, Prompt.display_order)
+            .filter(Prompt.folder_id == folder_id)
+            .order_by(
+                Prompt.display_order.asc().nullslast(),
+                desc(Prompt.created_at),
+                desc(Prompt.id)
+            )
+            .all()
+        ]
+
+    def get_order_key_at(self, folder_id: int, position: int, exclude_id: int) -> Optional[float]:
+        """
+        Get the display_order key at a position of a folder's list, leaving one prompt out.
+
+        Read from the (folder_id, display_order) index without loading prompt rows.
+
+        Args:
+            folder_id: Folder ID
+            position: 0-based position in list order
+            exclude_id: Prompt not counted (the one being moved)
+
+        Returns:
+            Key at the position, or None past the end of the list
+        """
+        return (self.db.query(Prompt.display_order)
+                .filter(Prompt.folder_id == folder_id, Prompt.id != exclude_id)
+                .order_by(
+                    Prompt.display_order.asc().nullslast(),
+                    desc(Prompt.created_at),
+                    desc(Prompt.id)
+                )
+                .offset(position)
+                .limit(1)
+                .scalar())
+
+    def get_order_key_before(self, folder_id: int, key: Optional[float], exclude_id: int) -> Optional[float]:
+        """
+        Get the largest display_order key of a folder below a key.
+
+        Args:
+            folder_id: Folder ID
+            key: Upper bound (exclusive); None for the largest key of the folder
+            exclude_id: Prompt not considered (the one being moved)
+
+        Returns:
+            Preceding key, or None if there is none
+        """
+        query = self.db.query(Prompt.display_order).filter(
+            Prompt.folder_id == folder_id,
+            Prompt.id != exclude_id,
+            Prompt.display_order.is_not(None)
+        )
+        if key is not None:
+            query = query.filter(Prompt.display_order < key)
+        return query.order_by(Prompt.display_order.desc()).limit(1).scalar()
+
+    def has_unkeyed_prompts(self, folder_id: int) -> bool:
+        """
+        Check whether any prompt in a folder has no display_order key yet.
+
+        Args:
+            folder_id: Folder ID
+
+        Returns:
+            True if a prompt's display_order is NULL
+        """
+        return (self.db.query(Prompt.id)
+                .filter(Prompt.folder_id == folder_id, Prompt.display_order.is_(None))
+                .first()) is not None
+
+    def get_max_display_order(self, folder_id: int) -> Optional[float]:
+        """
+        Get the largest display_order key in a folder.
+
+        Answered from the (folder_id, display_order) index without reading prompt rows.
+
+        Args:
+            folder_id: Folder ID
+
+        Returns:
+            Largest key, or None if no prompt in the folder has one
+        """
+        return (self.db.query(func.max(Prompt.display_order))
+                .filter(Prompt.folder_id == folder_id)
+                .scalar())
+
+    def set_display_order(self, prompt_id: int, display_order: float) -> None:
+        """
+        Write the display_order key of a single prompt.
+
+        Args:
+            prompt_id: Prompt ID
+            display_order: New order key
+        """
+        self.db.execute(
+            update(Prompt)
+            .where(Prompt.id == prompt_id)
+            .values(display_order=display_order)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def rebalance_display_order(self, folder_id: int) -> int:
+        """
+        Renumber a folder's display_order keys to evenly spaced values, keeping the order.
+
+        Prompts without a key get one after the keyed prompts.
+
+        Args:
+            folder_id: Folder ID
+
+        Returns:
+            Number of prompts renumbered
+        """
+        rows = [
+            {"id": prompt_id, "display_order": (i + 1) * ORDER_KEY_STEP}
+            for i, (prompt_id, _) in enumerate(self.get_order_keys(folder_id))
+        ]
+        if rows:
+            self.db.execute(update(Prompt), rows)
+        self.db.commit()
+        return len(rows)
+
+    def _count(self, query) -> int:
+        """Count rows matched by a prompt query without selecting its columns."""
+        return query.with_entities(func.count(Prompt.id)).order_by(None).scalar()
+
+    def _after_list_position(self, display_order, created_at, prompt_id):
+        """Keyset predicate for rows after (display_order, created_at, id) in list order."""
+        tie_break = or_(
+            Prompt.created_at < created_at,
+            and_(Prompt.created_at == created_at, Prompt.id < prompt_id)
+        )
+        if display_order is None:
+            return and_(Prompt.display_order.is_(None), tie_break)
+        return or_(
+            Prompt.display_order > display_order,
+            Prompt.display_order.is_(None),
+            and_(Prompt.display_order == display_order, tie_break)
+        )
+
     def get_by_id(self, prompt_id: int) -> Optional[Prompt]:
         """
         Get prompt by ID with versions.
@@ -143,11 +330,21 @@ class PromptRepository:
         created_after: Optional[str] = None,
         created_before: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
-    ) -> tuple[List[Prompt], int]:
+        offset: int = 0,
+        sort: str = "relevance",
+        after: Optional[tuple] = None,
+        with_total: bool = True,
+        match_all_tags: bool = True
+    ) -> tuple[List[tuple[Prompt, Optional[str], Optional[str]]], Optional[int]]:
         """
         Search prompts by query string with optional filters.
 
+        Uses the full-text index (FTS5 BM25 on SQLite, tsvector ts_rank_cd on
+        PostgreSQL) when it is available, otherwise falls back to ILIKE scans
+        ordered by most recently updated. With the index, the marked-up title
+        and best content fragment are computed in the same query (see
+        search_index.parse_marked_text).
+
         Args:
             query: Search query (searches title, description, content, tags)
             folder_id: Optional folder filter
@@ -155,16 +352,135 @@ class PromptRepository:
             created_after: Optional date filter (ISO format: YYYY-MM-DD)
             created_before: Optional date filter (ISO format: YYYY-MM-DD)
             limit: Number of results
-            offset: Pagination offset
+            offset: Pagination offset (ignored when after is given)
+            sort: "relevance" (index rank when indexed) or "updated" (updated_at, id descending)
+            after: Keyset position (updated_at, id) of the last row of the
+                   previous page; only valid with sort="updated"
+            with_total: Whether to count all matching rows
+            match_all_tags: Require every tag (AND) rather than any tag (OR)
 
         Returns:
-            Tuple of (prompts list, total count)
+            Tuple of ([(prompt, marked title, marked snippet)], total count or None).
+            The marked values are None when the index was not used.
+            Prompts are loaded without original_content, and without content
+            when the index supplies the snippet.
         """
-        from datetime import datetime
+        match_expression = self._match_expression(query)
+
+        columns = SUMMARY_COLUMNS if match_expression else SUMMARY_COLUMNS + (Prompt.content,)
+        db_query = self.db.query(Prompt).options(load_only(*columns))
+
+        db_query = self._apply_text_search(db_query, query, match_expression)
+        db_query = self._apply_search_filters(
+            db_query, folder_id, tags, created_after, created_before, match_all_tags
+        )
+
+        total = self._count(db_query) if with_total else None
+
+        if after is not None:
+            updated_at, prompt_id = after
+            db_query = db_query.filter(or_(
+                Prompt.updated_at < updated_at,
+                and_(Prompt.updated_at == updated_at, Prompt.id < prompt_id)
+            ))
+            offset = 0
+
+        if match_expression and sort == "relevance":
+            order = (
+                search_index.relevance_order(match_expression, self._dialect()),
+                desc(Prompt.updated_at),
+                desc(Prompt.id)
+            )
+        else:
+            order = (desc(Prompt.updated_at), desc(Prompt.id))
+
+        if match_expression:
+            db_query = db_query.add_columns(
+                search_index.title_highlight(match_expression, self._dialect()),
+                search_index.content_snippet(match_expression, self._dialect())
+            ).order_by(*order)
+            rows = [tuple(row) for row in db_query.offset(offset).limit(limit).all()]
+        else:
+            prompts = db_query.order_by(*order).offset(offset).limit(limit).all()
+            rows = [(prompt, None, None) for prompt in prompts]
+
+        return rows, total
+
+    def get_search_facets(
+        self,
+        query: str,
+        folder_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        match_all_tags: bool = True,
+        date_bucket: str = "month"
+    ) -> Dict[str, List[tuple[str, int]]]:
+        """
+        Count search matches per folder, tag and created-date bucket.
+
+        The matching prompts are selected once (as a CTE) and all three
+        GROUP BY aggregates are computed over it in a single statement.
 
-        db_query = self.db.query(Prompt)
+        Args:
+            query: Search query
+            folder_id: Optional folder filter
+            tags: Optional tag filters
+            created_after: Optional date filter (ISO format: YYYY-MM-DD)
+            created_before: Optional date filter (ISO format: YYYY-MM-DD)
+            match_all_tags: Require every tag (AND) rather than any tag (OR)
+            date_bucket: "day", "month" or "year"
 
+        Returns:
+            Dict with keys "folder", "tag" and "date", each a list of
+            (key, count). Folder keys are folder IDs as strings.
+        """
+        match_expression = self._match_expression(query)
+
+        db_query = self.db.query(
+            Prompt.id.label("id"),
+            Prompt.folder_id.label("folder_id"),
+            Prompt.created_at.label("created_at")
+        )
+        db_query = self._apply_text_search(db_query, query, match_expression)
+        db_query = self._apply_search_filters(
+            db_query, folder_id, tags, created_after, created_before, match_all_tags
+        )
+        matched = db_query.cte("matched")
+
+        bucket = self._date_bucket(matched.c.created_at, date_bucket)
+        facets_query = union_all(
+            select(literal("folder"), cast(matched.c.folder_id, String), func.count())
+            .group_by(matched.c.folder_id),
+            select(literal("tag"), Tag.name, func.count())
+            .select_from(matched)
+            .join(PromptTag, PromptTag.prompt_id == matched.c.id)
+            .join(Tag, Tag.id == PromptTag.tag_id)
+            .group_by(Tag.name),
+            select(literal("date"), bucket, func.count())
+            .group_by(bucket)
+        )
+
+        facets = {"folder": [], "tag": [], "date": []}
+        for kind, key, count in self.db.execute(facets_query):
+            facets[kind].append((key, count))
+        return facets
+
+    def _dialect(self) -> str:
+        """Dialect name of the session's database ("sqlite", "postgresql")."""
+        return self.db.get_bind().dialect.name
+
+    def _match_expression(self, query: str) -> Optional[str]:
+        """Full-text match expression for the query, or None if the index can't be used."""
+        if query and search_index.is_available(self.db):
+            return search_index.build_match_expression(query, self._dialect())
+        return None
+
+    def _apply_text_search(self, db_query, query: str, match_expression: Optional[str]):
+        """Restrict a prompt query to text matches (full-text index or ILIKE fallback)."""
         # Search across title, description, content, and tags
+        if match_expression:
+            return search_index.apply_match(db_query, match_expression, self._dialect())
         if query:
             search_filter = or_(
                 Prompt.title.ilike(f"%{query}%"),
@@ -172,16 +488,35 @@ class PromptRepository:
                 Prompt.content.ilike(f"%{query}%"),
                 Prompt.tags.ilike(f"%{query}%")
             )
-            db_query = db_query.filter(search_filter)
-
+            return db_query.filter(search_filter)
+        return db_query
+
+    def _date_bucket(self, column, date_bucket: str):
+        """SQL expression truncating a datetime column to a day/month/year label."""
+        if self._dialect() == "postgresql":
+            formats = {"day": "YYYY-MM-DD", "month": "YYYY-MM", "year": "YYYY"}
+            return func.to_char(column, formats[date_bucket])
+        formats = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+        return func.strftime(formats[date_bucket], column)
+
+    def _apply_search_filters(
+        self,
+        db_query,
+        folder_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        match_all_tags: bool = True
+    ):
+        """Apply the non-text search filters (folder, tags, created date range)."""
         # Filter by folder
         if folder_id is not None:
             db_query = db_query.filter(Prompt.folder_id == folder_id)
 
-        # Filter by tags
-        if tags:
-            for tag in tags:
-                db_query = db_query.filter(Prompt.tags.ilike(f"%{tag}%"))
+        # Filter by tags through the prompt_tags index (exact, case-insensitive)
+        if tags and any(t.strip() for t in tags):
+            tagged = TagRepository(self.db).tagged_prompt_ids(tags, match_all_tags)
+            db_query = db_query.filter(Prompt.id.in_(tagged))
 
         # Filter by created_after date
         if created_after:
@@ -196,16 +531,43 @@ class PromptRepository:
             try:
                 before_date = datetime.fromisoformat(created_before)
                 # Add one day to include the entire before_date day
-                from datetime import timedelta
                 before_date = before_date + timedelta(days=1)
                 db_query = db_query.filter(Prompt.created_at < before_date)
             except ValueError:
                 pass  # Ignore invalid date format
 
-        total = db_query.count()
-        prompts = db_query.order_by(desc(Prompt.updated_at)).offset(offset).limit(limit).all()
+        return db_query
 
-        return prompts, total
+    def get_in_subtree(self, folder_id: int) -> List[Prompt]:
+        """
+        Get every prompt in a folder and its descendants (via the closure table).
+
+        Args:
+            folder_id: Root folder of the subtree
+
+        Returns:
+            List of prompts, grouped by folder
+        """
+        subtree_ids = select(FolderClosure.descendant_id).where(FolderClosure.ancestor_id == folder_id)
+        return (
+            self.db.query(Prompt)
+            .filter(Prompt.folder_id.in_(subtree_ids))
+            .order_by(Prompt.folder_id, Prompt.display_order, Prompt.created_at)
+            .all()
+        )
+
+    def count_by_folder(self) -> Dict[int, int]:
+        """
+        Count prompts directly in each folder with a single GROUP BY.
+
+        Returns:
+            Dict of folder ID -> prompt count (folders without prompts are omitted)
+        """
+        return dict(
+            self.db.query(Prompt.folder_id, func.count(Prompt.id))
+            .group_by(Prompt.folder_id)
+            .all()
+        )
 
     def count_easy_access(self) -> int:
         """
@@ -216,14 +578,34 @@ class PromptRepository:
         """
         return self.db.query(Prompt).filter(Prompt.is_easy_access == True).count()
 
-    def get_easy_access_prompts(self) -> List[Prompt]:
+    def reorder_easy_access(self, prompts: List[Prompt], prompt_id: int, new_position: int) -> List[Prompt]:
+        """
+        Move an easy access prompt and save the new easy_access_order values in one statement.
+
+        Args:
+            prompts: Easy access prompts in their current order
+            prompt_id: ID of the prompt to move
+            new_position: New position (0-based index)
+
+        Returns:
+            Easy access prompts in their new order (easy_access_order is 1-based)
+        """
+        return reorder_rows(self.db, Prompt.easy_access_order, prompts, prompt_id, new_position, start=1)
+
+    def get_easy_access_prompts(self, summary: bool = False) -> List[Prompt]:
         """
         Get all prompts marked as easy access.
 
+        Args:
+            summary: Load only SUMMARY_COLUMNS (content columns stay unloaded)
+
         Returns:
             List of easy access prompts ordered by easy_access_order, then title (max 8)
         """
-        return self.db.query(Prompt).filter(
+        query = self.db.query(Prompt)
+        if summary:
+            query = query.options(load_only(*SUMMARY_COLUMNS))
+        return query.filter(
             Prompt.is_easy_access == True
         ).order_by(
             Prompt.easy_access_order.asc().nulls_last(),
@@ -0,0 +1,112 @@
+"""
+Tag repository - data access layer for normalized prompt tags.
+"""
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import desc, func, select
+
+from app.db.models import Tag, PromptTag
+
+
+def normalize_tag_name(tag: str) -> str:
+    """Normalize a tag for indexing and matching (trimmed, lower-cased)."""
+    return tag.strip().lower()
+
+
+class TagRepository:
+    """Repository for tag database operations."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize repository with database session.
+
+        Args:
+            db: SQLAlchemy database session
+        """
+        self.db = db
+
+    def get_or_create_many(self, names: Iterable[str]) -> Dict[str, Tag]:
+        """
+        Get tags by normalized name, creating any that do not exist yet.
+
+        Args:
+            names: Normalized tag names
+
+        Returns:
+            Dict of name -> Tag
+        """
+        names = set(names)
+        if not names:
+            return {}
+
+        existing = {
+            tag.name: tag
+            for tag in self.db.query(Tag).filter(Tag.name.in_(names)).all()
+        }
+        for name in names - existing.keys():
+            tag = Tag(name=name)
+            self.db.add(tag)
+            existing[name] = tag
+        self.db.flush()
+        return existing
+
+    def set_prompt_tags(self, prompt_id: int, tags: Optional[List[str]]) -> None:
+        """
+        Replace the tag links of a prompt (not committed).
+
+        Args:
+            prompt_id: Prompt ID
+            tags: Tag names as entered by the user
+        """
+        names = {normalize_tag_name(t) for t in tags or [] if t.strip()}
+        tag_ids = {tag.id for tag in self.get_or_create_many(names).values()}
+
+        current = {
+            link.tag_id: link
+            for link in self.db.query(PromptTag).filter(PromptTag.prompt_id == prompt_id).all()
+        }
+        for tag_id, link in current.items():
+            if tag_id not in tag_ids:
+                self.db.delete(link)
+        for tag_id in tag_ids - current.keys():
+            self.db.add(PromptTag(prompt_id=prompt_id, tag_id=tag_id))
+
+    def tagged_prompt_ids(self, tags: List[str], match_all: bool = True):
+        """
+        Build a subquery of prompt IDs carrying the given tags.
+
+        Args:
+            tags: Tag names to filter by
+            match_all: True to require every tag (AND), False for any tag (OR)
+
+        Returns:
+            SQLAlchemy select of prompt IDs
+        """
+        names = {normalize_tag_name(t) for t in tags if t.strip()}
+        query = (select(PromptTag.prompt_id)
+                 .join(Tag, Tag.id == PromptTag.tag_id)
+                 .where(Tag.name.in_(names)))
+        if match_all and len(names) > 1:
+            query = (query.group_by(PromptTag.prompt_id)
+                     .having(func.count(PromptTag.tag_id) == len(names)))
+        return query
+
+    def get_tag_counts(self, prompt_ids=None) -> List[tuple[str, int]]:
+        """
+        Count prompts per tag.
+
+        Args:
+            prompt_ids: Optional subquery restricting which prompts are counted
+
+        Returns:
+            List of (tag name, prompt count), most used first
+        """
+        count = func.count(PromptTag.prompt_id)
+        query = (self.db.query(Tag.name, count)
+                 .join(PromptTag, PromptTag.tag_id == Tag.id))
+        if prompt_ids is not None:
+            query = query.filter(PromptTag.prompt_id.in_(prompt_ids))
+        return [
+            (name, total)
+            for name, total in query.group_by(Tag.id, Tag.name).order_by(desc(count), Tag.name).all()
+        ]
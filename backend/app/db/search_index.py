@@ -0,0 +1,395 @@
+"""
+Full-text search index for prompts.
+
+On SQLite builds that ship FTS5, prompts are mirrored into the ``prompts_fts``
+external-content virtual table, kept in sync by triggers on ``prompts``.
+On PostgreSQL, ``prompts.search_vector`` is a generated, weighted ``tsvector``
+column with a GIN index. When neither is available the repository falls back
+to ``ILIKE`` scans.
+
+Query helpers take the dialect name of the session's engine and build the
+matching SQL for either backend.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, desc, func, inspect, literal_column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+FTS_TABLE = "prompts_fts"
+
+# BM25 column weights: title, description, content, tags
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 3.0)
+
+# PostgreSQL: text search configuration, tsvector column and its GIN index.
+# prompt_search is "simple" (no stemming or stop words, like FTS5 unicode61)
+# plus unaccent where the extension is available, so "cafe" matches "café".
+TS_CONFIG = "prompt_search"
+TS_VECTOR_COLUMN = "search_vector"
+TS_VECTOR_INDEX = "ix_prompts_search_vector"
+
+# ts_rank_cd weights for the D, C, B, A labels (content, tags, description,
+# title), scaled from BM25_WEIGHTS so both backends rank alike
+TS_RANK_WEIGHTS = tuple(weight / max(BM25_WEIGHTS) for weight in (
+    BM25_WEIGHTS[2], BM25_WEIGHTS[3], BM25_WEIGHTS[1], BM25_WEIGHTS[0]
+))
+
+CREATE_TS_VECTOR_STATEMENTS = [
+    f"""
+    ALTER TABLE prompts ADD COLUMN IF NOT EXISTS {TS_VECTOR_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(tags, '')), 'C') ||
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(content, '')), 'D')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS {TS_VECTOR_INDEX} ON prompts USING GIN ({TS_VECTOR_COLUMN})",
+]
+
+# Lightweight table handle for joining against the virtual table.
+# Kept on its own MetaData so create_all() never tries to create it.
+prompts_fts = Table(
+    FTS_TABLE,
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("title", Text),
+    Column("description", Text),
+    Column("content", Text),
+    Column("tags", Text),
+)
+
+CREATE_FTS_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content, tags,
+        content='prompts',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS prompts_fts_ai AFTER INSERT ON prompts BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, content, tags)
+        VALUES (new.id, new.title, new.description, new.content, new.tags);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS prompts_fts_ad AFTER DELETE ON prompts BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, content, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.content, old.tags);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS prompts_fts_au
+    AFTER UPDATE OF title, description, content, tags ON prompts BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, content, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.content, old.tags);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, content, tags)
+        VALUES (new.id, new.title, new.description, new.content, new.tags);
+    END
+    """,
+]
+
+# Cache of "is the index usable" per database URL
+_availability: Dict[str, bool] = {}
+
+
+def fts5_supported(connection: Connection) -> bool:
+    """Check whether the SQLite library behind the connection was built with FTS5."""
+    if connection.dialect.name != "sqlite":
+        return False
+    rows = connection.execute(text("PRAGMA compile_options")).fetchall()
+    return any(row[0] == "ENABLE_FTS5" for row in rows)
+
+
+def create_ts_config(connection: Connection) -> None:
+    """Create the PostgreSQL text search configuration used by the tsvector column."""
+    if connection.execute(
+        text("SELECT 1 FROM pg_ts_config WHERE cfgname = :name"), {"name": TS_CONFIG}
+    ).first() is not None:
+        return
+
+    connection.execute(text(f"CREATE TEXT SEARCH CONFIGURATION {TS_CONFIG} (COPY = simple)"))
+
+    unaccent_available = connection.execute(
+        text("SELECT 1 FROM pg_available_extensions WHERE name = 'unaccent'")
+    ).first() is not None
+    if unaccent_available:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+        connection.execute(text(
+            f"ALTER TEXT SEARCH CONFIGURATION {TS_CONFIG} "
+            f"ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple"
+        ))
+    else:
+        print("[WARNING] unaccent extension not available - search will be accent-sensitive")
+
+
+def create_search_index(connection: Connection) -> bool:
+    """
+    Create the full-text index for the connection's database.
+
+    On SQLite: the FTS5 table and sync triggers, populated from existing
+    prompts. On PostgreSQL: the generated tsvector column and its GIN index.
+
+    Args:
+        connection: SQLAlchemy connection (inside a transaction)
+
+    Returns:
+        True if the index exists after the call, False if it is unavailable
+    """
+    if connection.dialect.name == "postgresql":
+        create_ts_config(connection)
+        for statement in CREATE_TS_VECTOR_STATEMENTS:
+            connection.execute(text(statement))
+        _availability[str(connection.engine.url)] = True
+        return True
+
+    if not fts5_supported(connection):
+        return False
+
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE}
+    ).first() is not None
+
+    for statement in CREATE_FTS_STATEMENTS:
+        connection.execute(text(statement))
+
+    if not exists:
+        # Index every prompt that was created before the table existed
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+    _availability[str(connection.engine.url)] = True
+    return True
+
+
+def is_available(db: Session) -> bool:
+    """
+    Check whether the full-text index can be queried through this session.
+
+    Args:
+        db: SQLAlchemy database session
+
+    Returns:
+        True if prompts_fts (SQLite) or prompts.search_vector (PostgreSQL) exists
+    """
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _availability:
+        if bind.dialect.name == "postgresql":
+            columns = inspect(db.connection()).get_columns("prompts")
+            _availability[key] = any(column["name"] == TS_VECTOR_COLUMN for column in columns)
+        elif bind.dialect.name != "sqlite":
+            _availability[key] = False
+        else:
+            _availability[key] = db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first() is not None
+    return _availability[key]
+
+
+def extract_terms(query: str) -> List[str]:
+    """Split a free-text query into word terms (Unicode aware)."""
+    return re.findall(r"\w+", query)
+
+
+def build_match_expression(query: str, dialect: str = "sqlite") -> Optional[str]:
+    """
+    Build a full-text match expression from user input.
+
+    Every term is quoted (so query syntax characters in user input are inert)
+    and prefix-matched, and terms are ANDed together: an FTS5 MATCH string on
+    SQLite, a to_tsquery() string on PostgreSQL.
+
+    Args:
+        query: Raw search text
+        dialect: Database dialect name
+
+    Returns:
+        Match expression, or None if the query has no searchable terms
+    """
+    terms = extract_terms(query)
+    if not terms:
+        return None
+    if dialect == "postgresql":
+        return " & ".join(f"'{term}':*" for term in terms)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _ts_vector():
+    """PostgreSQL tsvector column of prompts."""
+    return literal_column(f"prompts.{TS_VECTOR_COLUMN}")
+
+
+def _ts_query(expression: str):
+    """PostgreSQL tsquery for a match expression."""
+    return func.to_tsquery(literal_column(f"'{TS_CONFIG}'"), expression)
+
+
+def apply_match(db_query, expression: str, dialect: str = "sqlite"):
+    """
+    Restrict a prompt query to rows matching the expression.
+
+    Args:
+        db_query: Query selecting from prompts
+        expression: Expression from build_match_expression
+        dialect: Database dialect name
+
+    Returns:
+        Filtered query (joined to prompts_fts on SQLite)
+    """
+    if dialect == "postgresql":
+        return db_query.filter(_ts_vector().op("@@")(_ts_query(expression)))
+    return db_query.join(
+        prompts_fts, prompts_fts.c.rowid == literal_column("prompts.id")
+    ).filter(literal_column(FTS_TABLE).op("MATCH")(expression))
+
+
+def relevance_order(expression: str, dialect: str = "sqlite"):
+    """
+    ORDER BY clause putting the best matches first.
+
+    Args:
+        expression: Expression from build_match_expression
+        dialect: Database dialect name
+
+    Returns:
+        BM25 score ascending (SQLite) or ts_rank_cd descending (PostgreSQL)
+    """
+    if dialect == "postgresql":
+        weights = literal_column(
+            "'{" + ", ".join(str(weight) for weight in TS_RANK_WEIGHTS) + "}'::float4[]"
+        )
+        return desc(func.ts_rank_cd(weights, _ts_vector(), _ts_query(expression)))
+    return func.bm25(literal_column(FTS_TABLE), *BM25_WEIGHTS)
+
+
+# Markers wrapped around matched terms by snippet()/highlight(). Control
+# characters never appear in prompt text, so they can be stripped safely.
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+SNIPPET_ELLIPSIS = "..."
+SNIPPET_TOKENS = 32
+
+
+def _ts_headline(column, expression: str, options: str):
+    """PostgreSQL ts_headline() with the match markers."""
+    return func.ts_headline(
+        literal_column(f"'{TS_CONFIG}'"),
+        column,
+        _ts_query(expression),
+        f'StartSel="{MATCH_START}", StopSel="{MATCH_END}", {options}'
+    )
+
+
+def title_highlight(expression: str, dialect: str = "sqlite"):
+    """SQL expression for the full title with every matched term marked."""
+    if dialect == "postgresql":
+        return _ts_headline(literal_column("prompts.title"), expression, "HighlightAll=true")
+    return func.highlight(literal_column(FTS_TABLE), 0, MATCH_START, MATCH_END)
+
+
+def content_snippet(expression: str, dialect: str = "sqlite"):
+    """SQL expression for the best-matching content fragment with terms marked."""
+    if dialect == "postgresql":
+        return _ts_headline(
+            literal_column("prompts.content"),
+            expression,
+            f"MaxWords={SNIPPET_TOKENS}, MinWords={SNIPPET_TOKENS // 2}, MaxFragments=1, "
+            f'FragmentDelimiter="{SNIPPET_ELLIPSIS}"'
+        )
+    return func.snippet(
+        literal_column(FTS_TABLE), 2, MATCH_START, MATCH_END, SNIPPET_ELLIPSIS, SNIPPET_TOKENS
+    )
+
+
+def parse_marked_text(marked: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Strip match markers from snippet()/highlight() output.
+
+    Args:
+        marked: Text containing MATCH_START/MATCH_END pairs
+
+    Returns:
+        Tuple of (plain text, list of (start, end) character offsets of matches)
+    """
+    parts = []
+    matches = []
+    position = 0
+    start = None
+    for char in marked:
+        if char == MATCH_START:
+            start = position
+        elif char == MATCH_END:
+            if start is not None and position > start:
+                matches.append((start, position))
+            start = None
+        else:
+            parts.append(char)
+            position += 1
+    return "".join(parts), matches
+
+
+def find_matches(text_value: str, terms: List[str]) -> List[Tuple[int, int]]:
+    """
+    Find case-insensitive occurrences of any term in text.
+
+    Used to highlight results when the FTS index is unavailable.
+
+    Args:
+        text_value: Text to scan
+        terms: Search terms
+
+    Returns:
+        Sorted list of (start, end) character offsets
+    """
+    if not text_value or not terms:
+        return []
+    pattern = re.compile(
+        "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)),
+        re.IGNORECASE
+    )
+    return [match_.span() for match_ in pattern.finditer(text_value)]
+
+
+def build_snippet(
+    content: str,
+    terms: List[str],
+    max_length: int = 150
+) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Build a context snippet around the first match, with offsets of every match in it.
+
+    Args:
+        content: Full content text
+        terms: Search terms
+        max_length: Approximate snippet length
+
+    Returns:
+        Tuple of (snippet text, list of (start, end) offsets within the snippet)
+    """
+    content = content or ""
+    matches = find_matches(content, terms)
+    if not matches:
+        snippet = content[:max_length]
+        return snippet + (SNIPPET_ELLIPSIS if len(content) > max_length else ""), []
+
+    # Extract context around the first match (a third before, the rest after)
+    first_start = matches[0][0]
+    start = max(0, first_start - max_length // 3)
+    end = min(len(content), start + max_length)
+
+    prefix = SNIPPET_ELLIPSIS if start > 0 else ""
+    suffix = SNIPPET_ELLIPSIS if end < len(content) else ""
+    shift = len(prefix) - start
+
+    offsets = [
+        (match_start + shift, match_end + shift)
+        for match_start, match_end in matches
+        if match_start >= start and match_end <= end
+    ]
+    return prefix + content[start:end] + suffix, offsets
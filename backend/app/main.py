@@ -13,7 +13,7 @@ from app.core.error_handlers import (
     validation_exception_handler,
     generic_exception_handler
 )
-from app.db.database import init_db
+from app.db.database import dispose_engines, init_db
 
 app = FastAPI(
     title="Prompt Manager API",
@@ -55,19 +55,29 @@ app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, generic_exception_handler)
 
 # Import and register routers
-from app.api.routers import folders, prompts
+from app.api.routers import claude, folders, prompts
+from app.services.job_queue import claude_job_queue
 
 app.include_router(folders.router)
 app.include_router(prompts.router)
+app.include_router(claude.router)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
+    """Initialize database and start the Claude job workers on startup."""
     init_db()
+    await claude_job_queue.start()
     print(f"[START] Prompt Manager API started on {settings.HOST}:{settings.PORT}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the Claude job workers and close pooled database connections on shutdown."""
+    await claude_job_queue.stop()
+    await dispose_engines()
+
+
 @app.get("/")
 async def root():
     """Root endpoint - health check."""
@@ -93,8 +103,10 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
+    # The reloader needs an import string; without it, pass the app built here
+    # instead of importing this module a second time as app.main
     uvicorn.run(
-        "app.main:app",
+        "app.main:app" if settings.DEBUG else app,
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
@@ -0,0 +1,76 @@
+"""
+Pydantic models for Claude job API requests and responses.
+"""
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+JobStatus = Literal["pending", "processing", "completed", "failed"]
+
+
+class ClaudeRewriteRequest(BaseModel):
+    """Model for submitting a prompt for enhancement."""
+
+    prompt_id: int
+    content: Optional[str] = Field(None, min_length=1, description="Text to enhance (defaults to the prompt's content)")
+    custom_instruction: Optional[str] = None
+    bypass_cache: bool = Field(False, description="Run the CLI even if the result is cached")
+
+
+class ClaudeJobResponse(BaseModel):
+    """Model for job status response."""
+
+    job_id: str
+    prompt_id: int
+    status: JobStatus
+    error_message: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+class ClaudeJobResultResponse(ClaudeJobResponse):
+    """Model for the result of a completed job."""
+
+    original_content: str
+    enhanced_content: str
+
+
+class ClaudeBatchRequest(BaseModel):
+    """Model for enhancing every prompt in a folder subtree."""
+
+    folder_id: int
+    custom_instruction: Optional[str] = None
+    bypass_cache: bool = Field(False, description="Run the CLI even for cached results")
+
+
+class ClaudeBatchProgressResponse(BaseModel):
+    """Model for the aggregate progress of a bulk enhancement."""
+
+    batch_id: str
+    total: int
+    pending: int
+    processing: int
+    completed: int
+    failed: int
+    applied: int = Field(..., description="Completed jobs whose result was applied to the prompt")
+    skipped: int = Field(..., description="Completed jobs not applied (prompt edited meanwhile)")
+    progress: float = Field(..., description="Fraction of jobs finished (completed or failed)")
+    done: bool
+
+
+class EnhancementCacheStatsResponse(BaseModel):
+    """Model for enhancement cache statistics (counters are per process)."""
+
+    enabled: bool
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    bypassed: int
+    hit_rate: Optional[float] = None
+
+
+class EnhancementCacheClearResponse(BaseModel):
+    """Model for the result of clearing the enhancement cache."""
+
+    deleted: int
@@ -58,5 +58,20 @@ class FolderTreeResponse(BaseModel):
     folders: List[FolderResponse]
 
 
+class FolderStatsResponse(FolderResponse):
+    """Model for folder tree node with prompt counts."""
+
+    prompt_count: int = 0
+    subtree_prompt_count: int = 0
+    children: List["FolderStatsResponse"] = []
+
+
+class FolderStatsTreeResponse(BaseModel):
+    """Model for folder tree response with prompt counts."""
+
+    folders: List[FolderStatsResponse]
+
+
 # Update forward references
 FolderResponse.model_rebuild()
+FolderStatsResponse.model_rebuild()
@@ -2,7 +2,7 @@
 Pydantic models for Prompt API requests and responses.
 """
 from datetime import datetime
-from typing import Optional, List, Union
+from typing import Optional, List, Tuple, Union
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -52,6 +52,13 @@ class PromptReorder(BaseModel):
     folder_id: int = Field(..., description="Folder ID (for validation)")
 
 
+class EasyAccessReorder(BaseModel):
+    """Model for reordering easy access prompts."""
+
+    prompt_id: int = Field(..., description="ID of the prompt to reorder")
+    new_position: int = Field(..., ge=0, description="New position (0-based index)")
+
+
 class VersionResponse(BaseModel):
     """Model for version history response."""
 
@@ -97,6 +104,97 @@ class PromptListResponse(BaseModel):
     """Model for list of prompts response."""
 
     prompts: List[PromptResponse]
-    total: int
+    total: Optional[int]
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
+
+
+class PromptSummary(BaseModel):
+    """Model for a prompt in list views without content (fetch it via GET /api/prompts/{id})."""
+
+    id: int
+    folder_id: int
+    title: str
+    description: Optional[str] = None
+    tags: List[str] = []
+    is_ai_enhanced: bool
+    is_easy_access: bool = False
+    created_at: datetime
+    updated_at: datetime
+
+    @field_validator('tags', mode='before')
+    @classmethod
+    def convert_tags(cls, v):
+        """Convert comma-separated string to list."""
+        if isinstance(v, str):
+            return [t.strip() for t in v.split(',') if t.strip()] if v else []
+        return v or []
+
+    class Config:
+        from_attributes = True
+
+
+class PromptSummaryListResponse(BaseModel):
+    """Model for list of prompt summaries response."""
+
+    prompts: List[PromptSummary]
+    total: Optional[int]
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
+
+
+class PromptSearchResult(PromptSummary):
+    """Model for a single search hit with snippet and match offsets."""
+
+    snippet: str = ""
+    title_matches: List[Tuple[int, int]] = []
+    snippet_matches: List[Tuple[int, int]] = []
+
+
+class PromptSearchResponse(BaseModel):
+    """Model for search results response."""
+
+    prompts: List[PromptSearchResult]
+    total: Optional[int]
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
+
+
+class TagCount(BaseModel):
+    """Model for a tag with the number of prompts using it."""
+
+    name: str
+    count: int
+
+
+class TagCountResponse(BaseModel):
+    """Model for tag facet counts response."""
+
+    tags: List[TagCount]
+
+
+class FolderFacetCount(BaseModel):
+    """Model for search matches in a folder."""
+
+    folder_id: int
+    count: int
+    subtree_count: int
+
+
+class DateBucketCount(BaseModel):
+    """Model for search matches created within a date bucket."""
+
+    bucket: str
+    count: int
+
+
+class SearchFacetsResponse(BaseModel):
+    """Model for search facet counts response."""
+
+    total: int
+    tags: List[TagCount]
+    folders: List[FolderFacetCount]
+    created: List[DateBucketCount]
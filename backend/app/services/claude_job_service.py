@@ -0,0 +1,304 @@
+"""
+Claude job service - business logic for enhancement jobs.
+"""
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.db.models import ClaudeJob, Prompt
+from app.db.repositories.claude_repository import (
+    ClaudeJobRepository,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_PROCESSING
+)
+from app.services.prompt_service import PromptService
+from app.core.exceptions import (
+    ClaudeBatchNotFoundException,
+    ClaudeCLIException,
+    ClaudeJobNotFoundException,
+    ClaudeJobPendingException,
+    FolderNotFoundException
+)
+
+
+def batch_progress(batch_id: str, counts: Dict[str, Tuple[int, int]]) -> Dict[str, Any]:
+    """
+    Build the progress summary of a batch from its per-status counts.
+
+    Args:
+        batch_id: Batch ID
+        counts: Dict of status -> (job count, applied count); empty for a batch without jobs
+
+    Returns:
+        Dict with total, per-status counts, applied/skipped counts,
+        progress (finished fraction) and done
+    """
+    total = sum(count for count, _ in counts.values())
+    completed, applied = counts.get(JOB_COMPLETED, (0, 0))
+    failed = counts.get(JOB_FAILED, (0, 0))[0]
+    finished = completed + failed
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "pending": counts.get(JOB_PENDING, (0, 0))[0],
+        "processing": counts.get(JOB_PROCESSING, (0, 0))[0],
+        "completed": completed,
+        "failed": failed,
+        "applied": applied,
+        "skipped": completed - applied,
+        "progress": finished / total if total else 1.0,
+        "done": finished == total
+    }
+
+
+class ClaudeJobService:
+    """Service for Claude enhancement job business logic."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize service with database session.
+
+        Args:
+            db: SQLAlchemy database session
+        """
+        self.db = db
+        self.repo = ClaudeJobRepository(db)
+        self.prompt_service = PromptService(db)
+
+    def create_job(
+        self,
+        prompt_id: int,
+        content: Optional[str] = None,
+        instruction: Optional[str] = None
+    ) -> ClaudeJob:
+        """
+        Create a pending enhancement job for a prompt.
+
+        Args:
+            prompt_id: Prompt ID
+            content: Text to enhance (defaults to the prompt's current content)
+            instruction: Custom enhancement instruction (defaults to the standard one)
+
+        Returns:
+            Created job
+
+        Raises:
+            PromptNotFoundException: If prompt not found
+        """
+        prompt = self.prompt_service.get_prompt_by_id(prompt_id)
+
+        job = ClaudeJob(
+            id=f"job_{uuid.uuid4().hex}",
+            prompt_id=prompt.id,
+            original_content=content or prompt.content,
+            instruction=instruction,
+            status=JOB_PENDING
+        )
+        return self.repo.create(job)
+
+    def create_batch_jobs(
+        self,
+        folder_id: int,
+        batch_id: str,
+        instruction: Optional[str] = None
+    ) -> List[ClaudeJob]:
+        """
+        Create a pending job for every prompt in a folder subtree.
+
+        Results of batch jobs are applied to their prompts when they complete.
+
+        Args:
+            folder_id: Root folder of the subtree
+            batch_id: ID shared by the batch's jobs
+            instruction: Custom enhancement instruction (defaults to the standard one)
+
+        Returns:
+            Created jobs
+
+        Raises:
+            FolderNotFoundException: If folder not found
+        """
+        if not self.prompt_service.folder_repo.get_by_id(folder_id):
+            raise FolderNotFoundException(folder_id)
+
+        jobs = [
+            ClaudeJob(
+                id=f"job_{uuid.uuid4().hex}",
+                prompt_id=prompt.id,
+                original_content=prompt.content,
+                instruction=instruction,
+                status=JOB_PENDING,
+                batch_id=batch_id
+            )
+            for prompt in self.prompt_service.repo.get_in_subtree(folder_id)
+        ]
+        return self.repo.create_many(jobs)
+
+    def get_batch_progress(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Get aggregate progress of a batch.
+
+        Args:
+            batch_id: Batch ID
+
+        Returns:
+            Dict with total, per-status counts, applied/skipped counts,
+            progress (finished fraction) and done
+
+        Raises:
+            ClaudeBatchNotFoundException: If no job belongs to the batch
+        """
+        counts = self.repo.get_batch_counts(batch_id)
+        if not counts:
+            raise ClaudeBatchNotFoundException(batch_id)
+        return batch_progress(batch_id, counts)
+
+    def get_job(self, job_id: str) -> ClaudeJob:
+        """
+        Get job by ID.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            ClaudeJob object
+
+        Raises:
+            ClaudeJobNotFoundException: If job not found
+        """
+        job = self.repo.get_by_id(job_id)
+        if not job:
+            raise ClaudeJobNotFoundException(job_id)
+        return job
+
+    def get_completed_job(self, job_id: str) -> ClaudeJob:
+        """
+        Get a job whose enhanced content is available.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Completed ClaudeJob
+
+        Raises:
+            ClaudeJobNotFoundException: If job not found
+            ClaudeJobPendingException: If job is still pending or processing
+            ClaudeCLIException: If job failed
+        """
+        job = self.get_job(job_id)
+        if job.status == JOB_FAILED:
+            raise ClaudeCLIException(job.error_message or "Enhancement failed")
+        if job.status != JOB_COMPLETED:
+            raise ClaudeJobPendingException(job_id)
+        return job
+
+    def accept_job(self, job_id: str) -> Prompt:
+        """
+        Apply a completed job's enhanced content to its prompt.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Updated prompt
+
+        Raises:
+            ClaudeJobNotFoundException: If job not found
+            ClaudeJobPendingException: If job is still pending or processing
+            ClaudeCLIException: If job failed
+        """
+        job = self.get_completed_job(job_id)
+        return self.prompt_service.apply_enhancement(job.prompt_id, job.enhanced_content)
+
+    def start_job(self, job_id: str) -> Optional[ClaudeJob]:
+        """
+        Mark a pending job as processing.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            The job, or None if it no longer exists or is not pending
+        """
+        job = self.repo.get_by_id(job_id)
+        if not job or job.status != JOB_PENDING:
+            return None
+        job.status = JOB_PROCESSING
+        return self.repo.update(job)
+
+    def finish_job(
+        self,
+        job_id: str,
+        enhanced_content: Optional[str] = None,
+        error_message: Optional[str] = None
+    ) -> Optional[ClaudeJob]:
+        """
+        Record the outcome of a job: completed with content, or failed with an error.
+
+        A completed batch job is applied to its prompt (as a new version)
+        unless the prompt's content changed since the job was created.
+
+        Args:
+            job_id: Job ID
+            enhanced_content: Enhanced text (job completed)
+            error_message: Error description (job failed)
+
+        Returns:
+            The job, or None if it was deleted meanwhile (with its prompt)
+        """
+        job = self.repo.get_by_id(job_id)
+        if not job:
+            return None
+        if error_message is not None:
+            job.status = JOB_FAILED
+            job.error_message = error_message
+        else:
+            job.status = JOB_COMPLETED
+            job.enhanced_content = enhanced_content
+            if job.batch_id is not None:
+                self._apply_batch_result(job)
+        job.completed_at = datetime.utcnow()
+        return self.repo.update(job)
+
+    def fail_processing_job(self, job_id: str, error_message: str) -> Optional[ClaudeJob]:
+        """
+        Mark a job as failed if it was started but never finished.
+
+        Args:
+            job_id: Job ID
+            error_message: Error description
+
+        Returns:
+            The failed job, or None if it does not exist or is not processing
+        """
+        job = self.repo.get_by_id(job_id)
+        if not job or job.status != JOB_PROCESSING:
+            return None
+        return self.finish_job(job_id, error_message=error_message)
+
+    def _apply_batch_result(self, job: ClaudeJob) -> None:
+        """Apply a completed batch job to its prompt, unless the prompt was edited since submission."""
+        prompt = self.prompt_service.repo.get_by_id(job.prompt_id)
+        if prompt is None or prompt.content != job.original_content:
+            print(f"[JOBS] Job {job.id}: prompt {job.prompt_id} changed since submission - result not applied")
+            return
+        job.applied_at = datetime.utcnow()
+        self.prompt_service.apply_enhancement(job.prompt_id, job.enhanced_content)
+
+    def requeue_unfinished(self) -> List[str]:
+        """
+        Reset jobs interrupted by a shutdown to pending.
+
+        Returns:
+            IDs of every pending job, oldest first
+        """
+        jobs = self.repo.get_unfinished()
+        for job in jobs:
+            job.status = JOB_PENDING
+        if jobs:
+            self.db.commit()
+        return [job.id for job in jobs]
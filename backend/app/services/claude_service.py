@@ -1,8 +1,190 @@
 """
 Claude CLI integration service for AI-powered prompt enhancement.
+
+The CLI runs as an asyncio subprocess: output is read incrementally while the
+event loop keeps serving other requests, and a timeout or cancellation kills
+the process. The CLI is probed with --version once per process; a successful
+probe is cached, a failed one is retried on the next call.
 """
+import asyncio
+import codecs
+import shutil
 import subprocess
-from typing import Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.exceptions import ClaudeCLIException
+
+# Seconds allowed for `claude --version`
+PROBE_TIMEOUT = 5
+
+# Bytes read from the CLI's stdout at a time
+READ_CHUNK_SIZE = 4096
+
+# Command -> version reported by a successful probe
+_cli_versions: Dict[str, str] = {}
+
+# Concurrent first calls share one probe
+_probe_lock = asyncio.Lock()
+
+
+def resolve_cli_path(cli_path: str) -> str:
+    """
+    Find the Claude CLI executable (PATH lookup, including .cmd on Windows).
+
+    Args:
+        cli_path: Command name or path (settings.CLAUDE_CLI_PATH)
+
+    Returns:
+        Full path of the executable
+
+    Raises:
+        ClaudeCLIException: If the executable is not found
+    """
+    executable = shutil.which(cli_path)
+    if executable is None:
+        raise ClaudeCLIException(
+            f"'{cli_path}' not found. Ensure it is in PATH or set CLAUDE_CLI_PATH"
+        )
+    return executable
+
+
+async def probe_cli(cli_path: str) -> str:
+    """
+    Get the CLI version, running `<cli> --version` only until it first succeeds.
+
+    Args:
+        cli_path: Command name or path
+
+    Returns:
+        Version string reported by the CLI
+
+    Raises:
+        ClaudeCLIException: If the CLI is missing, fails or times out
+    """
+    if cli_path in _cli_versions:
+        return _cli_versions[cli_path]
+
+    async with _probe_lock:
+        if cli_path not in _cli_versions:
+            output = "".join([
+                chunk async for chunk in stream_cli(resolve_cli_path(cli_path), ["--version"], timeout=PROBE_TIMEOUT)
+            ])
+            _cli_versions[cli_path] = output.strip()
+            print(f"[ClaudeService] Claude CLI version: {_cli_versions[cli_path]}")
+    return _cli_versions[cli_path]
+
+
+async def stream_cli(
+    executable: str,
+    args: List[str],
+    input_text: Optional[str] = None,
+    timeout: float = settings.CLAUDE_TIMEOUT
+) -> AsyncIterator[str]:
+    """
+    Run the CLI and yield its stdout as it arrives.
+
+    The process is killed if the timeout expires, or if the consumer is
+    cancelled or stops iterating early.
+
+    Args:
+        executable: Full path of the CLI
+        args: Command-line arguments
+        input_text: Text written to stdin (None for no input)
+        timeout: Seconds allowed for the whole run
+
+    Yields:
+        Decoded stdout chunks
+
+    Raises:
+        ClaudeCLIException: If the CLI can't start, stops reading its input,
+            exits non-zero or times out
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    def remaining() -> float:
+        return max(deadline - loop.time(), 0)
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            executable, *args,
+            stdin=asyncio.subprocess.PIPE if input_text is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except NotImplementedError:
+        # Event loop without subprocess support (uvicorn uses a selector loop
+        # on Windows when reloading); run the CLI in a thread instead
+        yield await run_in_threadpool(_run_blocking, executable, args, input_text, timeout)
+        return
+    except OSError as e:
+        raise ClaudeCLIException(f"Could not start {executable}: {e}")
+
+    # Drain stderr concurrently so a chatty CLI can't block on a full pipe
+    stderr_task = asyncio.create_task(process.stderr.read())
+    try:
+        if input_text is not None:
+            try:
+                process.stdin.write(input_text.encode("utf-8"))
+                await asyncio.wait_for(process.stdin.drain(), remaining())
+                process.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                # The CLI exited (or closed stdin) without reading its input; report why
+                returncode = await asyncio.wait_for(process.wait(), remaining())
+                stderr = (await stderr_task).decode("utf-8", errors="replace").strip()
+                raise ClaudeCLIException(
+                    stderr or f"Command exited with status {returncode} before reading its input"
+                )
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            chunk = await asyncio.wait_for(process.stdout.read(READ_CHUNK_SIZE), remaining())
+            if not chunk:
+                break
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+
+        returncode = await asyncio.wait_for(process.wait(), remaining())
+        stderr = (await stderr_task).decode("utf-8", errors="replace").strip()
+    except asyncio.TimeoutError:
+        raise ClaudeCLIException(f"Request timed out after {timeout} seconds")
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        if not stderr_task.done():
+            stderr_task.cancel()
+
+    if returncode != 0:
+        raise ClaudeCLIException(stderr or f"Command exited with status {returncode}")
+
+
+def _run_blocking(executable: str, args: List[str], input_text: Optional[str], timeout: float) -> str:
+    """Run the CLI with a blocking subprocess call and return its stdout."""
+    try:
+        result = subprocess.run(
+            [executable, *args],
+            input=input_text,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        raise ClaudeCLIException(f"Request timed out after {timeout} seconds")
+    except OSError as e:
+        raise ClaudeCLIException(f"Could not start {executable}: {e}")
+
+    if result.returncode != 0:
+        raise ClaudeCLIException(result.stderr.strip() or f"Command exited with status {result.returncode}")
+    return result.stdout
 
 
 class ClaudeService:
@@ -26,30 +208,74 @@ class ClaudeService:
         "USER'S ORIGINAL PROMPT TO IMPROVE:\n"
     )
 
-    def __init__(self):
-        """Initialize Claude CLI service."""
-        # Verify Claude CLI is available
-        try:
-            result = subprocess.run(
-                ["claude", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=True  # Use shell on Windows for .cmd files
-            )
-            if result.returncode != 0:
-                raise Exception("Claude CLI command failed")
-        except FileNotFoundError:
-            raise Exception(
-                "Claude CLI not found. Please ensure 'claude' command is available in PATH"
-            )
-        except subprocess.TimeoutExpired:
-            raise Exception("Claude CLI version check timed out")
-
-    def enhance_prompt(
+    def __init__(self, cli_path: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Initialize Claude CLI service (the CLI is probed on first use, not here).
+
+        Args:
+            cli_path: Command name or path (defaults to settings.CLAUDE_CLI_PATH)
+            timeout: Seconds allowed per enhancement (defaults to settings.CLAUDE_TIMEOUT)
+        """
+        self.cli_path = cli_path or settings.CLAUDE_CLI_PATH
+        self.timeout = timeout or settings.CLAUDE_TIMEOUT
+
+    async def get_version(self) -> str:
+        """
+        Get the Claude CLI version (probed once per process).
+
+        Returns:
+            Version string reported by the CLI
+
+        Raises:
+            ClaudeCLIException: If the CLI is not available
+        """
+        return await probe_cli(self.cli_path)
+
+    def effective_instruction(self, enhancement_instruction: Optional[str] = None) -> str:
+        """Custom instruction if given, else DEFAULT_ENHANCEMENT_PROMPT."""
+        return enhancement_instruction or self.DEFAULT_ENHANCEMENT_PROMPT
+
+    async def stream_enhancement(
         self,
         original_prompt: str,
         enhancement_instruction: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Enhance a prompt using Claude CLI, yielding the output as it arrives.
+
+        Args:
+            original_prompt: The original prompt text to enhance
+            enhancement_instruction: Optional custom enhancement instruction
+                                   (defaults to DEFAULT_ENHANCEMENT_PROMPT)
+
+        Yields:
+            Chunks of the enhanced prompt text
+
+        Raises:
+            ClaudeCLIException: If the CLI is unavailable, fails or times out
+        """
+        await self.get_version()
+
+        instruction = self.effective_instruction(enhancement_instruction)
+
+        # Construct the full prompt
+        full_prompt = f"{instruction}\n\n{original_prompt}"
+        print(f"[ClaudeService] Running Claude CLI, prompt length: {len(full_prompt)} characters")
+
+        # Print mode for non-interactive output
+        async for chunk in stream_cli(
+            resolve_cli_path(self.cli_path),
+            ["--print"],
+            input_text=full_prompt,
+            timeout=self.timeout
+        ):
+            yield chunk
+
+    async def enhance_prompt(
+        self,
+        original_prompt: str,
+        enhancement_instruction: Optional[str] = None,
+        on_chunk: Optional[Callable[[str], None]] = None
     ) -> str:
         """
         Enhance a prompt using Claude CLI.
@@ -58,53 +284,23 @@ class ClaudeService:
             original_prompt: The original prompt text to enhance
             enhancement_instruction: Optional custom enhancement instruction
                                    (defaults to DEFAULT_ENHANCEMENT_PROMPT)
+            on_chunk: Optional callback receiving each output chunk as it arrives
 
         Returns:
             Enhanced prompt text
 
         Raises:
-            Exception: If CLI call fails
+            ClaudeCLIException: If the CLI call fails or returns nothing
         """
-        # Use custom instruction or default
-        instruction = enhancement_instruction or self.DEFAULT_ENHANCEMENT_PROMPT
+        chunks = []
+        async for chunk in self.stream_enhancement(original_prompt, enhancement_instruction):
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+        enhanced_prompt = "".join(chunks).strip()
 
-        # Construct the full prompt
-        full_prompt = f"{instruction}\n\n{original_prompt}"
+        if not enhanced_prompt:
+            raise ClaudeCLIException("Claude CLI returned empty response")
 
-        try:
-            print(f"[ClaudeService] Running Claude CLI command...")
-            print(f"[ClaudeService] Prompt length: {len(full_prompt)} characters")
-
-            # Call Claude CLI using print mode for non-interactive output
-            # Note: Using full path to .cmd file and removing shell=True to avoid hanging
-            result = subprocess.run(
-                [r"C:\Users\winnl\AppData\Roaming\npm\claude.cmd", "--print"],
-                input=full_prompt,
-                capture_output=True,
-                text=True,
-                timeout=60,
-                encoding='utf-8',
-                shell=False  # Don't use shell to avoid interactive prompts
-            )
-
-            print(f"[ClaudeService] Return code: {result.returncode}")
-            print(f"[ClaudeService] Stdout length: {len(result.stdout)} characters")
-            print(f"[ClaudeService] Stderr: {result.stderr[:200] if result.stderr else 'None'}")
-
-            if result.returncode != 0:
-                error_msg = result.stderr or "Unknown error"
-                raise Exception(f"Claude CLI command failed: {error_msg}")
-
-            enhanced_prompt = result.stdout.strip()
-
-            if not enhanced_prompt:
-                raise Exception("Claude CLI returned empty response")
-
-            print(f"[ClaudeService] Success! Enhanced prompt length: {len(enhanced_prompt)}")
-            return enhanced_prompt
-
-        except subprocess.TimeoutExpired:
-            raise Exception("Claude CLI request timed out after 60 seconds")
-        except Exception as e:
-            print(f"[ClaudeService ERROR] {type(e).__name__}: {str(e)}")
-            raise Exception(f"Failed to enhance prompt: {str(e)}")
+        print(f"[ClaudeService] Success! Enhanced prompt length: {len(enhanced_prompt)}")
+        return enhanced_prompt
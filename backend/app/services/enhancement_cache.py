@@ -0,0 +1,170 @@
+"""
+Content-addressed cache of Claude enhancement results.
+
+Entries live in the enhancement_cache table, keyed by a SHA-256 of the
+effective instruction, the original prompt and the CLI version, so a new CLI
+version or a changed instruction never returns a stale result. At most
+ENHANCEMENT_CACHE_SIZE entries are kept; the least recently used go first.
+Hit, miss and bypass counters are per process.
+"""
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import EnhancementCacheEntry
+from app.db.repositories.enhancement_cache_repository import EnhancementCacheRepository
+
+
+def cache_key(instruction: str, original_prompt: str, cli_version: str) -> str:
+    """
+    Hash the inputs that determine an enhancement result.
+
+    Args:
+        instruction: Effective enhancement instruction
+        original_prompt: Prompt text to enhance
+        cli_version: Claude CLI version
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in (instruction, original_prompt, cli_version):
+        encoded = part.encode("utf-8")
+        # Length prefixes keep ("ab", "c") and ("a", "bc") apart
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class CacheCounters:
+    """Thread-safe hit/miss/bypass counters."""
+
+    def __init__(self):
+        """Initialize all counters at 0."""
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    def increment(self, name: str) -> None:
+        """Add one to a counter (hits, misses or bypassed)."""
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Current counter values."""
+        with self._lock:
+            return dict(self._counts)
+
+
+enhancement_cache_counters = CacheCounters()
+
+
+class EnhancementCacheService:
+    """Service for reading and writing cached enhancement results."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize service with database session.
+
+        Args:
+            db: SQLAlchemy database session
+        """
+        self.db = db
+        self.repo = EnhancementCacheRepository(db)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether caching is enabled (ENHANCEMENT_CACHE_SIZE > 0)."""
+        return settings.ENHANCEMENT_CACHE_SIZE > 0
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached result and mark it as recently used.
+
+        Args:
+            key: Cache key (see cache_key)
+
+        Returns:
+            Enhanced content, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.repo.get_by_key(key)
+        if entry is None:
+            enhancement_cache_counters.increment("misses")
+            return None
+
+        entry.hit_count += 1
+        entry.last_used_at = datetime.utcnow()
+        self.db.commit()
+        enhancement_cache_counters.increment("hits")
+        return entry.enhanced_content
+
+    def put(self, key: str, enhanced_content: str, cli_version: str) -> None:
+        """
+        Store a result, evicting the least recently used entries over the size limit.
+
+        Args:
+            key: Cache key (see cache_key)
+            enhanced_content: Enhanced prompt text
+            cli_version: Claude CLI version that produced it
+        """
+        if not self.enabled:
+            return
+
+        now = datetime.utcnow()
+        entry = self.repo.get_by_key(key)
+        if entry is None:
+            self.db.add(EnhancementCacheEntry(
+                key=key,
+                enhanced_content=enhanced_content,
+                cli_version=cli_version,
+                hit_count=0,
+                created_at=now,
+                last_used_at=now
+            ))
+        else:
+            entry.enhanced_content = enhanced_content
+            entry.last_used_at = now
+        try:
+            self.db.flush()
+        except IntegrityError:
+            # Stored concurrently by another job with the same key
+            self.db.rollback()
+            return
+
+        overflow = self.repo.count() - settings.ENHANCEMENT_CACHE_SIZE
+        self.repo.delete_least_recently_used(overflow)
+        self.db.commit()
+
+    def clear(self) -> int:
+        """
+        Delete every cached result.
+
+        Returns:
+            Number of entries deleted
+        """
+        deleted = self.repo.delete_all()
+        self.db.commit()
+        return deleted
+
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Get cache size and the process's hit/miss/bypass counters.
+
+        Returns:
+            Dict with enabled, entries, max_entries, hits, misses, bypassed, hit_rate
+        """
+        counters = enhancement_cache_counters.snapshot()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": self.repo.count(),
+            "max_entries": settings.ENHANCEMENT_CACHE_SIZE,
+            **counters,
+            "hit_rate": counters["hits"] / lookups if lookups else None
+        }
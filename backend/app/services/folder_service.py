@@ -5,8 +5,12 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.core.config import settings
 from app.db.models import Folder
 from app.db.repositories.folder_repository import FolderRepository
+from app.db.repositories.prompt_repository import PromptRepository
+from app.models.folder import FolderStatsTreeResponse, FolderTreeResponse
+from app.services.folder_tree_cache import CachedFolderTree, build_entry, folder_tree_cache
 from app.core.exceptions import (
     FolderNotFoundException,
     InvalidParentFolderException,
@@ -63,16 +67,37 @@ class FolderService:
             "children": []
         }
 
-    def get_folder_tree(self) -> List[Dict[str, Any]]:
+    def _add_prompt_counts(self, tree: List[Dict[str, Any]], prompt_counts: Dict[int, int]) -> None:
+        """Set prompt_count and subtree_prompt_count on every node of a built tree."""
+        # Iterative post-order walk: children are totalled before their parent
+        stack = [(node, False) for node in tree]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                node["subtree_prompt_count"] = node["prompt_count"] + sum(
+                    child["subtree_prompt_count"] for child in node["children"]
+                )
+            else:
+                node["prompt_count"] = prompt_counts.get(node["id"], 0)
+                stack.append((node, True))
+                stack.extend((child, False) for child in node["children"])
+
+    def get_folder_tree(self, include_counts: bool = False) -> List[Dict[str, Any]]:
         """
         Get complete folder tree (excludes root, returns its children).
 
+        Args:
+            include_counts: Add prompt_count and subtree_prompt_count to every node
+
         Returns:
             Folder tree structure starting with root's children
         """
         folders = self.repo.get_all()
         tree = self.build_folder_tree(folders)
 
+        if include_counts:
+            self._add_prompt_counts(tree, PromptRepository(self.db).count_by_folder())
+
         # Find root folder and return its children instead
         # Root is the folder with parent_id = None and name = "Root"
         for folder in tree:
@@ -82,6 +107,41 @@ class FolderService:
         # If no root found, return empty list
         return []
 
+    def get_folder_tree_json(self, include_counts: bool = False) -> CachedFolderTree:
+        """
+        Get the folder tree serialized as a FolderTreeResponse body.
+
+        Served from the in-process cache while the folder tree generation
+        stored in the database is unchanged (unless FOLDER_TREE_CACHE is
+        off), so every worker process sees the mutations of the others.
+        Trees with prompt counts change with every prompt mutation, so they
+        are always built fresh (one aggregate query on top of the folder load).
+
+        Args:
+            include_counts: Serialize a FolderStatsTreeResponse instead
+
+        Returns:
+            Tree with JSON body and ETag
+        """
+        # Read once per request, before the folders
+        generation = self.repo.get_tree_generation()
+
+        if include_counts:
+            tree = self.get_folder_tree(include_counts=True)
+            body = FolderStatsTreeResponse(folders=tree).model_dump_json().encode()
+            return build_entry(generation, body)
+
+        if not settings.FOLDER_TREE_CACHE:
+            body = FolderTreeResponse(folders=self.get_folder_tree()).model_dump_json().encode()
+            return build_entry(generation, body)
+
+        cached = folder_tree_cache.get(generation)
+        if cached is not None:
+            return cached
+
+        body = FolderTreeResponse(folders=self.get_folder_tree()).model_dump_json().encode()
+        return folder_tree_cache.store(generation, body)
+
     def get_folder_by_id(self, folder_id: int) -> Folder:
         """
         Get folder by ID.
@@ -136,7 +196,8 @@ class FolderService:
             parent_id=parent_id,
             path=path
         )
-        return self.repo.create(folder)
+        folder = self.repo.create(folder)
+        return folder
 
     def update_folder(self, folder_id: int, name: str) -> Folder:
         """
@@ -161,13 +222,15 @@ class FolderService:
                 raise DuplicateFolderNameException(name)
 
         # Update folder
+        old_path = folder.path
         folder.name = name
         folder.updated_at = datetime.utcnow()
 
-        # Update path for this folder and all children
-        self._update_folder_paths(folder)
+        # Update path for this folder and all descendants
+        self.repo.rewrite_subtree_paths(folder.id, old_path, self._build_path(folder.parent_id, name))
 
-        return self.repo.update(folder)
+        folder = self.repo.update(folder)
+        return folder
 
     def delete_folder(self, folder_id: int) -> None:
         """
@@ -228,41 +291,35 @@ class FolderService:
             raise DuplicateFolderNameException(folder.name)
 
         # Update folder
+        old_path = folder.path
         folder.parent_id = new_parent_id
         folder.updated_at = datetime.utcnow()
 
-        # Update paths
-        self._update_folder_paths(folder)
+        # Update hierarchy links and paths for the whole subtree
+        self.repo.move_subtree(folder.id, new_parent_id)
+        self.repo.rewrite_subtree_paths(
+            folder.id, old_path, self._build_path(new_parent_id, folder.name, new_parent)
+        )
 
-        return self.repo.update(folder)
+        folder = self.repo.update(folder)
+        return folder
 
     def _would_create_cycle(self, folder_id: int, new_parent_id: int) -> bool:
         """Check if moving folder would create a circular reference."""
-        current_id = new_parent_id
-        while current_id is not None:
-            if current_id == folder_id:
-                return True
-            parent = self.repo.get_by_id(current_id)
-            if not parent:
-                break
-            current_id = parent.parent_id
-        return False
-
-    def _update_folder_paths(self, folder: Folder) -> None:
-        """Recursively update paths for folder and all descendants."""
-        # Build new path
-        if folder.parent_id is None:
-            new_path = f"/{folder.name}"
-        else:
-            parent = self.repo.get_by_id(folder.parent_id)
-            new_path = f"{parent.path.rstrip('/')}/{folder.name}"
-
-        folder.path = new_path
-
-        # Update children paths
-        children = self.repo.get_by_parent_id(folder.id)
-        for child in children:
-            self._update_folder_paths(child)
+        return self.repo.is_descendant(new_parent_id, folder_id)
+
+    def _build_path(
+        self,
+        parent_id: Optional[int],
+        name: str,
+        parent: Optional[Folder] = None
+    ) -> str:
+        """Build the path of a folder named name under parent_id."""
+        if parent_id is None:
+            return f"/{name}"
+        if parent is None:
+            parent = self.get_folder_by_id(parent_id)
+        return f"{parent.path.rstrip('/')}/{name}"
 
     def reorder_folders(self, folder_id: int, new_position: int, parent_id: Optional[int]) -> List[Folder]:
         """
@@ -290,7 +347,7 @@ class FolderService:
 
         # Validate parent exists if not None
         if parent_id is not None:
-            parent = self.get_folder_by_id(parent_id)
+            self.get_folder_by_id(parent_id)
 
         # Get all folders in the same parent ordered by current display_order
         all_folders = self.repo.get_by_parent_id(parent_id)
@@ -298,25 +355,7 @@ class FolderService:
         # Sort by display_order (None values go to end)
         all_folders.sort(key=lambda f: (f.display_order is None, f.display_order or 0, f.created_at))
 
-        if not all_folders:
-            return []
-
-        # Validate new_position is within bounds
-        if new_position < 0 or new_position >= len(all_folders):
-            new_position = max(0, min(new_position, len(all_folders) - 1))
-
-        # Find current position of the folder
-        current_position = next((i for i, f in enumerate(all_folders) if f.id == folder_id), None)
-
-        # Reorder the list
-        if current_position is not None and current_position != new_position:
-            # Remove folder from current position and insert at new position
-            folder_to_move = all_folders.pop(current_position)
-            all_folders.insert(new_position, folder_to_move)
-
-        # Update display_order for all folders
-        for i, f in enumerate(all_folders):
-            f.display_order = i
-            self.repo.update(f)
+        # Move the folder and renumber its siblings in one statement
+        all_folders = self.repo.reorder(all_folders, folder_id, new_position)
 
         return all_folders
@@ -0,0 +1,84 @@
+"""
+In-process cache of the serialized folder tree.
+
+The tree is stored as ready-to-send JSON bytes tagged with the folder
+generation it was built from. The generation is a counter in the database
+(folder_tree_generation) that every folder mutation bumps in its own
+transaction, so a cached entry is valid exactly as long as its generation
+is current. Each worker process keeps its own cache, but they all compare
+against the same counter.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class CachedFolderTree:
+    """Serialized folder tree for one folder generation."""
+
+    generation: int
+    body: bytes
+    etag: str
+
+
+def build_entry(generation: int, body: bytes) -> CachedFolderTree:
+    """Wrap a serialized tree with its ETag (hash of the body)."""
+    return CachedFolderTree(
+        generation=generation,
+        body=body,
+        etag=f'"{hashlib.sha1(body).hexdigest()}"'
+    )
+
+
+class FolderTreeCache:
+    """Generation-keyed cache holding the latest serialized folder tree."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._entry: Optional[CachedFolderTree] = None
+
+    def get(self, generation: int) -> Optional[CachedFolderTree]:
+        """
+        Get the cached tree if it was built from the given generation.
+
+        Args:
+            generation: Current folder tree generation read from the database
+
+        Returns:
+            Cached tree, or None if it must be rebuilt
+        """
+        entry = self._entry
+        if entry is not None and entry.generation == generation:
+            return entry
+        return None
+
+    def store(self, generation: int, body: bytes) -> CachedFolderTree:
+        """
+        Cache a serialized tree built from the given generation.
+
+        An entry from a generation that is no longer current is simply never
+        served: get() only returns an entry matching the database counter.
+
+        Args:
+            generation: Generation read before loading the folders
+            body: Serialized tree
+
+        Returns:
+            Entry for the serialized tree
+        """
+        entry = build_entry(generation, body)
+        with self._lock:
+            self._entry = entry
+        return entry
+
+    def clear(self) -> None:
+        """Drop the cached tree, e.g. after the folder tables were emptied directly."""
+        with self._lock:
+            self._entry = None
+
+
+# Global folder tree cache instance
+folder_tree_cache = FolderTreeCache()
@@ -0,0 +1,354 @@
+"""
+In-process queue running Claude enhancement jobs in the background.
+
+Jobs live in the claude_jobs table; the queue only carries job IDs. A fixed
+pool of CLAUDE_MAX_CONCURRENT_JOBS worker tasks takes IDs off the queue, runs
+the Claude CLI and stores the outcome on the job, so at most that many CLI
+processes run at once and no HTTP worker waits on one. Jobs still pending or
+processing when the server stopped are queued again on startup. Stopping the
+queue cancels the workers, which kills any CLI process still running.
+Results are cached (see app.services.enhancement_cache); a job whose result
+is cached completes at submission without being queued. Interactive jobs
+(submit) go ahead of batch jobs and requeued ones, so a user waiting on an
+enhancement is not stuck behind a large batch.
+"""
+import asyncio
+import itertools
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import ClaudeCLIException
+from app.db.database import background_runner
+from app.services.claude_job_service import ClaudeJobService
+from app.services.enhancement_cache import EnhancementCacheService, cache_key, enhancement_cache_counters
+
+# Queue priorities (lower runs first); jobs of equal priority run in submission order
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class ClaudeJobQueue:
+    """Bounded pool of workers processing Claude jobs by priority, then in submission order."""
+
+    def __init__(self, max_concurrent_jobs: int):
+        """
+        Initialize a stopped queue.
+
+        Args:
+            max_concurrent_jobs: Number of worker tasks (jobs run at the same time)
+        """
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        self._finished: Dict[str, asyncio.Event] = {}
+        # Output of running jobs so far, and the queues of clients following it
+        self._output: Dict[str, List[str]] = {}
+        self._listeners: Dict[str, List[asyncio.Queue]] = {}
+        self._claude_service = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker tasks have been started."""
+        return self._queue is not None
+
+    async def start(self) -> None:
+        """Start the workers and queue the jobs left unfinished by the last run."""
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(number))
+            for number in range(1, self.max_concurrent_jobs + 1)
+        ]
+
+        job_ids = await background_runner().run(
+            lambda session: ClaudeJobService(session).requeue_unfinished()
+        )
+        for job_id in job_ids:
+            self._enqueue(job_id, PRIORITY_BACKGROUND)
+        if job_ids:
+            print(f"[JOBS] Requeued {len(job_ids)} unfinished Claude jobs")
+
+    async def stop(self) -> None:
+        """
+        Cancel the workers; jobs they were running are requeued on next start.
+
+        Anyone waiting on or following a job still queued is released.
+        """
+        if not self.running:
+            return
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+        for listeners in self._listeners.values():
+            for listener in listeners:
+                listener.put_nowait(None)
+        for finished in self._finished.values():
+            finished.set()
+        self._listeners = {}
+        self._finished = {}
+        self._output = {}
+
+    async def submit(
+        self,
+        prompt_id: int,
+        content: Optional[str] = None,
+        instruction: Optional[str] = None,
+        bypass_cache: bool = False
+    ) -> str:
+        """
+        Create a job for a prompt and queue it, unless the result is cached.
+
+        The job goes ahead of batch jobs. On a cache hit it is created
+        already completed and never queued.
+
+        Args:
+            prompt_id: Prompt ID
+            content: Text to enhance (defaults to the prompt's current content)
+            instruction: Custom enhancement instruction
+            bypass_cache: Run the CLI even if the result is cached (the new
+                          result replaces the cached one)
+
+        Returns:
+            ID of the new job
+
+        Raises:
+            PromptNotFoundException: If prompt not found
+        """
+        cli_version = await self._cache_version(bypass_cache)
+
+        def create(session: Session) -> Tuple[str, bool]:
+            job_service = ClaudeJobService(session)
+            job = job_service.create_job(prompt_id, content, instruction)
+            return job.id, self._complete_from_cache(job_service, job, cli_version)
+
+        # Workers start with the app; start them here if a job arrives first
+        await self.start()
+        job_id, cached = await background_runner().run(create)
+        if cached:
+            print(f"[JOBS] Job {job_id} served from the enhancement cache")
+        else:
+            self._enqueue(job_id, PRIORITY_INTERACTIVE)
+        return job_id
+
+    async def submit_batch(
+        self,
+        folder_id: int,
+        instruction: Optional[str] = None,
+        bypass_cache: bool = False
+    ) -> Tuple[str, int]:
+        """
+        Create and queue a job for every prompt in a folder subtree.
+
+        The jobs share a batch ID; the workers (at most
+        CLAUDE_MAX_CONCURRENT_JOBS at a time) apply each result to its prompt,
+        taking interactive jobs submitted meanwhile first. Jobs whose result
+        is cached complete and are applied at once.
+
+        Args:
+            folder_id: Root folder of the subtree
+            instruction: Custom enhancement instruction
+            bypass_cache: Run the CLI even for cached results
+
+        Returns:
+            Tuple of (batch ID, number of jobs)
+
+        Raises:
+            FolderNotFoundException: If folder not found
+        """
+        cli_version = await self._cache_version(bypass_cache)
+        batch_id = f"batch_{uuid.uuid4().hex}"
+
+        def create(session: Session) -> List[Tuple[str, bool]]:
+            job_service = ClaudeJobService(session)
+            jobs = job_service.create_batch_jobs(folder_id, batch_id, instruction)
+            return [
+                (job.id, self._complete_from_cache(job_service, job, cli_version))
+                for job in jobs
+            ]
+
+        await self.start()
+        created = await background_runner().run(create)
+        for job_id, cached in created:
+            if not cached:
+                self._enqueue(job_id, PRIORITY_BACKGROUND)
+
+        hits = sum(1 for _, cached in created if cached)
+        print(f"[JOBS] Batch {batch_id}: {len(created)} jobs for folder {folder_id}, {hits} from the enhancement cache")
+        return batch_id, len(created)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> None:
+        """
+        Wait until a queued job has finished (returns at once for unknown or finished jobs).
+
+        Also returns when the queue stops, possibly before the job has run:
+        check the job's status afterwards.
+
+        Args:
+            job_id: Job ID
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Raises:
+            asyncio.TimeoutError: If the job is still running after timeout
+        """
+        finished = self._finished.get(job_id)
+        if finished is not None:
+            await asyncio.wait_for(finished.wait(), timeout)
+
+    def subscribe(self, job_id: str) -> Optional[asyncio.Queue]:
+        """
+        Follow the output of a queued or running job.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Queue receiving the job's output chunks (those produced so far
+            first), then None once the job has finished; None if the job is not
+            queued (finished or unknown)
+        """
+        if job_id not in self._finished:
+            return None
+        listener = asyncio.Queue()
+        for chunk in self._output.get(job_id, []):
+            listener.put_nowait(chunk)
+        self._listeners.setdefault(job_id, []).append(listener)
+        return listener
+
+    def unsubscribe(self, job_id: str, listener: asyncio.Queue) -> None:
+        """Stop following a job (the job keeps running)."""
+        listeners = self._listeners.get(job_id, [])
+        if listener in listeners:
+            listeners.remove(listener)
+
+    def _publish(self, job_id: str, chunk: str) -> None:
+        """Record a chunk of a job's output and pass it to its listeners."""
+        self._output.setdefault(job_id, []).append(chunk)
+        for listener in self._listeners.get(job_id, []):
+            listener.put_nowait(chunk)
+
+    def _enqueue(self, job_id: str, priority: int) -> None:
+        """Put a job ID on the queue (once) with a PRIORITY_* value and track its completion."""
+        if job_id in self._finished:
+            return
+        self._finished[job_id] = asyncio.Event()
+        self._queue.put_nowait((priority, next(self._sequence), job_id))
+
+    async def _worker(self, number: int) -> None:
+        """Process queued jobs one at a time until cancelled."""
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception as e:
+                print(f"[JOBS ERROR] Worker {number} failed on job {job_id}: {type(e).__name__}: {e}")
+                await self._fail(job_id, f"{type(e).__name__}: {e}")
+            finally:
+                self._queue.task_done()
+                self._output.pop(job_id, None)
+                for listener in self._listeners.pop(job_id, []):
+                    listener.put_nowait(None)
+                finished = self._finished.pop(job_id, None)
+                if finished is not None:
+                    finished.set()
+
+    async def _fail(self, job_id: str, error_message: str) -> None:
+        """Mark a job left processing by an unexpected error as failed."""
+        try:
+            await background_runner().run(
+                lambda session: ClaudeJobService(session).fail_processing_job(job_id, error_message)
+            )
+        except Exception as e:
+            print(f"[JOBS ERROR] Could not mark job {job_id} as failed: {type(e).__name__}: {e}")
+
+    async def _process(self, job_id: str) -> None:
+        """Run the Claude CLI for one job and store its outcome."""
+        runner = background_runner()
+
+        def start(session: Session):
+            job = ClaudeJobService(session).start_job(job_id)
+            return (job.original_content, job.instruction) if job else None
+
+        started = await runner.run(start)
+        if started is None:
+            # Deleted with its prompt, or already handled
+            return
+        original_content, instruction = started
+
+        print(f"[JOBS] Processing job {job_id}")
+        try:
+            enhanced = await self._get_claude_service().enhance_prompt(
+                original_content,
+                instruction,
+                on_chunk=lambda chunk: self._publish(job_id, chunk)
+            )
+        except Exception as e:
+            print(f"[JOBS] Job {job_id} failed: {e}")
+            # Stored without the "Claude CLI error:" prefix the API adds back
+            error_message = e.detail if isinstance(e, ClaudeCLIException) else str(e)
+            await runner.run(lambda session: ClaudeJobService(session).finish_job(
+                job_id, error_message=error_message
+            ))
+            return
+
+        cli_version = await self._cli_version()
+
+        def complete(session: Session) -> None:
+            ClaudeJobService(session).finish_job(job_id, enhanced_content=enhanced)
+            if cli_version is not None:
+                key = self._cache_key(original_content, instruction, cli_version)
+                EnhancementCacheService(session).put(key, enhanced, cli_version)
+
+        await runner.run(complete)
+        print(f"[JOBS] Job {job_id} completed")
+
+    async def _cache_version(self, bypass_cache: bool) -> Optional[str]:
+        """CLI version to look cached results up with, None to skip the lookup."""
+        if bypass_cache:
+            enhancement_cache_counters.increment("bypassed")
+            return None
+        return await self._cli_version()
+
+    def _complete_from_cache(self, job_service: ClaudeJobService, job, cli_version: Optional[str]) -> bool:
+        """Complete a new job from the enhancement cache; returns whether it was cached."""
+        if cli_version is None:
+            return False
+        key = self._cache_key(job.original_content, job.instruction, cli_version)
+        cached = EnhancementCacheService(job_service.db).get(key)
+        if cached is None:
+            return False
+        job_service.finish_job(job.id, enhanced_content=cached)
+        return True
+
+    async def _cli_version(self) -> Optional[str]:
+        """Claude CLI version (probed once), or None if the CLI is unavailable."""
+        try:
+            return await self._get_claude_service().get_version()
+        except ClaudeCLIException:
+            return None
+
+    def _cache_key(self, original_content: str, instruction: Optional[str], cli_version: str) -> str:
+        """Enhancement cache key of a job's inputs."""
+        return cache_key(
+            self._get_claude_service().effective_instruction(instruction),
+            original_content,
+            cli_version
+        )
+
+    def _get_claude_service(self):
+        """Create the Claude CLI service on first use."""
+        if self._claude_service is None:
+            # Imported on first use to keep it off the startup path
+            from app.services.claude_service import ClaudeService
+            self._claude_service = ClaudeService()
+        return self._claude_service
+
+
+claude_job_queue = ClaudeJobQueue(settings.CLAUDE_MAX_CONCURRENT_JOBS)
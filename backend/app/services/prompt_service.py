@@ -1,14 +1,29 @@
 """
 Prompt service - business logic for prompt operations.
 """
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.db import search_index
+from app.db.database import background_runner
 from app.db.models import Prompt, Version
 from app.db.repositories.prompt_repository import PromptRepository
 from app.db.repositories.folder_repository import FolderRepository
-from app.core.exceptions import PromptNotFoundException, FolderNotFoundException
+from app.db.repositories.tag_repository import TagRepository
+from app.core.exceptions import (
+    PromptNotFoundException,
+    FolderNotFoundException,
+    InvalidCursorException
+)
+from app.core.ordering import ORDER_KEY_STEP, key_between, needs_rebalance
+from app.core.pagination import (
+    encode_cursor,
+    decode_cursor,
+    parse_cursor_datetime,
+    parse_cursor_id,
+    parse_cursor_order_key
+)
 
 
 class PromptService:
@@ -24,26 +39,38 @@ class PromptService:
         self.db = db
         self.repo = PromptRepository(db)
         self.folder_repo = FolderRepository(db)
+        self.tag_repo = TagRepository(db)
 
     def get_prompts(
         self,
         folder_id: Optional[int] = None,
         limit: int = 50,
-        offset: int = 0
-    ) -> Tuple[List[Prompt], int]:
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        summary: bool = False
+    ) -> Tuple[List[Prompt], Optional[int], Optional[str]]:
         """
         Get prompts with optional folder filter.
 
+        Supports offset pagination and keyset pagination: pass the
+        next_cursor of the previous page as cursor to continue after it
+        without re-walking earlier rows.
+
         Args:
             folder_id: Filter by folder ID
             limit: Number of results
-            offset: Pagination offset
+            offset: Pagination offset (ignored when cursor is given)
+            cursor: Opaque cursor from a previous page
+            include_total: Whether to count all matching prompts
+            summary: Skip loading content and original_content
 
         Returns:
-            Tuple of (prompts list, total count)
+            Tuple of (prompts list, total count or None, next cursor or None)
 
         Raises:
             FolderNotFoundException: If folder_id provided but folder not found
+            InvalidCursorException: If cursor is malformed
         """
         # Validate folder exists if provided
         if folder_id is not None:
@@ -51,7 +78,28 @@ class PromptService:
             if not folder:
                 raise FolderNotFoundException(folder_id)
 
-        return self.repo.get_all(folder_id, limit, offset)
+        after = None
+        if cursor:
+            display_order, created_at, prompt_id = decode_cursor(cursor, 3)
+            after = (
+                parse_cursor_order_key(display_order, cursor),
+                parse_cursor_datetime(created_at, cursor),
+                parse_cursor_id(prompt_id, cursor)
+            )
+
+        # Fetch one extra row to know whether another page exists
+        prompts, total = self.repo.get_all(
+            folder_id, limit + 1, offset, after=after, with_total=include_total,
+            summary=summary
+        )
+
+        next_cursor = None
+        if len(prompts) > limit:
+            prompts = prompts[:limit]
+            last = prompts[-1]
+            next_cursor = encode_cursor([last.display_order, last.created_at, last.id])
+
+        return prompts, total, next_cursor
 
     def get_prompt_by_id(self, prompt_id: int) -> Prompt:
         """
@@ -100,15 +148,12 @@ class PromptService:
         if not folder:
             raise FolderNotFoundException(folder_id)
 
-        # Get the next display_order for this folder
-        all_prompts, _ = self.repo.get_all(folder_id=folder_id, limit=10000, offset=0)
-        max_order = 0
-        for p in all_prompts:
-            if p.display_order is not None and p.display_order > max_order:
-                max_order = p.display_order
-        next_display_order = max_order + 1
+        # Append after the last prompt of the folder
+        max_order = self.repo.get_max_display_order(folder_id)
+        next_display_order = ORDER_KEY_STEP if max_order is None else max_order + ORDER_KEY_STEP
 
         # Create prompt
+        tags = self._clean_tags(tags)
         prompt = Prompt(
             folder_id=folder_id,
             title=title,
@@ -121,6 +166,9 @@ class PromptService:
         )
         prompt = self.repo.create(prompt)
 
+        # Index tags; committed together with the initial version
+        self.tag_repo.set_prompt_tags(prompt.id, tags)
+
         # Create initial version
         self._create_version(prompt.id, content, "user")
 
@@ -163,12 +211,38 @@ class PromptService:
                 self._create_version(prompt.id, content, "user")
             prompt.content = content
         if tags is not None:
+            tags = self._clean_tags(tags)
             prompt.tags = ",".join(tags) if tags else None
+            self.tag_repo.set_prompt_tags(prompt.id, tags)
 
         prompt.updated_at = datetime.utcnow()
 
         return self.repo.update(prompt)
 
+    def apply_enhancement(self, prompt_id: int, enhanced_content: str) -> Prompt:
+        """
+        Replace a prompt's content with an AI-enhanced version.
+
+        Args:
+            prompt_id: Prompt ID
+            enhanced_content: Enhanced prompt text
+
+        Returns:
+            Updated prompt, marked as AI enhanced
+
+        Raises:
+            PromptNotFoundException: If prompt not found
+        """
+        prompt = self.get_prompt_by_id(prompt_id)
+
+        if prompt.content != enhanced_content:
+            self._create_version(prompt.id, enhanced_content, "claude")
+        prompt.content = enhanced_content
+        prompt.is_ai_enhanced = True
+        prompt.updated_at = datetime.utcnow()
+
+        return self.repo.update(prompt)
+
     def delete_prompt(self, prompt_id: int) -> None:
         """
         Delete a prompt.
@@ -247,7 +321,7 @@ class PromptService:
                 raise FolderNotFoundException(target_folder_id)
 
         # Parse tags
-        tags = original.tags.split(",") if original.tags else []
+        tags = original.tag_list
 
         # Create duplicate
         return self.create_prompt(
@@ -265,11 +339,19 @@ class PromptService:
         created_after: Optional[str] = None,
         created_before: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
-    ) -> Tuple[List[Prompt], int]:
+        offset: int = 0,
+        sort: str = "relevance",
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        match_all_tags: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
         """
         Search prompts by query string with optional filters.
 
+        Each hit carries a content snippet plus the character offsets of every
+        matched term in the title and snippet, taken from the search index.
+        With sort="updated", results can be paged with keyset cursors.
+
         Args:
             query: Search query
             folder_id: Optional folder filter
@@ -277,13 +359,20 @@ class PromptService:
             created_after: Optional date filter (ISO format: YYYY-MM-DD)
             created_before: Optional date filter (ISO format: YYYY-MM-DD)
             limit: Number of results
-            offset: Pagination offset
+            offset: Pagination offset (ignored when cursor is given)
+            sort: "relevance" or "updated"
+            cursor: Opaque cursor from a previous page (sort="updated" only)
+            include_total: Whether to count all matching prompts
+            match_all_tags: Require every tag (AND) rather than any tag (OR)
 
         Returns:
-            Tuple of (prompts list, total count)
+            Tuple of (hits list, total count or None, next cursor or None).
+            Each hit is a dict with keys prompt, snippet, title_matches and
+            snippet_matches.
 
         Raises:
             FolderNotFoundException: If folder_id provided but folder not found
+            InvalidCursorException: If cursor is malformed or used with relevance sort
         """
         # Validate folder exists if provided
         if folder_id is not None:
@@ -291,21 +380,143 @@ class PromptService:
             if not folder:
                 raise FolderNotFoundException(folder_id)
 
-        return self.repo.search(query, folder_id, tags, created_after, created_before, limit, offset)
+        after = None
+        if cursor:
+            if sort != "updated":
+                raise InvalidCursorException(cursor)
+            updated_at, prompt_id = decode_cursor(cursor, 2)
+            after = (parse_cursor_datetime(updated_at, cursor), parse_cursor_id(prompt_id, cursor))
+
+        # Fetch one extra row to know whether another page exists
+        rows, total = self.repo.search(
+            query, folder_id, tags, created_after, created_before, limit + 1, offset,
+            sort=sort, after=after, with_total=include_total,
+            match_all_tags=match_all_tags
+        )
 
-    def reorder_prompts(self, prompt_id: int, new_position: int, folder_id: int) -> List[Prompt]:
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            if sort == "updated":
+                last = rows[-1][0]
+                next_cursor = encode_cursor([last.updated_at, last.id])
+
+        terms = search_index.extract_terms(query)
+        hits = []
+        for prompt, marked_title, marked_snippet in rows:
+            if marked_title is not None:
+                _, title_matches = search_index.parse_marked_text(marked_title)
+                snippet, snippet_matches = search_index.parse_marked_text(marked_snippet or "")
+            else:
+                # Index unavailable - locate matches in Python
+                title_matches = search_index.find_matches(prompt.title, terms)
+                snippet, snippet_matches = search_index.build_snippet(prompt.content, terms)
+
+            hits.append({
+                "prompt": prompt,
+                "snippet": snippet,
+                "title_matches": title_matches,
+                "snippet_matches": snippet_matches
+            })
+
+        return hits, total, next_cursor
+
+    def get_search_facets(
+        self,
+        query: str,
+        folder_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        match_all_tags: bool = True,
+        date_bucket: str = "month"
+    ) -> Dict[str, Any]:
+        """
+        Get facet counts (tags, folders, created date) for a search.
+
+        Folder counts include the matches in each folder's whole subtree,
+        rolled up in memory from the per-folder counts.
+
+        Args:
+            query: Search query
+            folder_id: Optional folder filter
+            tags: Optional tag filters
+            created_after: Optional date filter (ISO format: YYYY-MM-DD)
+            created_before: Optional date filter (ISO format: YYYY-MM-DD)
+            match_all_tags: Require every tag (AND) rather than any tag (OR)
+            date_bucket: Histogram bucket size ("day", "month" or "year")
+
+        Returns:
+            Dict with total, tags, folders and created facet lists
+
+        Raises:
+            FolderNotFoundException: If folder_id provided but folder not found
+        """
+        # Validate folder exists if provided
+        if folder_id is not None:
+            folder = self.folder_repo.get_by_id(folder_id)
+            if not folder:
+                raise FolderNotFoundException(folder_id)
+
+        facets = self.repo.get_search_facets(
+            query, folder_id, tags, created_after, created_before, match_all_tags, date_bucket
+        )
+
+        # Roll per-folder counts up to every ancestor
+        direct_counts = {int(key): count for key, count in facets["folder"]}
+        subtree_counts: Dict[int, int] = {}
+        parents = self.folder_repo.get_parent_map() if direct_counts else {}
+        for current_id, count in direct_counts.items():
+            while current_id is not None:
+                subtree_counts[current_id] = subtree_counts.get(current_id, 0) + count
+                current_id = parents.get(current_id)
+
+        return {
+            "total": sum(direct_counts.values()),
+            "tags": sorted(
+                ({"name": name, "count": count} for name, count in facets["tag"]),
+                key=lambda t: (-t["count"], t["name"])
+            ),
+            "folders": [
+                {
+                    "folder_id": current_id,
+                    "count": direct_counts.get(current_id, 0),
+                    "subtree_count": subtree_count
+                }
+                for current_id, subtree_count in sorted(subtree_counts.items())
+            ],
+            "created": [
+                {"bucket": bucket, "count": count}
+                for bucket, count in sorted(facets["date"])
+                if bucket is not None
+            ]
+        }
+
+    def reorder_prompts(
+        self,
+        prompt_id: int,
+        new_position: int,
+        folder_id: int,
+        summary: bool = False
+    ) -> Tuple[List[Prompt], bool]:
         """
         Reorder a prompt within its folder.
 
-        Moves the specified prompt to the new position and adjusts other prompts accordingly.
+        The prompt gets a fractional display_order key between its new
+        neighbours, so only its own row is written; only the two neighbour
+        keys are read, from the (folder_id, display_order) index. Folders
+        with prompts that have no key yet, or whose gap is exhausted, are
+        renumbered first.
 
         Args:
             prompt_id: ID of the prompt to reorder
             new_position: New position (0-based index) in the folder
             folder_id: Folder ID for validation
+            summary: Skip loading content and original_content
 
         Returns:
-            List of all prompts in the folder with updated display_order
+            Tuple of (all prompts in the folder in their new order,
+            whether the folder's keys should be rebalanced)
 
         Raises:
             PromptNotFoundException: If prompt not found
@@ -325,46 +536,42 @@ class PromptService:
         if not folder:
             raise FolderNotFoundException(folder_id)
 
-        # Get all prompts in the folder ordered by current display_order
-        all_prompts, _ = self.repo.get_all(folder_id=folder_id, limit=10000, offset=0)
-
-        if not all_prompts:
-            return []
-
-        # Validate new_position is within bounds
-        if new_position < 0 or new_position >= len(all_prompts):
-            new_position = max(0, min(new_position, len(all_prompts) - 1))
-
-        # Find current position of the prompt
-        current_position = None
-        for i, p in enumerate(all_prompts):
-            if p.id == prompt_id:
-                current_position = i
-                break
+        # Prompts without a key yet (legacy rows) get one before placing the prompt
+        if self.repo.has_unkeyed_prompts(folder_id):
+            self.repo.rebalance_display_order(folder_id)
 
-        if current_position is None:
-            # Prompt not in list, shouldn't happen but handle it
-            current_position = len(all_prompts)
+        new_position = max(0, new_position)
+        before, after = self._neighbour_keys(folder_id, prompt_id, new_position)
+        current = prompt.display_order
 
-        # Reorder the list
-        if current_position != new_position:
-            # Remove prompt from current position
-            prompt_to_move = all_prompts.pop(current_position)
-            # Insert at new position
-            all_prompts.insert(new_position, prompt_to_move)
+        rebalance_needed = False
+        if not ((before is None or before < current) and (after is None or current < after)):
+            key = key_between(before, after)
+            if key is None:
+                # Gap exhausted: renumber now and place between the new keys
+                self.repo.rebalance_display_order(folder_id)
+                before, after = self._neighbour_keys(folder_id, prompt_id, new_position)
+                key = key_between(before, after)
 
-        # Update display_order for all prompts
-        for i, p in enumerate(all_prompts):
-            p.display_order = i
-            self.db.add(p)
+            self.repo.set_display_order(prompt_id, key)
+            rebalance_needed = needs_rebalance(before, key) or needs_rebalance(key, after)
 
-        self.db.commit()
-
-        # Refresh all prompts to get updated values
-        for p in all_prompts:
-            self.db.refresh(p)
+        all_prompts, _ = self.repo.get_all(
+            folder_id=folder_id, limit=None, offset=0, with_total=False, summary=summary
+        )
+        return all_prompts, rebalance_needed
 
-        return all_prompts
+    def _neighbour_keys(
+        self,
+        folder_id: int,
+        prompt_id: int,
+        position: int
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """Keys of the prompts that will precede and follow a prompt moved to position (None at the ends)."""
+        after = self.repo.get_order_key_at(folder_id, position, exclude_id=prompt_id)
+        if position == 0:
+            return None, after
+        return self.repo.get_order_key_before(folder_id, after, exclude_id=prompt_id), after
 
     def count_easy_access_prompts(self) -> int:
         """
@@ -375,16 +582,24 @@ class PromptService:
         """
         return self.repo.count_easy_access()
 
-    def get_easy_access_prompts(self) -> List[Prompt]:
+    def get_easy_access_prompts(self, summary: bool = False) -> List[Prompt]:
         """
         Get all prompts marked as easy access.
 
+        Args:
+            summary: Skip loading content and original_content
+
         Returns:
             List of easy access prompts (max 8)
         """
-        return self.repo.get_easy_access_prompts()
+        return self.repo.get_easy_access_prompts(summary=summary)
 
-    def reorder_easy_access_prompts(self, prompt_id: int, new_position: int) -> List[Prompt]:
+    def reorder_easy_access_prompts(
+        self,
+        prompt_id: int,
+        new_position: int,
+        summary: bool = False
+    ) -> List[Prompt]:
         """
         Reorder easy access prompts.
 
@@ -394,6 +609,7 @@ class PromptService:
         Args:
             prompt_id: ID of the prompt to reorder
             new_position: New position (0-based index) in the easy access list
+            summary: Skip loading content and original_content
 
         Returns:
             List of all easy access prompts with updated easy_access_order
@@ -411,39 +627,30 @@ class PromptService:
             raise ValueError(f"Prompt {prompt_id} is not marked as easy access")
 
         # Get all easy access prompts ordered by current easy_access_order
-        all_prompts = self.repo.get_easy_access_prompts()
-
-        if not all_prompts:
-            return []
+        all_prompts = self.repo.get_easy_access_prompts(summary=summary)
 
-        # Validate new_position is within bounds
-        if new_position < 0 or new_position >= len(all_prompts):
-            new_position = max(0, min(new_position, len(all_prompts) - 1))
+        # Move the prompt and renumber the list in one statement
+        return self.repo.reorder_easy_access(all_prompts, prompt_id, new_position)
 
-        # Find current position of the prompt
-        current_position = None
-        for i, p in enumerate(all_prompts):
-            if p.id == prompt_id:
-                current_position = i
-                break
-
-        if current_position is None:
-            # Prompt not in list, shouldn't happen but handle it
-            current_position = len(all_prompts)
-
-        # Reorder the list
-        if current_position != new_position:
-            # Remove prompt from current position
-            prompt_to_move = all_prompts.pop(current_position)
-            # Insert at new position
-            all_prompts.insert(new_position, prompt_to_move)
-
-        # Update easy_access_order for all prompts
-        for i, p in enumerate(all_prompts):
-            p.easy_access_order = i + 1  # 1-based ordering
-            self.repo.update(p)
+    def get_tag_counts(self) -> List[Tuple[str, int]]:
+        """
+        Get the number of prompts carrying each tag.
 
-        return all_prompts
+        Returns:
+            List of (tag name, prompt count), most used first
+        """
+        return self.tag_repo.get_tag_counts()
+
+    def _clean_tags(self, tags: Optional[List[str]]) -> List[str]:
+        """Trim tags and drop empty and duplicate (case-insensitive) entries."""
+        cleaned = []
+        seen = set()
+        for tag in tags or []:
+            tag = tag.strip()
+            if tag and tag.lower() not in seen:
+                seen.add(tag.lower())
+                cleaned.append(tag)
+        return cleaned
 
     def _create_version(self, prompt_id: int, content: str, created_by: str) -> Version:
         """Create a version entry for a prompt."""
@@ -455,3 +662,16 @@ class PromptService:
             created_by=created_by
         )
         return self.repo.create_version(version)
+
+
+async def rebalance_folder_order(folder_id: int) -> None:
+    """
+    Renumber a folder's prompt display_order keys (run as a background task).
+
+    Args:
+        folder_id: Folder ID
+    """
+    count = await background_runner().run(
+        lambda session: PromptRepository(session).rebalance_display_order(folder_id)
+    )
+    print(f"[REORDER] Rebalanced display_order of {count} prompts in folder {folder_id}")
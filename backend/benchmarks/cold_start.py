@@ -0,0 +1,147 @@
+"""
+Benchmark: cold start of the API process.
+
+Starts the backend the way the launch script does (python -m app.main, with
+DEBUG off so no reloader process is spawned) against a throwaway SQLite database and measures the time until the
+widget's first request, GET /api/prompts/easy-access/list, succeeds. The
+first start creates the schema; the following starts find it current. The
+process runs with -X importtime, and the slowest imports of the last start
+are listed.
+
+Usage (from the backend directory):
+    python -m benchmarks.cold_start [--runs 5] [--budget-ms 2500] [--top 15]
+
+Exits with status 1 if the median warm start exceeds the budget.
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Request the widget sends first
+WIDGET_PATH = "/api/prompts/easy-access/list"
+
+# Target for a warm start (schema current), spawn to first widget response
+STARTUP_BUDGET_MS = 2500
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_once(database_url: str, timeout: float = 60.0) -> Tuple[float, str]:
+    """
+    Start the backend and wait for the widget request to succeed.
+
+    Args:
+        database_url: Database the backend uses
+        timeout: Seconds to wait before giving up
+
+    Returns:
+        Tuple of (milliseconds from spawn to first successful response, stderr)
+    """
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, DEBUG="False", HOST="127.0.0.1", PORT=str(port))
+    command = [sys.executable, "-X", "importtime", "-m", "app.main"]
+    url = f"http://127.0.0.1:{port}{WIDGET_PATH}"
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        elapsed = (time.perf_counter() - start) * 1000
+                        break
+            except OSError:
+                pass
+            if process.poll() is not None:
+                raise RuntimeError(f"Backend exited with status {process.returncode}")
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"Backend did not answer {WIDGET_PATH} within {timeout}s")
+            time.sleep(0.005)
+    finally:
+        process.terminate()
+        _, stderr = process.communicate(timeout=10)
+    return elapsed, stderr
+
+
+def slowest_imports(stderr: str, top: int) -> List[Tuple[int, str]]:
+    """
+    Parse -X importtime output into the slowest top-level and app imports.
+
+    Args:
+        stderr: Captured stderr of the backend process
+        top: Number of entries to return
+
+    Returns:
+        List of (cumulative microseconds, module) sorted slowest first
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, depth, module = int(match.group(2)), len(match.group(3)), match.group(4)
+        # Imports made directly by a top-level import, plus every module of this app
+        if depth <= 3 or module.startswith(("app.", "migrations")):
+            entries.append((cumulative, module))
+    return sorted(entries, reverse=True)[:top]
+
+
+def run(runs: int, budget_ms: float, top: int) -> bool:
+    """Run the starts and print timings. Returns True if the warm start is within budget."""
+    directory = tempfile.mkdtemp()
+    database_url = f"sqlite:///{directory}/cold_start.db"
+
+    first, _ = start_once(database_url)
+    print(f"[BENCH] first start (creates schema): {first:9.1f} ms")
+
+    timings = []
+    stderr = ""
+    for _ in range(runs):
+        elapsed, stderr = start_once(database_url)
+        timings.append(elapsed)
+    median = statistics.median(timings)
+    print(f"[BENCH] warm start (schema current):  {median:9.1f} ms median of {runs} "
+          f"(min {min(timings):.1f}, max {max(timings):.1f})")
+
+    print("[BENCH] slowest imports of the last start (cumulative):")
+    for cumulative, module in slowest_imports(stderr, top):
+        print(f"[BENCH]   {cumulative / 1000:9.1f} ms  {module}")
+
+    ok = median <= budget_ms
+    status = "OK  " if ok else "FAIL"
+    print(f"[BENCH] {status} warm start {median:.1f} ms, budget {budget_ms:.0f} ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Warm starts to time")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="Warm start budget")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.runs, args.budget_ms, args.top) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: moving a large folder subtree.
+
+Builds a subtree of N folders in a throwaway SQLite database and moves it to
+a new parent twice: once with the legacy recursive path rewrite (one query
+per folder to load children, one UPDATE per folder) and once with
+FolderService.move_folder (closure-table relink + one set-based UPDATE).
+
+Usage (from the backend directory):
+    python -m benchmarks.folder_path_rewrite [--folders 5000] [--fanout 10]
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.models import Folder
+from app.db.repositories.folder_repository import FolderRepository
+from app.services.folder_service import FolderService
+from migrations import add_folder_closure
+
+
+def build_subtree(engine, root_name: str, total: int, fanout: int) -> int:
+    """
+    Insert a top-level folder with total - 1 descendants, fanout children per node.
+
+    Returns:
+        ID of the subtree root
+    """
+    now = datetime.utcnow()
+    rows = [{"id": 1, "name": root_name, "parent_id": None, "path": f"/{root_name}"}]
+    for index in range(1, total):
+        parent = rows[(index - 1) // fanout]
+        rows.append({
+            "id": index + 1,
+            "name": f"f{index}",
+            "parent_id": parent["id"],
+            "path": f"{parent['path']}/f{index}",
+        })
+    for row in rows:
+        row["created_at"] = row["updated_at"] = now
+
+    with engine.begin() as connection:
+        connection.execute(Folder.__table__.insert(), rows)
+        add_folder_closure.migrate(connection)
+    return 1
+
+
+def legacy_move_folder(db, folder: Folder, new_parent_id: int) -> None:
+    """Previous FolderService.move_folder path rewrite: recursive, one folder at a time."""
+    repo = FolderRepository(db)
+
+    def update_folder_paths(node: Folder) -> None:
+        if node.parent_id is None:
+            node.path = f"/{node.name}"
+        else:
+            parent = repo.get_by_id(node.parent_id)
+            node.path = f"{parent.path.rstrip('/')}/{node.name}"
+        for child in repo.get_by_parent_id(node.id):
+            update_folder_paths(child)
+
+    folder.parent_id = new_parent_id
+    folder.updated_at = datetime.utcnow()
+    update_folder_paths(folder)
+    db.commit()
+
+
+def run(total: int, fanout: int) -> None:
+    """Run both implementations against fresh databases and print timings."""
+    results = {}
+    for label in ("recursive", "set-based"):
+        directory = tempfile.mkdtemp()
+        engine = create_engine(f"sqlite:///{directory}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        subtree_id = build_subtree(engine, "Source", total, fanout)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            target_id = FolderRepository(db).create(
+                Folder(name="Target", parent_id=None, path="/Target")
+            ).id
+            db.expunge_all()
+
+            start = time.perf_counter()
+            if label == "recursive":
+                legacy_move_folder(db, FolderRepository(db).get_by_id(subtree_id), target_id)
+            else:
+                FolderService(db).move_folder(subtree_id, target_id)
+            results[label] = time.perf_counter() - start
+
+            moved = db.query(Folder).filter(Folder.path.like("/Target/Source%")).count()
+            print(f"[BENCH] {label:>9}: {results[label] * 1000:9.1f} ms ({moved} paths rewritten)")
+        finally:
+            db.close()
+            engine.dispose()
+
+    print(f"[BENCH] speedup: {results['recursive'] / results['set-based']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folders", type=int, default=5000, help="Folders in the moved subtree")
+    parser.add_argument("--fanout", type=int, default=10, help="Children per folder")
+    args = parser.parse_args()
+    run(args.folders, args.fanout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: creating a prompt in a large folder.
+
+Fills one folder with N prompts in a throwaway SQLite database, then times
+PromptService.create_prompt in that folder and in an empty folder, and
+compares the previous next-display_order lookup (load up to 10,000 prompt
+rows and scan them) with the indexed MAX() now used.
+
+Usage (from the backend directory):
+    python -m benchmarks.prompt_create [--prompts 20000] [--runs 50]
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.models import Folder, Prompt
+from app.db.repositories.folder_repository import FolderRepository
+from app.db.repositories.prompt_repository import PromptRepository
+from app.services.prompt_service import PromptService
+
+
+def legacy_next_display_order(db, folder_id: int) -> int:
+    """Previous PromptService.create_prompt lookup of the next display_order."""
+    all_prompts, _ = PromptRepository(db).get_all(folder_id=folder_id, limit=10000, offset=0)
+    max_order = 0
+    for p in all_prompts:
+        if p.display_order is not None and p.display_order > max_order:
+            max_order = p.display_order
+    return max_order + 1
+
+
+def fill_folder(engine, folder_id: int, total: int) -> None:
+    """Bulk insert total prompts with sequential display_order into a folder."""
+    now = datetime.utcnow()
+    content = "Lorem ipsum dolor sit amet. " * 40
+    rows = [
+        {
+            "folder_id": folder_id,
+            "title": f"Prompt {i}",
+            "content": content,
+            "original_content": content,
+            "is_ai_enhanced": False,
+            "is_easy_access": False,
+            "display_order": float(i + 1),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(total)
+    ]
+    with engine.begin() as connection:
+        connection.execute(Prompt.__table__.insert(), rows)
+
+
+def timed(runs: int, func) -> float:
+    """Average wall time of func over runs calls, in milliseconds."""
+    start = time.perf_counter()
+    for i in range(runs):
+        func(i)
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def run(total: int, runs: int) -> None:
+    """Fill a database and print timings."""
+    directory = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{directory}/bench.db")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        folders = FolderRepository(db)
+        large_id = folders.create(Folder(name="Large", parent_id=None, path="/Large")).id
+        empty_id = folders.create(Folder(name="Empty", parent_id=None, path="/Empty")).id
+        fill_folder(engine, large_id, total)
+
+        repo = PromptRepository(db)
+        service = PromptService(db)
+
+        print(f"[BENCH] next display_order in a folder of {total} prompts:")
+        legacy = timed(runs, lambda i: (legacy_next_display_order(db, large_id), db.expunge_all()))
+        indexed = timed(runs, lambda i: repo.get_max_display_order(large_id))
+        print(f"[BENCH]   load-and-scan: {legacy:9.3f} ms")
+        print(f"[BENCH]   indexed MAX(): {indexed:9.3f} ms ({legacy / indexed:.0f}x faster)")
+
+        print("[BENCH] create_prompt:")
+        for label, folder_id in (("empty folder", empty_id), (f"{total}-prompt folder", large_id)):
+            elapsed = timed(runs, lambda i: service.create_prompt(folder_id, f"New {i}", "Content"))
+            print(f"[BENCH]   {label:>20}: {elapsed:9.3f} ms")
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=20000, help="Prompts in the large folder")
+    parser.add_argument("--runs", type=int, default=50, help="Timed calls per measurement")
+    args = parser.parse_args()
+    run(args.prompts, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Query plan regression check.
+
+Convenience wrapper around tests/test_query_plans.py, which EXPLAINs the hot
+repository queries and fails on full table scans, sorts and queries not
+driven by their expected index. The test runs with the rest of the suite;
+this script runs it alone, verbosely.
+
+With --database-url the check also runs against that PostgreSQL database
+(passed on as TEST_POSTGRESQL_URL; use a throwaway database, its tables are
+dropped and recreated).
+
+Usage (from the backend directory):
+    python -m benchmarks.query_plans [--database-url postgresql://...]
+
+Exits with pytest's status (non-zero if any query plan regresses).
+"""
+import argparse
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="Throwaway PostgreSQL database to check as well")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["TEST_POSTGRESQL_URL"] = args.database_url
+    sys.exit(pytest.main(["-v", os.path.join(BACKEND_DIR, "tests", "test_query_plans.py")]))
+
+
+if __name__ == "__main__":
+    main()
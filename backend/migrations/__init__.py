@@ -1,7 +1,30 @@
 """
 Database migrations for Prompt Manager.
+
+MIGRATIONS lists every migration in order as (version, module name). Each
+module has a migrate(connection) function; migrations.runner imports and
+applies the pending ones and records them in the schema_version table.
+Modules are only imported when they run, so checking that the schema is
+current stays cheap at startup.
 """
-from . import add_display_order as migration_003_add_display_order
-from . import add_folder_display_order as migration_004_add_folder_display_order
 
-__all__ = ['migration_003_add_display_order', 'migration_004_add_folder_display_order']
+MIGRATIONS = [
+    (3, "add_display_order"),
+    (4, "add_folder_display_order"),
+    (5, "add_easy_access"),
+    (6, "add_easy_access_order"),
+    (7, "add_prompt_search_index"),
+    (8, "add_tag_tables"),
+    (9, "add_folder_closure"),
+    (10, "add_prompt_order_index"),
+    (11, "add_composite_indexes"),
+    (12, "add_root_folder"),
+    (13, "add_claude_job_queue"),
+    (14, "add_enhancement_cache"),
+    (15, "add_claude_job_batches"),
+    (16, "alter_display_order_float"),
+    (17, "add_folder_tree_generation"),
+    (18, "alter_tag_name_text"),
+]
+
+__all__ = ['MIGRATIONS']
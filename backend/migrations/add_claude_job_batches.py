@@ -0,0 +1,25 @@
+"""
+Migration 015: Add bulk enhancement columns to claude_jobs
+
+This migration adds batch_id (the bulk folder enhancement a job belongs to)
+and applied_at (when a batch job's result was applied to its prompt), and the
+batch_id + status index used to report a batch's progress.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 015] Adding batch columns to claude_jobs")
+
+    columns = [column["name"] for column in inspect(connection).get_columns("claude_jobs")]
+    if "batch_id" not in columns:
+        connection.execute(text("ALTER TABLE claude_jobs ADD COLUMN batch_id VARCHAR(50)"))
+    if "applied_at" not in columns:
+        connection.execute(text("ALTER TABLE claude_jobs ADD COLUMN applied_at TIMESTAMP"))
+
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_claude_jobs_batch_id_status "
+        "ON claude_jobs (batch_id, status)"
+    ))
@@ -0,0 +1,26 @@
+"""
+Migration 013: Prepare claude_jobs for the enhancement job queue
+
+This migration adds the instruction column (custom enhancement instruction of
+a job, NULL for the default one) and the status + created_at index the queue
+uses to find unfinished jobs on startup.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 013] Preparing claude_jobs for the job queue")
+
+    inspector = inspect(connection)
+    columns = [column["name"] for column in inspector.get_columns("claude_jobs")]
+    if "instruction" in columns:
+        print(f"[MIGRATION 013] Column 'instruction' already exists - skipping")
+    else:
+        connection.execute(text("ALTER TABLE claude_jobs ADD COLUMN instruction TEXT"))
+
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_claude_jobs_status_created_at "
+        "ON claude_jobs (status, created_at)"
+    ))
@@ -0,0 +1,60 @@
+"""
+Migration 011: Replace single-column indexes with composite indexes
+
+This migration creates composite indexes matching the filter + sort shape of
+the hot queries (prompt lists, easy access list, folder children, version
+history) and drops the single-column indexes they make redundant, including
+the idx_* indexes created by the legacy migrations and the indexes on
+INTEGER PRIMARY KEY columns (which SQLite already looks up by rowid).
+"""
+from sqlalchemy.engine import Connection
+from sqlalchemy import text
+
+from app.db.models import Folder, Prompt, Version
+
+COMPOSITE_INDEXES = [
+    "ix_prompts_folder_id_list_order",
+    "ix_prompts_list_order",
+    "ix_prompts_easy_access_order_title",
+    "ix_folders_parent_id_display_order",
+    "ix_versions_prompt_id_version_number",
+]
+
+REDUNDANT_INDEXES = [
+    # Primary keys
+    "ix_folders_id",
+    "ix_prompts_id",
+    "ix_versions_id",
+    "ix_tags_id",
+    # Leading columns of a composite index
+    "ix_prompts_folder_id_display_order",
+    "ix_prompts_display_order",
+    "ix_prompts_is_easy_access",
+    "ix_prompts_easy_access_order",
+    "ix_prompts_title",
+    "ix_folders_display_order",
+    # Legacy migrations 003-006
+    "idx_prompts_display_order",
+    "idx_prompts_easy_access",
+    "idx_prompts_easy_access_order",
+    "idx_folders_display_order",
+]
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 011] Creating composite indexes")
+
+    indexes = {
+        index.name: index
+        for table in (Folder.__table__, Prompt.__table__, Version.__table__)
+        for index in table.indexes
+    }
+    for name in COMPOSITE_INDEXES:
+        indexes[name].create(connection, checkfirst=True)
+
+    for name in REDUNDANT_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    print(f"[MIGRATION 011] Created {len(COMPOSITE_INDEXES)} composite indexes, "
+          f"dropped redundant single-column indexes")
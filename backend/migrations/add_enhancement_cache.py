@@ -0,0 +1,17 @@
+"""
+Migration 014: Add enhancement_cache table
+
+This migration creates the enhancement_cache table, which stores Claude
+enhancement results keyed by a hash of (instruction, prompt, CLI version)
+so repeated enhancements don't run the CLI again.
+"""
+from sqlalchemy.engine import Connection
+
+from app.db.models import EnhancementCacheEntry
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 014] Creating enhancement_cache table")
+
+    EnhancementCacheEntry.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,46 @@
+"""
+Migration 009: Add folder_closure table
+
+This migration creates the folder_closure table, which stores one row per
+(ancestor, descendant) pair of the folder hierarchy, and back-fills it from
+folders.parent_id with a single recursive query.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.models import FolderClosure
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 009] Creating folder_closure table")
+
+    FolderClosure.__table__.create(connection, checkfirst=True)
+
+    missing = connection.execute(text("""
+        SELECT COUNT(*) FROM folders f
+        WHERE NOT EXISTS (
+            SELECT 1 FROM folder_closure c
+            WHERE c.ancestor_id = f.id AND c.descendant_id = f.id
+        )
+    """)).scalar()
+    if not missing:
+        print(f"[MIGRATION 009] folder_closure already populated - skipping back-fill")
+        return
+
+    # Rebuild the whole table so partially populated data cannot leave stale links
+    connection.execute(text("DELETE FROM folder_closure"))
+    connection.execute(text("""
+        WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM folders
+            UNION ALL
+            SELECT tree.ancestor_id, folders.id, tree.depth + 1
+            FROM tree
+            JOIN folders ON folders.parent_id = tree.descendant_id
+        )
+        INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM tree
+    """))
+
+    total = connection.execute(text("SELECT COUNT(*) FROM folder_closure")).scalar()
+    print(f"[MIGRATION 009] Indexed {total} folder closure rows")
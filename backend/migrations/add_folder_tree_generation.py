@@ -0,0 +1,21 @@
+"""
+Migration 017: Add folder_tree_generation table
+
+This migration creates the single-row folder_tree_generation counter. Folder
+mutations bump it in their own transaction, and the folder tree cache of
+every worker process compares its entry against it.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.models import FolderTreeGeneration
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print("[MIGRATION 017] Creating folder_tree_generation table")
+
+    FolderTreeGeneration.__table__.create(connection, checkfirst=True)
+
+    if connection.execute(text("SELECT 1 FROM folder_tree_generation")).first() is None:
+        connection.execute(FolderTreeGeneration.__table__.insert().values(id=1, generation=0))
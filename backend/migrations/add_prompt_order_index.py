@@ -0,0 +1,24 @@
+"""
+Migration 010: Add (folder_id, display_order) index on prompts
+
+This migration adds the composite index used to find the last display_order
+of a folder with MAX() when a prompt is created, without scanning the folder.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 010] Creating index ix_prompts_folder_id_display_order")
+
+    # Superseded by ix_prompts_folder_id_list_order (Migration 011)
+    indexes = {index["name"] for index in inspect(connection).get_indexes("prompts")}
+    if "ix_prompts_folder_id_list_order" in indexes:
+        print(f"[MIGRATION 010] Superseded by ix_prompts_folder_id_list_order - skipping")
+        return
+
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_prompts_folder_id_display_order "
+        "ON prompts (folder_id, display_order)"
+    ))
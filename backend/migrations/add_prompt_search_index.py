@@ -0,0 +1,22 @@
+"""
+Migration 007: Add FTS5 full-text index for prompts
+
+This migration creates the prompts_fts virtual table and the triggers that keep
+it in sync with the prompts table, then indexes all existing prompts. On SQLite
+builds without FTS5 it does nothing and search falls back to ILIKE scans.
+On PostgreSQL it adds the generated prompts.search_vector tsvector column and
+its GIN index instead.
+"""
+from sqlalchemy.engine import Connection
+
+from app.db.search_index import create_search_index
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 007] Creating full-text search index for prompts")
+
+    if create_search_index(connection):
+        print(f"[MIGRATION 007] Search index ready")
+    else:
+        print(f"[MIGRATION 007] Full-text search not available - search will use ILIKE fallback")
@@ -0,0 +1,33 @@
+"""
+Migration 012: Create the root folder
+
+Every folder hangs off a single root folder (parent_id NULL, path "/").
+This migration creates it together with its folder_closure self-link unless
+a root folder already exists. Previously init_db looked it up on every start.
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.models import Folder, FolderClosure
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 012] Creating root folder")
+
+    if connection.execute(text("SELECT 1 FROM folders WHERE parent_id IS NULL")).first() is not None:
+        print(f"[MIGRATION 012] Root folder already exists - skipping")
+        return
+
+    now = datetime.utcnow()
+    root_id = connection.execute(
+        Folder.__table__.insert().values(
+            name="Root", parent_id=None, path="/", created_at=now, updated_at=now
+        )
+    ).inserted_primary_key[0]
+    connection.execute(
+        FolderClosure.__table__.insert().values(ancestor_id=root_id, descendant_id=root_id, depth=0)
+    )
+    print(f"[OK] Database initialized with root folder")
@@ -0,0 +1,60 @@
+"""
+Migration 008: Add normalized tags and prompt_tags tables
+
+This migration creates the tags and prompt_tags tables used for indexed tag
+filtering and back-fills them from the comma-separated prompts.tags column.
+The prompts.tags column is kept as the display copy of each prompt's tags.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.models import Tag, PromptTag
+from app.db.repositories.tag_repository import normalize_tag_name
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print(f"[MIGRATION 008] Creating tags and prompt_tags tables")
+
+    Tag.__table__.create(connection, checkfirst=True)
+    PromptTag.__table__.create(connection, checkfirst=True)
+
+    if connection.execute(text("SELECT 1 FROM prompt_tags LIMIT 1")).first() is not None:
+        print(f"[MIGRATION 008] prompt_tags already populated - skipping back-fill")
+        return
+
+    rows = connection.execute(
+        text("SELECT id, tags FROM prompts WHERE tags IS NOT NULL AND tags != ''")
+    ).fetchall()
+    if not rows:
+        return
+
+    # Collect normalized tag names per prompt
+    prompt_tag_names = {}
+    for prompt_id, tags in rows:
+        names = {normalize_tag_name(t) for t in tags.split(",") if t.strip()}
+        if names:
+            prompt_tag_names[prompt_id] = names
+
+    all_names = set().union(*prompt_tag_names.values()) if prompt_tag_names else set()
+    existing = {name for (name,) in connection.execute(text("SELECT name FROM tags"))}
+    new_names = sorted(all_names - existing)
+    if new_names:
+        connection.execute(
+            text("INSERT INTO tags (name) VALUES (:name)"),
+            [{"name": name} for name in new_names]
+        )
+
+    tag_ids = {name: tag_id for tag_id, name in connection.execute(text("SELECT id, name FROM tags"))}
+    links = [
+        {"prompt_id": prompt_id, "tag_id": tag_ids[name]}
+        for prompt_id, names in prompt_tag_names.items()
+        for name in names
+    ]
+    if links:
+        connection.execute(
+            text("INSERT INTO prompt_tags (prompt_id, tag_id) VALUES (:prompt_id, :tag_id)"),
+            links
+        )
+
+    print(f"[MIGRATION 008] Indexed {len(links)} tag links for {len(prompt_tag_names)} prompts")
@@ -0,0 +1,58 @@
+"""
+Migration 016: Store prompt display_order as a float
+
+Prompts use fractional display_order keys (see app.core.ordering), but
+migration 003 added the column as INTEGER. PostgreSQL would truncate
+fractional keys, so the column is converted to DOUBLE PRECISION. SQLite
+cannot change a column's type in place: the values are copied into a new
+FLOAT column that replaces the old one, and the list order indexes are
+created again. Databases created from the models already have a float
+column and are left alone.
+"""
+import sqlite3
+
+from sqlalchemy import Float, inspect, text
+from sqlalchemy.engine import Connection
+
+from app.db.models import Prompt
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print("[MIGRATION 016] Converting prompts.display_order to a float column")
+
+    inspector = inspect(connection)
+    column = next(c for c in inspector.get_columns("prompts") if c["name"] == "display_order")
+    if isinstance(column["type"], Float):
+        print("[MIGRATION 016] Column is already a float - skipping")
+        return
+
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "ALTER TABLE prompts ALTER COLUMN display_order TYPE DOUBLE PRECISION"
+        ))
+        return
+
+    if sqlite3.sqlite_version_info < (3, 35, 0):
+        # No DROP COLUMN; INTEGER affinity still stores fractional keys as REAL
+        print(f"[MIGRATION 016] SQLite {sqlite3.sqlite_version} cannot drop columns - skipping")
+        return
+
+    # Indexes on the column must go before it can be dropped
+    indexed = [
+        index["name"] for index in inspector.get_indexes("prompts")
+        if "display_order" in index["column_names"]
+    ]
+    for name in indexed:
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    connection.execute(text("ALTER TABLE prompts ADD COLUMN display_order_float FLOAT"))
+    connection.execute(text("UPDATE prompts SET display_order_float = display_order"))
+    connection.execute(text("ALTER TABLE prompts DROP COLUMN display_order"))
+    connection.execute(text("ALTER TABLE prompts RENAME COLUMN display_order_float TO display_order"))
+
+    for index in Prompt.__table__.indexes:
+        if "display_order" in index.columns:
+            index.create(connection, checkfirst=True)
+
+    print(f"[MIGRATION 016] Rebuilt display_order, dropped and recreated {len(indexed)} indexes")
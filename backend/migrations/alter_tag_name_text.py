@@ -0,0 +1,26 @@
+"""
+Migration 018: Store tag names as TEXT
+
+Migration 008 created tags.name as VARCHAR(100), while a prompt's tags
+column holds up to 1000 characters, so PostgreSQL rejected longer tags.
+The column is widened to TEXT there. SQLite does not enforce VARCHAR
+lengths and is left alone, as are databases created from the models.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def migrate(connection: Connection):
+    """Run the migration."""
+    print("[MIGRATION 018] Converting tags.name to a TEXT column")
+
+    if connection.dialect.name != "postgresql":
+        print("[MIGRATION 018] SQLite does not enforce the length - skipping")
+        return
+
+    column = next(c for c in inspect(connection).get_columns("tags") if c["name"] == "name")
+    if getattr(column["type"], "length", None) is None:
+        print("[MIGRATION 018] Column is already unbounded - skipping")
+        return
+
+    connection.execute(text("ALTER TABLE tags ALTER COLUMN name TYPE TEXT"))
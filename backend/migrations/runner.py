@@ -0,0 +1,153 @@
+"""
+Versioned migration runner.
+
+Applied migrations are recorded in the schema_version table, one row per
+version. Each pending migration runs once, together with the insert of its
+version row, in a single transaction on the configured engine, so a failed
+migration leaves neither partial changes nor a version row behind.
+
+Usage (from the backend directory):
+    python -m migrations.runner            # apply pending migrations
+    python -m migrations.runner --status   # list applied and pending versions
+"""
+import argparse
+import importlib
+from datetime import datetime
+from typing import List, Set
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from migrations import MIGRATIONS
+
+# Arbitrary key of the PostgreSQL advisory lock serializing concurrent runners
+MIGRATION_LOCK_KEY = 7_310_019
+
+# Kept on its own MetaData so it is created here, before any migration runs
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def latest_version() -> int:
+    """Version of the newest migration."""
+    return MIGRATIONS[-1][0]
+
+
+def applied_versions(connection: Connection) -> Set[int]:
+    """
+    Get the versions recorded in schema_version.
+
+    Args:
+        connection: SQLAlchemy connection
+
+    Returns:
+        Set of applied versions (empty if the table doesn't exist yet)
+    """
+    if not inspect(connection).has_table(schema_version.name):
+        return set()
+    return set(connection.execute(select(schema_version.c.version)).scalars())
+
+
+def is_current(engine: Engine) -> bool:
+    """
+    Check whether every migration has been applied, with a single query.
+
+    Args:
+        engine: Engine of the database to check
+
+    Returns:
+        True if the newest migration is recorded in schema_version
+    """
+    try:
+        with engine.connect() as connection:
+            newest = connection.execute(select(func.max(schema_version.c.version))).scalar()
+    except DBAPIError:
+        # No schema_version table yet
+        return False
+    return newest is not None and newest >= latest_version()
+
+
+def _begin_exclusive(connection: Connection) -> None:
+    """Make the current transaction cover DDL and exclude concurrent runners."""
+    if connection.dialect.name == "sqlite":
+        # pysqlite only opens a transaction before DML; begin explicitly so
+        # ALTER/CREATE statements roll back with the rest of the migration
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    elif connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Apply every pending migration, each in its own transaction.
+
+    Args:
+        engine: Engine of the database to migrate
+
+    Returns:
+        Versions applied by this call
+
+    Raises:
+        Exception: Whatever the failing migration raised; earlier migrations stay applied
+    """
+    schema_version.create(engine, checkfirst=True)
+
+    applied = []
+    for version, name in MIGRATIONS:
+        with engine.begin() as connection:
+            _begin_exclusive(connection)
+
+            # Re-check under the lock: another process may have applied it meanwhile
+            if version in applied_versions(connection):
+                continue
+
+            try:
+                module = importlib.import_module(f"migrations.{name}")
+                module.migrate(connection)
+            except Exception as e:
+                print(f"[MIGRATION {version:03d}] Failed, rolled back: {e}")
+                raise
+
+            connection.execute(schema_version.insert().values(
+                version=version,
+                name=name,
+                applied_at=datetime.utcnow()
+            ))
+        applied.append(version)
+
+    if applied:
+        print(f"[MIGRATION] Applied {len(applied)} migrations, schema at version {latest_version():03d}")
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="List versions instead of migrating")
+    args = parser.parse_args()
+
+    from app.db import models  # noqa: F401 - registers the tables on Base.metadata
+    from app.db.database import Base, engine
+
+    # Migrations alter existing tables; create any missing ones first, as init_db does
+    Base.metadata.create_all(bind=engine)
+
+    if args.status:
+        with engine.connect() as connection:
+            applied = applied_versions(connection)
+        for version, name in MIGRATIONS:
+            state = "applied" if version in applied else "pending"
+            print(f"[MIGRATION {version:03d}] {state:8} {name}")
+        return
+
+    if not run_migrations(engine):
+        print(f"[MIGRATION] Schema is current (version {latest_version():03d})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Batch enhancement tests: a folder subtree enhanced through the job queue.
+"""
+import asyncio
+
+import pytest
+
+from app.core.exceptions import ClaudeCLIException
+from app.db.models import ClaudeJob, Prompt, Version
+from app.services.claude_job_service import ClaudeJobService
+from app.services.folder_service import FolderService
+from app.services.prompt_service import PromptService
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def subtree(app_db):
+    """Prompts in top, top/mid and top/mid/leaf, plus one outside the subtree, by content."""
+    folders = FolderService(app_db)
+    top = folders.create_folder("top", None)
+    mid = folders.create_folder("mid", top.id)
+    leaf = folders.create_folder("leaf", mid.id)
+    outside = folders.create_folder("outside", None)
+    service = PromptService(app_db)
+    prompts = {
+        content: service.create_prompt(folder.id, content, content).id
+        for folder, content in [(top, "One"), (mid, "Two"), (mid, "Edited"), (leaf, "Fails"), (outside, "Outside")]
+    }
+    top_id = top.id
+    app_db.commit()
+    return top_id, prompts
+
+
+@pytest.mark.asyncio
+async def test_batch_over_a_subtree(app_db, job_queue, claude, subtree):
+    top_id, prompts = subtree
+    release = asyncio.Event()
+
+    async def enhance_prompt(original_prompt, enhancement_instruction=None, on_chunk=None):
+        claude.calls.append(original_prompt)
+        await release.wait()
+        if original_prompt == "Fails":
+            raise ClaudeCLIException("rejected")
+        return f"Enhanced: {original_prompt}"
+    claude.enhance_prompt = enhance_prompt
+
+    batch_id, total = await job_queue.submit_batch(top_id)
+    # Edited by hand while the batch is running
+    PromptService(app_db).update_prompt(prompts["Edited"], content="Edited by hand")
+    job_ids = [job_id for (job_id,) in app_db.query(ClaudeJob.id).filter(ClaudeJob.batch_id == batch_id)]
+    app_db.commit()
+    while not claude.calls:
+        await asyncio.sleep(0.01)
+    running = ClaudeJobService(app_db).get_batch_progress(batch_id)
+    app_db.commit()
+    assert (running["pending"], running["processing"], running["done"]) == (3, 1, False)
+    release.set()
+    for job_id in job_ids:
+        await job_queue.wait(job_id, TIMEOUT)
+
+    assert total == len(job_ids) == 4
+    progress = ClaudeJobService(app_db).get_batch_progress(batch_id)
+    assert {name: progress[name] for name in ("total", "completed", "failed", "applied", "skipped")} == {
+        "total": 4, "completed": 3, "failed": 1, "applied": 2, "skipped": 1
+    }
+    assert progress["done"] and progress["progress"] == 1.0
+
+    contents = dict(app_db.query(Prompt.id, Prompt.content))
+    assert {content: contents[prompt_id] for content, prompt_id in prompts.items()} == {
+        "One": "Enhanced: One",
+        "Two": "Enhanced: Two",
+        "Edited": "Edited by hand",
+        "Fails": "Fails",
+        "Outside": "Outside",
+    }
+    claude_versions = app_db.query(Version.prompt_id).filter(Version.created_by == "claude")
+    assert sorted(prompt_id for (prompt_id,) in claude_versions) == sorted([prompts["One"], prompts["Two"]])
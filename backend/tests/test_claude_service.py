@@ -0,0 +1,66 @@
+"""
+Claude CLI subprocess tests, with small shell scripts standing in for the CLI.
+"""
+import os
+import time
+
+import pytest
+
+from app.core.exceptions import ClaudeCLIException
+from app.services.claude_service import stream_cli
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="fake CLI is a shell script")
+
+
+@pytest.fixture
+def fake_cli(tmp_path):
+    """Write an executable shell script and return its path."""
+    def write(body: str) -> str:
+        path = tmp_path / "claude"
+        path.write_text(f"#!/bin/sh\n{body}\n")
+        path.chmod(0o755)
+        return str(path)
+    return write
+
+
+async def run(executable: str, input_text=None, timeout: float = 5) -> str:
+    """Collect the whole output of stream_cli."""
+    return "".join([chunk async for chunk in stream_cli(executable, [], input_text, timeout)])
+
+
+@pytest.mark.asyncio
+async def test_output_of_the_input(fake_cli):
+    assert await run(fake_cli("cat"), "héllo") == "héllo"
+
+
+@pytest.mark.asyncio
+async def test_cli_exiting_without_reading_its_input(fake_cli):
+    executable = fake_cli("echo 'unknown option' >&2\nexit 2")
+
+    # Larger than any pipe buffer, so writing it fails once the CLI is gone
+    with pytest.raises(ClaudeCLIException) as error:
+        await run(executable, "x" * (4 * 1024 * 1024))
+
+    assert error.value.detail == "unknown option"
+
+
+@pytest.mark.asyncio
+async def test_non_zero_exit_reports_stderr(fake_cli):
+    with pytest.raises(ClaudeCLIException) as error:
+        await run(fake_cli("cat >/dev/null\necho 'rate limited' >&2\nexit 1"), "prompt")
+
+    assert error.value.detail == "rate limited"
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_the_process(fake_cli, tmp_path):
+    pid_file = tmp_path / "pid"
+    executable = fake_cli(f"echo $$ > {pid_file}\nexec sleep 30")
+    started = time.monotonic()
+
+    with pytest.raises(ClaudeCLIException, match="timed out"):
+        await run(executable, timeout=0.5)
+
+    assert time.monotonic() - started < 5
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
@@ -0,0 +1,102 @@
+"""
+Connection tests on the application's SQLite database: the pragma profile,
+the read-only pool, and writers sharing the single writer connection.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db import database
+from app.db.database import SessionLocal, apply_sqlite_pragmas, engine, read_engine, report_sqlite_pragmas
+from app.db.models import Tag
+
+WRITERS = 8
+
+SYNCHRONOUS_LEVELS = ["OFF", "NORMAL", "FULL", "EXTRA"]
+
+
+def pragma(connection, name: str) -> str:
+    """Effective value of a pragma, as text."""
+    return str(connection.exec_driver_sql(f"PRAGMA {name}").scalar())
+
+
+def test_connections_get_the_pragma_profile(app_db):
+    with engine.connect() as connection:
+        assert pragma(connection, "journal_mode").upper() == settings.SQLITE_JOURNAL_MODE
+        # Reported as its numeric code
+        assert pragma(connection, "synchronous") == str(SYNCHRONOUS_LEVELS.index(settings.SQLITE_SYNCHRONOUS))
+        assert pragma(connection, "busy_timeout") == str(settings.SQLITE_BUSY_TIMEOUT)
+    with read_engine.connect() as connection:
+        assert pragma(connection, "busy_timeout") == str(settings.SQLITE_BUSY_TIMEOUT)
+
+    effective = report_sqlite_pragmas()
+
+    assert effective["journal_mode"].upper() == settings.SQLITE_JOURNAL_MODE
+    assert effective["synchronous"] == settings.SQLITE_SYNCHRONOUS
+
+
+def test_unsupported_pragma_value_is_reported(monkeypatch, capsys):
+    # In-memory databases can't use WAL and stay in "memory" journal mode
+    memory_engine = create_engine("sqlite://")
+    event.listen(memory_engine, "connect", apply_sqlite_pragmas)
+    monkeypatch.setattr(database, "engine", memory_engine)
+
+    effective = report_sqlite_pragmas()
+
+    assert effective["journal_mode"] == "memory"
+    output = capsys.readouterr().out
+    assert f"[WARNING] PRAGMA journal_mode is memory, configured {settings.SQLITE_JOURNAL_MODE}" in output
+    assert "PRAGMA busy_timeout is" not in output
+
+
+def test_read_pool_rejects_writes(app_db):
+    assert read_engine is not engine
+
+    with read_engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM folders")).scalar() == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(text("INSERT INTO tags (name) VALUES ('written')"))
+
+
+def test_concurrent_writers_queue_for_the_writer(app_db):
+    checked_out = []
+    most_checked_out = []
+    lock = threading.Lock()
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with lock:
+            checked_out.append(connection_record)
+            most_checked_out.append(len(checked_out))
+
+    def on_checkin(dbapi_connection, connection_record):
+        with lock:
+            checked_out.remove(connection_record)
+
+    def write(number: int) -> None:
+        session = SessionLocal()
+        try:
+            session.execute(text("INSERT INTO tags (name) VALUES (:name)"), {"name": f"writer {number}"})
+            # Hold the write transaction open while the other writers arrive
+            time.sleep(0.05)
+            session.commit()
+        finally:
+            session.close()
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    try:
+        with ThreadPoolExecutor(max_workers=WRITERS) as executor:
+            # Raises if any writer failed, e.g. with "database is locked"
+            list(executor.map(write, range(WRITERS)))
+    finally:
+        event.remove(engine, "checkout", on_checkout)
+        event.remove(engine, "checkin", on_checkin)
+
+    assert max(most_checked_out) == 1
+    assert app_db.query(Tag).count() == WRITERS
+    app_db.commit()
@@ -0,0 +1,118 @@
+"""
+Enhancement cache tests: the cache service on every backend, and the job
+queue serving results from it.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.db.models import ClaudeJob, EnhancementCacheEntry
+from app.db.repositories.claude_repository import JOB_COMPLETED
+from app.services import enhancement_cache
+from app.services.enhancement_cache import EnhancementCacheService, cache_key, enhancement_cache_counters
+
+from tests.conftest import DEFAULT_INSTRUCTION
+
+TIMEOUT = 5
+
+
+class Clock:
+    """Stand-in for datetime whose utcnow() moves a second forward on every call."""
+
+    def __init__(self):
+        """Start the clock at a fixed time."""
+        self.now = datetime(2024, 1, 1)
+
+    def utcnow(self) -> datetime:
+        """Next distinct timestamp."""
+        self.now += timedelta(seconds=1)
+        return self.now
+
+
+def counter_deltas(before):
+    """Change of each cache counter since the snapshot before."""
+    after = enhancement_cache_counters.snapshot()
+    return {name: after[name] - before[name] for name in after}
+
+
+def test_lookup_misses_then_hits(db):
+    cache = EnhancementCacheService(db)
+    key = cache_key(DEFAULT_INSTRUCTION, "Original", "1.0.0")
+    before = enhancement_cache_counters.snapshot()
+
+    assert cache.get(key) is None
+    cache.put(key, "Enhanced", "1.0.0")
+    assert cache.get(key) == "Enhanced"
+
+    assert counter_deltas(before) == {"hits": 1, "misses": 1, "bypassed": 0}
+    assert db.get(EnhancementCacheEntry, key).hit_count == 1
+
+
+def test_new_cli_version_misses(db):
+    cache = EnhancementCacheService(db)
+    cache.put(cache_key(DEFAULT_INSTRUCTION, "Original", "1.0.0"), "Enhanced", "1.0.0")
+
+    assert cache.get(cache_key(DEFAULT_INSTRUCTION, "Original", "1.1.0")) is None
+    assert cache.get(cache_key("Other instruction", "Original", "1.0.0")) is None
+
+
+def test_least_recently_used_entries_are_evicted(db, monkeypatch):
+    monkeypatch.setattr(settings, "ENHANCEMENT_CACHE_SIZE", 2)
+    monkeypatch.setattr(enhancement_cache, "datetime", Clock())
+    cache = EnhancementCacheService(db)
+
+    cache.put("a", "A", "1.0.0")
+    cache.put("b", "B", "1.0.0")
+    assert cache.get("a") == "A"
+    cache.put("c", "C", "1.0.0")
+
+    assert {key for (key,) in db.query(EnhancementCacheEntry.key)} == {"a", "c"}
+    cache.put("d", "D", "1.0.0")
+    assert {key for (key,) in db.query(EnhancementCacheEntry.key)} == {"c", "d"}
+
+
+async def enhance(app_db, job_queue, prompt_id: int, **options) -> ClaudeJob:
+    """Submit a job, wait for it and return it as stored."""
+    job_id = await job_queue.submit(prompt_id, **options)
+    await job_queue.wait(job_id, TIMEOUT)
+    app_db.expire_all()
+    job = app_db.get(ClaudeJob, job_id)
+    app_db.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_repeated_job_is_served_from_the_cache(app_db, job_queue, claude, app_prompt_id):
+    first = await enhance(app_db, job_queue, app_prompt_id)
+    second = await enhance(app_db, job_queue, app_prompt_id)
+
+    assert (second.status, second.enhanced_content) == (JOB_COMPLETED, first.enhanced_content)
+    assert len(claude.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cli_upgrade_misses_the_cache(app_db, job_queue, claude, app_prompt_id):
+    await enhance(app_db, job_queue, app_prompt_id)
+    claude.version = "2.0.0"
+    claude.prefix = "Upgraded: "
+
+    job = await enhance(app_db, job_queue, app_prompt_id)
+
+    assert job.enhanced_content == "Upgraded: Original"
+    assert len(claude.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_bypass_replaces_the_cached_result(app_db, job_queue, claude, app_prompt_id):
+    await enhance(app_db, job_queue, app_prompt_id)
+    claude.prefix = "Better: "
+    before = enhancement_cache_counters.snapshot()
+
+    bypassed = await enhance(app_db, job_queue, app_prompt_id, bypass_cache=True)
+    cached = await enhance(app_db, job_queue, app_prompt_id)
+
+    assert bypassed.enhanced_content == cached.enhanced_content == "Better: Original"
+    assert len(claude.calls) == 2
+    assert counter_deltas(before) == {"hits": 1, "misses": 0, "bypassed": 1}
+    assert app_db.query(EnhancementCacheEntry).count() == 1
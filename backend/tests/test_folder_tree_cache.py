@@ -0,0 +1,106 @@
+"""
+Folder tree cache tests: every folder mutation bumps the generation stored
+in the database, which invalidates the cached tree of every worker process,
+and clients holding an old ETag get the new tree.
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Folder
+from app.db.repositories.folder_repository import FolderRepository
+from app.main import app
+from app.services.folder_service import FolderService
+from app.services.folder_tree_cache import FolderTreeCache, folder_tree_cache
+
+from tests.conftest import create_root
+
+# Each changes the tree Root/{a/b, d}
+MUTATIONS = {
+    "create": lambda service, root, a, b, d: service.create_folder("c", a.id),
+    "rename": lambda service, root, a, b, d: service.update_folder(b.id, "renamed"),
+    "move": lambda service, root, a, b, d: service.move_folder(b.id, root.id),
+    "delete": lambda service, root, a, b, d: service.delete_folder(b.id),
+    "reorder": lambda service, root, a, b, d: service.reorder_folders(d.id, 0, root.id),
+}
+
+
+def tree_paths(tree):
+    """Folder paths of a serialized tree, depth first."""
+    def walk(nodes):
+        for node in nodes:
+            yield node["path"]
+            yield from walk(node["children"])
+    return list(walk(json.loads(tree.body)["folders"]))
+
+
+@pytest.mark.parametrize("mutation", MUTATIONS)
+def test_folder_mutation_bumps_the_generation(db, make_folder, mutation):
+    root = create_root(db)
+    a = make_folder("a", root.id)
+    b = make_folder("b", a.id)
+    d = make_folder("d", root.id)
+    service = FolderService(db)
+    cached = service.get_folder_tree_json()
+    assert folder_tree_cache.get(cached.generation) is cached
+
+    MUTATIONS[mutation](service, root, a, b, d)
+
+    generation = FolderRepository(db).get_tree_generation()
+    assert generation == cached.generation + 1
+    assert folder_tree_cache.get(generation) is None
+    rebuilt = service.get_folder_tree_json()
+    assert rebuilt.generation == generation
+    assert rebuilt.etag != cached.etag
+    assert tree_paths(rebuilt) != tree_paths(cached)
+
+
+def test_mutation_in_another_worker_invalidates_the_cache(db, db_engine, make_folder):
+    root = create_root(db)
+    a_id = make_folder("a", root.id).id
+    service = FolderService(db)
+    cached = service.get_folder_tree_json()
+    assert service.get_folder_tree_json() is cached
+    db.commit()
+
+    # Another worker process: its own session, and nothing touches this process's cache
+    other = sessionmaker(bind=db_engine, autoflush=False)()
+    try:
+        FolderService(other).update_folder(a_id, "renamed")
+    finally:
+        other.close()
+
+    assert folder_tree_cache.get(cached.generation) is cached
+    rebuilt = service.get_folder_tree_json()
+    assert rebuilt.generation == cached.generation + 1
+    assert tree_paths(rebuilt) == ["/renamed"]
+
+
+def test_cache_serves_only_the_current_generation():
+    cache = FolderTreeCache()
+    entry = cache.store(3, b'{"folders": []}')
+
+    assert cache.get(3) is entry
+    assert cache.get(4) is None
+    cache.clear()
+    assert cache.get(3) is None
+
+
+def test_stale_etag_gets_the_new_tree(app_db):
+    root_id = app_db.query(Folder.id).filter(Folder.parent_id.is_(None)).scalar()
+    app_db.commit()
+
+    with TestClient(app) as client:
+        first = client.get("/api/folders")
+        etag = first.headers["ETag"]
+        assert client.get("/api/folders", headers={"If-None-Match": etag}).status_code == 304
+
+        assert client.post("/api/folders", json={"name": "Added", "parent_id": root_id}).status_code == 201
+        response = client.get("/api/folders", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert "Added" in response.text
+        assert client.get("/api/folders", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
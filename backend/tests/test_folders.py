@@ -0,0 +1,138 @@
+"""
+Folder closure table tests, run against every backend in conftest.BACKENDS.
+
+After every folder operation the closure rows must equal the pairs derived
+from the parent_id links. The folder tree route's prompt counts roll up
+over the same subtrees.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.exceptions import InvalidParentFolderException
+from app.db.models import Folder, FolderClosure, Prompt, PromptTag, Version
+from app.main import app
+from app.services.folder_service import FolderService
+from app.services.prompt_service import PromptService
+
+
+def closure_rows(db):
+    """All (ancestor_id, descendant_id, depth) rows of the closure table."""
+    return {
+        (row.ancestor_id, row.descendant_id, row.depth)
+        for row in db.query(FolderClosure.ancestor_id, FolderClosure.descendant_id, FolderClosure.depth)
+    }
+
+
+def expected_closure(db):
+    """Closure rows implied by walking the parent_id links."""
+    parents = dict(db.query(Folder.id, Folder.parent_id))
+    rows = set()
+    for folder_id in parents:
+        ancestor_id, depth = folder_id, 0
+        while ancestor_id is not None:
+            rows.add((ancestor_id, folder_id, depth))
+            ancestor_id, depth = parents[ancestor_id], depth + 1
+    return rows
+
+
+@pytest.fixture
+def tree(db, make_folder):
+    """Folders a/b/c and a sibling top-level folder d."""
+    a = make_folder("a")
+    b = make_folder("b", a.id)
+    c = make_folder("c", b.id)
+    d = make_folder("d")
+    return a, b, c, d
+
+
+def test_create_links_every_ancestor(db, tree):
+    a, b, c, d = tree
+
+    assert closure_rows(db) == expected_closure(db)
+    assert {(a.id, c.id, 2), (b.id, c.id, 1), (c.id, c.id, 0)} <= closure_rows(db)
+
+
+def test_move_relinks_the_subtree(db, tree):
+    a, b, c, d = tree
+
+    FolderService(db).move_folder(b.id, d.id)
+
+    assert closure_rows(db) == expected_closure(db)
+    assert (d.id, c.id, 2) in closure_rows(db)
+    assert not any(ancestor == a.id and descendant != a.id for ancestor, descendant, _ in closure_rows(db))
+    assert db.get(Folder, c.id).path == "/d/b/c"
+
+    FolderService(db).move_folder(b.id, None)
+
+    assert closure_rows(db) == expected_closure(db)
+    assert db.get(Folder, c.id).path == "/b/c"
+
+
+def test_delete_removes_the_subtree(db, tree, make_prompt):
+    a, b, c, d = tree
+    doomed = make_prompt(c.id, "Doomed", tags=["gone"])
+    db.add(Version(prompt_id=doomed.id, content="Old", version_number=2, created_by="user"))
+    kept = make_prompt(d.id, "Kept", tags=["gone"])
+    db.commit()
+    a_id, d_id, doomed_id, kept_id = a.id, d.id, doomed.id, kept.id
+
+    FolderService(db).delete_folder(b.id)
+
+    assert {folder_id for (folder_id,) in db.query(Folder.id)} == {a_id, d_id}
+    assert closure_rows(db) == expected_closure(db)
+    assert [prompt_id for (prompt_id,) in db.query(Prompt.id)] == [kept_id]
+    assert db.query(Version).filter(Version.prompt_id == doomed_id).count() == 0
+    assert [row.prompt_id for row in db.query(PromptTag)] == [kept_id]
+
+
+@pytest.mark.parametrize("target", ["itself", "child", "grandchild"])
+def test_move_into_own_subtree_is_rejected(db, tree, target):
+    a, b, c, d = tree
+    new_parent = {"itself": a, "child": b, "grandchild": c}[target]
+    before = closure_rows(db)
+
+    with pytest.raises(InvalidParentFolderException):
+        FolderService(db).move_folder(a.id, new_parent.id)
+
+    db.rollback()
+    assert closure_rows(db) == before
+    assert db.get(Folder, a.id).parent_id is None
+
+
+def tree_counts(client, **params):
+    """GET the folder tree; map each folder name to its (prompt_count, subtree_prompt_count)."""
+    response = client.get("/api/folders", params=params)
+    assert response.status_code == 200
+    counts = {}
+
+    def walk(nodes):
+        for node in nodes:
+            counts[node["name"]] = (node.get("prompt_count"), node.get("subtree_prompt_count"))
+            walk(node["children"])
+    walk(response.json()["folders"])
+    return counts
+
+
+def test_tree_counts_roll_up_subtrees(app_db):
+    root_id = app_db.query(Folder.id).filter(Folder.parent_id.is_(None)).scalar()
+    folders = FolderService(app_db)
+    a = folders.create_folder("a", root_id)
+    b = folders.create_folder("b", a.id)
+    c = folders.create_folder("c", b.id)
+    folders.create_folder("d", root_id)
+    prompts = PromptService(app_db)
+    for folder, count in [(a, 1), (b, 2), (c, 1)]:
+        for number in range(count):
+            prompts.create_prompt(folder.id, f"{folder.name}{number}", "Content")
+    c_id = c.id
+    app_db.commit()
+
+    with TestClient(app) as client:
+        assert tree_counts(client) == {name: (None, None) for name in "abcd"}
+        assert tree_counts(client, include_counts=True) == {
+            "a": (1, 4), "b": (2, 3), "c": (1, 1), "d": (0, 0)
+        }
+
+        # Prompt changes don't touch the folder tree generation; counts are never cached
+        assert client.post("/api/prompts", json={"folder_id": c_id, "title": "c1", "content": "Content"}).status_code == 201
+        assert tree_counts(client, include_counts=True)["a"] == (1, 5)
@@ -0,0 +1,228 @@
+"""
+Claude job queue tests, on the application's database with a fake Claude service.
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routers import claude as claude_routes
+from app.core.config import settings
+from app.core.exceptions import ClaudeCLIException
+from app.db.database import background_runner
+from app.db.models import ClaudeJob
+from app.db.repositories.claude_repository import JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_PROCESSING
+from app.main import app
+from app.services.claude_job_service import ClaudeJobService
+from app.services.folder_service import FolderService
+from app.services.job_queue import claude_job_queue
+from app.services.prompt_service import PromptService
+
+TIMEOUT = 5
+
+
+def load_job(app_db, job_id: str) -> ClaudeJob:
+    """Read a job as the workers left it."""
+    app_db.expire_all()
+    job = app_db.get(ClaudeJob, job_id)
+    app_db.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_submitted_job_completes(app_db, job_queue, app_prompt_id):
+    job_id = await job_queue.submit(app_prompt_id, bypass_cache=True)
+    await job_queue.wait(job_id, TIMEOUT)
+
+    job = load_job(app_db, job_id)
+    assert job.status == JOB_COMPLETED
+    assert job.enhanced_content == "Enhanced: Original"
+    assert job.completed_at is not None
+
+
+@pytest.mark.asyncio
+async def test_cli_failure_fails_the_job(app_db, job_queue, claude, app_prompt_id):
+    claude.error = ClaudeCLIException("timed out")
+
+    job_id = await job_queue.submit(app_prompt_id, bypass_cache=True)
+    await job_queue.wait(job_id, TIMEOUT)
+
+    job = load_job(app_db, job_id)
+    assert job.status == JOB_FAILED
+    assert job.error_message == "timed out"
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_after_start_fails_the_job(app_db, job_queue, claude, app_prompt_id):
+    async def broken_version():
+        raise RuntimeError("version probe crashed")
+    # Raised from _process after the job was started, outside its CLI error handling
+    claude.get_version = broken_version
+
+    job_id = await job_queue.submit(app_prompt_id, bypass_cache=True)
+    await job_queue.wait(job_id, TIMEOUT)
+
+    job = load_job(app_db, job_id)
+    assert job.status == JOB_FAILED
+    assert job.error_message == "RuntimeError: version probe crashed"
+
+
+@pytest.mark.asyncio
+async def test_start_requeues_interrupted_jobs(app_db, job_queue, claude, app_prompt_id):
+    job_ids = []
+    for status in (JOB_PENDING, JOB_PROCESSING):
+        job = ClaudeJobService(app_db).create_job(app_prompt_id)
+        job.status = status
+        job_ids.append(job.id)
+    app_db.commit()
+
+    await job_queue.start()
+    for job_id in job_ids:
+        await job_queue.wait(job_id, TIMEOUT)
+
+    assert [load_job(app_db, job_id).status for job_id in job_ids] == [JOB_COMPLETED, JOB_COMPLETED]
+    assert len(claude.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_waiters_and_listeners(app_db, job_queue, claude, app_prompt_id):
+    claude.release = asyncio.Event()
+    running = await job_queue.submit(app_prompt_id, bypass_cache=True)
+    queued = await job_queue.submit(app_prompt_id, bypass_cache=True)
+    listeners = [job_queue.subscribe(running), job_queue.subscribe(queued)]
+    waiters = [asyncio.create_task(job_queue.wait(job_id)) for job_id in (running, queued)]
+    # Let the single worker pick up the first job
+    while not claude.calls:
+        await asyncio.sleep(0.01)
+
+    await job_queue.stop()
+
+    await asyncio.wait_for(asyncio.gather(*waiters), TIMEOUT)
+    for listener in listeners:
+        assert await asyncio.wait_for(listener.get(), TIMEOUT) is None
+    # Both are picked up again on the next start
+    assert load_job(app_db, running).status == JOB_PROCESSING
+    assert load_job(app_db, queued).status == JOB_PENDING
+
+
+@pytest.mark.asyncio
+async def test_interactive_jobs_go_ahead_of_batch_jobs(app_db, job_queue, claude, app_prompt_id):
+    folder = FolderService(app_db).create_folder("Batch", None)
+    for content in ("B1", "B2", "B3"):
+        PromptService(app_db).create_prompt(folder.id, content, content)
+    folder_id = folder.id
+    app_db.commit()
+    claude.release = asyncio.Event()
+    batch_id, _ = await job_queue.submit_batch(folder_id, bypass_cache=True)
+    # The single worker holds the first batch job while the rest wait
+    while not claude.calls:
+        await asyncio.sleep(0.01)
+
+    job_id = await job_queue.submit(app_prompt_id, content="Interactive", bypass_cache=True)
+    claude.release.set()
+    batch_job_ids = [job_id for (job_id,) in app_db.query(ClaudeJob.id).filter(ClaudeJob.batch_id == batch_id)]
+    app_db.commit()
+    for waited in batch_job_ids + [job_id]:
+        await job_queue.wait(waited, TIMEOUT)
+
+    contents = [content for content, _ in claude.calls]
+    assert contents[1] == "Interactive"
+    assert sorted(contents[:1] + contents[2:]) == ["B1", "B2", "B3"]
+
+
+def parse_events(lines):
+    """(event, data) pairs of Server-Sent Event lines."""
+    lines = [line for line in lines if line]
+    return [
+        (event[len("event: "):], json.loads(data[len("data: "):]))
+        for event, data in zip(lines[::2], lines[1::2])
+    ]
+
+
+def stream_events(client, job_id: str):
+    """GET a job's event stream and return its (event, data) pairs."""
+    with client.stream("GET", f"/api/claude/stream/{job_id}") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        return parse_events(response.iter_lines())
+
+
+@pytest.fixture
+def client(monkeypatch, claude):
+    """Test client whose job queue runs on the fake Claude service."""
+    monkeypatch.setattr(claude_job_queue, "_claude_service", claude)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_stream_follows_a_running_job(app_db, client, claude, app_prompt_id):
+    async def enhance_while_followed(original_prompt, enhancement_instruction=None, on_chunk=None):
+        on_chunk("Enhanced: ")
+        # Finish only once the stream below is following the job
+        while not claude_job_queue._listeners:
+            await asyncio.sleep(0.01)
+        on_chunk(original_prompt)
+        return f"Enhanced: {original_prompt}"
+    claude.enhance_prompt = enhance_while_followed
+
+    job_id = client.post("/api/claude/rewrite", json={"prompt_id": app_prompt_id, "bypass_cache": True}).json()["job_id"]
+
+    (status, started), (first, first_data), *rest = stream_events(client, job_id)
+
+    assert status == "status" and started["status"] in (JOB_PENDING, JOB_PROCESSING)
+    assert first == "chunk" and first_data.pop("ttfb_ms") >= 0
+    assert [(first, first_data)] + rest == [
+        ("chunk", {"text": "Enhanced: "}),
+        ("chunk", {"text": "Original"}),
+        ("done", {"job_id": job_id, "original": "Original", "enhanced": "Enhanced: Original"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_starts_before_the_first_output(app_db, job_queue, claude, app_prompt_id, monkeypatch):
+    # TestClient buffers whole responses, so call the route directly
+    monkeypatch.setattr(claude_routes, "claude_job_queue", job_queue)
+    claude.release = asyncio.Event()
+    job_id = await job_queue.submit(app_prompt_id, bypass_cache=True)
+
+    response = await asyncio.wait_for(claude_routes.stream_job(job_id, background_runner()), TIMEOUT)
+    events = response.body_iterator
+    status = await asyncio.wait_for(events.__anext__(), TIMEOUT)
+    claude.release.set()
+    rest = [event async for event in events]
+
+    assert parse_events(status.splitlines())[0][0] == "status"
+    assert [event for event, _ in parse_events("".join(rest).splitlines())] == ["chunk", "done"]
+
+
+def test_stream_of_a_finished_job_ends_at_once(app_db, client, claude, app_prompt_id):
+    claude.error = ClaudeCLIException("timed out")
+    job_id = client.post("/api/claude/rewrite", json={"prompt_id": app_prompt_id, "bypass_cache": True}).json()["job_id"]
+    while client.get(f"/api/claude/status/{job_id}").json()["status"] != JOB_FAILED:
+        pass
+
+    assert stream_events(client, job_id) == [
+        ("status", {"job_id": job_id, "status": JOB_FAILED}),
+        ("error", {"job_id": job_id, "code": "CLAUDE_CLI_ERROR", "message": "timed out"}),
+    ]
+    assert len(claude.calls) == 1
+
+
+def test_enhance_route_answers_503_while_the_job_runs(app_db, client, claude, app_prompt_id, monkeypatch):
+    claude.release = asyncio.Event()
+    monkeypatch.setattr(settings, "CLAUDE_TIMEOUT", 0.1)
+
+    response = client.post(f"/api/prompts/{app_prompt_id}/enhance", json={"bypass_cache": True})
+
+    assert response.status_code == 503
+    detail = response.json()["detail"]
+    assert detail["status"] in (JOB_PENDING, JOB_PROCESSING)
+    assert client.get(f"/api/claude/status/{detail['job_id']}").json()["status"] == detail["status"]
+
+
+def test_stream_of_an_unknown_job_is_rejected(app_db, client):
+    response = client.get("/api/claude/stream/missing")
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "CLAUDE_JOB_NOT_FOUND"
@@ -0,0 +1,145 @@
+"""
+Migration tests, run against every backend in conftest.BACKENDS.
+
+Upgrades start from the baseline schema (folders and prompts only, as the
+first release created them).
+"""
+import sys
+import types
+
+import pytest
+from sqlalchemy import Float, create_engine, inspect, text
+
+from app.db.database import Base
+from migrations import MIGRATIONS, runner
+from migrations.runner import applied_versions, is_current, run_migrations, schema_version
+
+from tests.conftest import create_schema, drop_schema
+
+
+def create_baseline_schema(engine) -> None:
+    """Create the baseline folders and prompts tables with one prompt."""
+    primary_key = "SERIAL PRIMARY KEY" if engine.dialect.name == "postgresql" else "INTEGER PRIMARY KEY"
+    with engine.begin() as connection:
+        connection.execute(text(f"""
+            CREATE TABLE folders (
+                id {primary_key}, name VARCHAR(255) NOT NULL, parent_id INTEGER,
+                path VARCHAR(1000) NOT NULL, created_at TIMESTAMP, updated_at TIMESTAMP
+            )
+        """))
+        connection.execute(text(f"""
+            CREATE TABLE prompts (
+                id {primary_key}, folder_id INTEGER NOT NULL, title VARCHAR(500) NOT NULL,
+                description VARCHAR(1000), content TEXT NOT NULL, original_content TEXT,
+                tags VARCHAR(500), is_ai_enhanced BOOLEAN, created_at TIMESTAMP, updated_at TIMESTAMP
+            )
+        """))
+        connection.execute(text(
+            "INSERT INTO folders (name, parent_id, path, created_at, updated_at) "
+            "VALUES ('Root', NULL, '/', '2024-01-01', '2024-01-01')"
+        ))
+        connection.execute(text(
+            "INSERT INTO prompts (folder_id, title, content, tags, is_ai_enhanced, created_at, updated_at) "
+            "VALUES (1, 'Legacy', 'Old content', 'a,b', FALSE, '2024-01-02', '2024-01-02')"
+        ))
+
+
+@pytest.fixture
+def baseline_engine(db_engine, tmp_path):
+    """Engine of a database holding only the baseline schema."""
+    if db_engine.dialect.name == "postgresql":
+        drop_schema(db_engine)
+        create_baseline_schema(db_engine)
+        yield db_engine
+        # Leave the shared database migrated for the other tests
+        drop_schema(db_engine)
+        create_schema(db_engine)
+    else:
+        engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+        create_baseline_schema(engine)
+        yield engine
+        engine.dispose()
+
+
+def upgrade(engine):
+    """Upgrade as init_db does: create missing tables, then apply pending migrations."""
+    Base.metadata.create_all(bind=engine)
+    return run_migrations(engine)
+
+
+def test_baseline_upgrade_applies_every_migration(baseline_engine):
+    applied = upgrade(baseline_engine)
+
+    assert applied == [version for version, _ in MIGRATIONS]
+    assert is_current(baseline_engine)
+    with baseline_engine.connect() as connection:
+        assert applied_versions(connection) == set(applied)
+        assert connection.execute(text("SELECT title, display_order FROM prompts")).all() == [("Legacy", 1)]
+        tags = connection.execute(text(
+            "SELECT tags.name FROM prompt_tags JOIN tags ON tags.id = prompt_tags.tag_id ORDER BY tags.name"
+        )).scalars().all()
+        assert tags == ["a", "b"]
+        assert connection.execute(text("SELECT COUNT(*) FROM folder_closure")).scalar() == 1
+
+
+def test_second_run_is_a_no_op(baseline_engine):
+    upgrade(baseline_engine)
+
+    assert upgrade(baseline_engine) == []
+
+
+def migrate_then_fail(connection):
+    """Migration doing DDL and DML, then failing."""
+    connection.execute(text("CREATE TABLE half_done (id INTEGER)"))
+    connection.execute(text("ALTER TABLE prompts ADD COLUMN half_done INTEGER"))
+    connection.execute(text("UPDATE prompts SET title = 'Changed'"))
+    raise RuntimeError("migration failed halfway")
+
+
+def test_failing_migration_rolls_back(baseline_engine, monkeypatch):
+    upgrade(baseline_engine)
+    failing = types.ModuleType("migrations.failing")
+    failing.migrate = migrate_then_fail
+    monkeypatch.setitem(sys.modules, "migrations.failing", failing)
+    monkeypatch.setattr(runner, "MIGRATIONS", MIGRATIONS + [(99, "failing")])
+
+    with pytest.raises(RuntimeError, match="halfway"):
+        run_migrations(baseline_engine)
+
+    inspector = inspect(baseline_engine)
+    assert not inspector.has_table("half_done")
+    assert "half_done" not in {column["name"] for column in inspector.get_columns("prompts")}
+    with baseline_engine.connect() as connection:
+        assert 99 not in applied_versions(connection)
+        assert connection.execute(text("SELECT title FROM prompts")).scalar() == "Legacy"
+    assert not is_current(baseline_engine)
+
+
+def test_display_order_becomes_a_float_column(baseline_engine):
+    upgrade(baseline_engine)
+
+    columns = {column["name"]: column for column in inspect(baseline_engine).get_columns("prompts")}
+    assert isinstance(columns["display_order"]["type"], Float)
+
+    index_names = {index["name"] for index in inspect(baseline_engine).get_indexes("prompts")}
+    assert {"ix_prompts_folder_id_list_order", "ix_prompts_list_order"} <= index_names
+
+    with baseline_engine.begin() as connection:
+        assert connection.execute(text("SELECT display_order FROM prompts")).scalar() == 1
+        connection.execute(text("UPDATE prompts SET display_order = 1.25"))
+        assert connection.execute(text("SELECT display_order FROM prompts")).scalar() == 1.25
+
+
+def test_tag_names_become_unbounded(baseline_engine):
+    if baseline_engine.dialect.name != "postgresql":
+        pytest.skip("SQLite does not enforce VARCHAR lengths")
+    upgrade(baseline_engine)
+    # A database tagged before migration 018
+    with baseline_engine.begin() as connection:
+        connection.execute(text("ALTER TABLE tags ALTER COLUMN name TYPE VARCHAR(100)"))
+        connection.execute(schema_version.delete().where(schema_version.c.version == 18))
+
+    assert upgrade(baseline_engine) == [18]
+
+    with baseline_engine.begin() as connection:
+        connection.execute(text("INSERT INTO tags (name) VALUES (:name)"), {"name": "t" * 300})
@@ -0,0 +1,202 @@
+"""
+Ordering tests: fractional order keys for prompts within a folder, and the
+single-statement renumbering of folders and easy access prompts.
+"""
+import math
+import random
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.ordering import ORDER_KEY_STEP, REBALANCE_GAP, key_between, needs_rebalance
+from app.db.models import Folder, Prompt
+from app.db.repositories.folder_repository import FolderRepository
+from app.main import app
+from app.services.folder_service import FolderService
+from app.services.prompt_service import PromptService
+
+
+def move(order, prompt_id, position):
+    """Expected list order after moving prompt_id to position."""
+    order = [pid for pid in order if pid != prompt_id]
+    order.insert(min(position, len(order)), prompt_id)
+    return order
+
+
+def captured_updates(engine, call, table: str) -> List[str]:
+    """Run call() and return the UPDATE statements it executed on table."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(f"UPDATE {table.upper()} "):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+@pytest.mark.parametrize("before, after, expected", [
+    (None, None, ORDER_KEY_STEP),
+    (None, 3.0, 3.0 - ORDER_KEY_STEP),
+    (3.0, None, 3.0 + ORDER_KEY_STEP),
+    (1.0, 2.0, 1.5),
+    (-1.0, 0.0, -0.5),
+    (1.0, math.nextafter(1.0, 2.0), None),
+])
+def test_key_between(before, after, expected):
+    assert key_between(before, after) == expected
+
+
+@pytest.mark.parametrize("before, after, expected", [
+    (None, 1.0, False),
+    (1.0, None, False),
+    (1.0, 2.0, False),
+    (1.0, 1.0 + REBALANCE_GAP, False),
+    (1.0, 1.0 + REBALANCE_GAP / 2, True),
+])
+def test_needs_rebalance(before, after, expected):
+    assert needs_rebalance(before, after) is expected
+
+
+def test_reorder_matches_list_semantics(db, make_folder, make_prompt):
+    folder = make_folder("Ordered")
+    order = [make_prompt(folder.id, f"p{i}").id for i in range(6)]
+    service = PromptService(db)
+    moves = random.Random(11)
+
+    for _ in range(40):
+        prompt_id = moves.choice(order)
+        position = moves.randrange(8)
+        prompts, _ = service.reorder_prompts(prompt_id, position, folder.id)
+        order = move(order, prompt_id, position)
+        assert [prompt.id for prompt in prompts] == order
+
+
+def test_reorder_to_current_position_writes_nothing(db, make_folder, make_prompt):
+    folder = make_folder("Ordered")
+    prompts = [make_prompt(folder.id, f"p{i}") for i in range(3)]
+    keys = [prompt.display_order for prompt in prompts]
+
+    result, rebalance_needed = PromptService(db).reorder_prompts(prompts[1].id, 1, folder.id)
+
+    assert [prompt.display_order for prompt in result] == keys
+    assert not rebalance_needed
+
+
+def test_reorder_keys_legacy_prompts_first(db, make_folder, make_prompt):
+    folder = make_folder("Legacy")
+    keyed = make_prompt(folder.id, "keyed")
+    unkeyed = [make_prompt(folder.id, f"legacy {i}", display_order=None) for i in range(3)]
+    expected = [keyed.id] + [prompt.id for prompt in reversed(unkeyed)]
+
+    prompts, _ = PromptService(db).reorder_prompts(keyed.id, 2, folder.id)
+
+    assert [prompt.id for prompt in prompts] == move(expected, keyed.id, 2)
+    assert db.query(Prompt).filter(Prompt.display_order.is_(None)).count() == 0
+
+
+def test_reorder_into_a_narrowing_gap_requests_rebalance(db, make_folder, make_prompt):
+    folder = make_folder("Ordered")
+    order = [make_prompt(folder.id, f"p{i}").id for i in range(3)]
+    service = PromptService(db)
+
+    # Each move halves the gap after the first prompt
+    for moves in range(1, 40):
+        prompts, rebalance_needed = service.reorder_prompts(order[-1], 1, folder.id)
+        order = move(order, order[-1], 1)
+        assert [prompt.id for prompt in prompts] == order
+        if rebalance_needed:
+            break
+    assert rebalance_needed
+    assert moves > 10
+
+    service.repo.rebalance_display_order(folder.id)
+    prompts, _ = service.repo.get_all(folder_id=folder.id, limit=None)
+    assert [prompt.id for prompt in prompts] == order
+    assert [prompt.display_order for prompt in prompts] == [1.0, 2.0, 3.0]
+
+
+def test_reorder_without_a_gap_rebalances_first(db, make_folder, make_prompt):
+    folder = make_folder("Ordered")
+    first = make_prompt(folder.id, "first", display_order=1.0)
+    second = make_prompt(folder.id, "second", display_order=math.nextafter(1.0, 2.0))
+    third = make_prompt(folder.id, "third", display_order=5.0)
+
+    prompts, rebalance_needed = PromptService(db).reorder_prompts(third.id, 1, folder.id)
+
+    assert [prompt.id for prompt in prompts] == [first.id, third.id, second.id]
+    assert [prompt.display_order for prompt in prompts] == [1.0, 1.5, 2.0]
+    assert not rebalance_needed
+
+
+def test_reorder_endpoint_rebalances_in_the_background(app_db):
+    folder_id = FolderService(app_db).create_folder("Ordered", None).id
+    service = PromptService(app_db)
+    prompts = [service.create_prompt(folder_id, f"p{i}", "Content") for i in range(3)]
+    # The first two keys are closer than REBALANCE_GAP, but still have a midpoint
+    for prompt, key in zip(prompts, [1.0, 1.0 + REBALANCE_GAP / 4, 2.0]):
+        prompt.display_order = key
+    ids = [prompt.id for prompt in prompts]
+    app_db.commit()
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/prompts/reorder",
+            json={"prompt_id": ids[2], "new_position": 1, "folder_id": folder_id}
+        )
+
+    assert response.status_code == 200
+    expected = [ids[0], ids[2], ids[1]]
+    assert [prompt["id"] for prompt in response.json()["prompts"]] == expected
+    # TestClient runs background tasks before returning the response
+    app_db.expire_all()
+    keys = app_db.query(Prompt.id, Prompt.display_order).filter(Prompt.folder_id == folder_id)
+    assert sorted(keys, key=lambda row: row.display_order) == [
+        (prompt_id, (i + 1) * ORDER_KEY_STEP) for i, prompt_id in enumerate(expected)
+    ]
+
+
+def test_folder_reorder_renumbers_in_one_update(db, db_engine, make_folder):
+    parent = make_folder("Parent")
+    order = [make_folder(f"f{i}", parent.id).id for i in range(4)]
+    for position, folder_id in enumerate(order):
+        db.query(Folder).filter(Folder.id == folder_id).update({"display_order": position})
+    db.commit()
+    service = FolderService(db)
+    result = []
+
+    updates = captured_updates(
+        db_engine, lambda: result.extend(service.reorder_folders(order[3], 1, parent.id)), "folders"
+    )
+
+    expected = move(order, order[3], 1)
+    assert [folder.id for folder in result] == expected
+    stored = FolderRepository(db).get_by_parent_id(parent.id)
+    assert [(folder.id, folder.display_order) for folder in stored] == list(zip(expected, range(4)))
+    assert len(updates) == 1
+
+
+def test_easy_access_reorder_renumbers_in_one_update(db, db_engine, make_folder, make_prompt):
+    folder = make_folder("Easy")
+    order = [
+        make_prompt(folder.id, f"p{i}", is_easy_access=True, easy_access_order=i + 1).id
+        for i in range(4)
+    ]
+    service = PromptService(db)
+    result = []
+
+    updates = captured_updates(
+        db_engine, lambda: result.extend(service.reorder_easy_access_prompts(order[0], 2)), "prompts"
+    )
+
+    expected = move(order, order[0], 2)
+    assert [prompt.id for prompt in result] == expected
+    stored = service.get_easy_access_prompts()
+    assert [(prompt.id, prompt.easy_access_order) for prompt in stored] == list(zip(expected, range(1, 5)))
+    assert len(updates) == 1
@@ -0,0 +1,139 @@
+"""
+Keyset cursor pagination tests, run against every backend in conftest.BACKENDS,
+and the list routes' summary view.
+"""
+import re
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.exceptions import InvalidCursorException
+from app.core.pagination import encode_cursor
+from app.db.models import Prompt
+from app.db.repositories.prompt_repository import PromptRepository
+from app.main import app
+from app.services.prompt_service import PromptService
+
+SAME_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+# A column reference to the prompt's content in a SELECT
+CONTENT_COLUMN = re.compile(r"prompts\.(original_)?content\b")
+
+
+def walk_list(service, folder_id, limit):
+    """Collect prompt IDs page by page until next_cursor runs out."""
+    seen = []
+    cursor = None
+    while True:
+        prompts, _, cursor = service.get_prompts(folder_id, limit=limit, cursor=cursor, include_total=False)
+        seen.extend(prompt.id for prompt in prompts)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_list_pages_cover_every_prompt_once(db, make_folder, make_prompt, limit):
+    folder = make_folder("Paged")
+    # Ties on display_order, on created_at, and both, keyed and unkeyed
+    for display_order in [1.0, 1.0, 1.0, 2.0, None, None, None, 0.5]:
+        make_prompt(folder.id, "p", display_order=display_order, created_at=SAME_TIME)
+    make_prompt(folder.id, "later", display_order=1.0)
+    make_prompt(folder.id, "later unkeyed", display_order=None)
+    service = PromptService(db)
+
+    expected, _ = PromptRepository(db).get_all(folder_id=folder.id)
+    seen = walk_list(service, folder.id, limit)
+
+    assert seen == [prompt.id for prompt in expected]
+    assert len(set(seen)) == 10
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_search_pages_cover_every_match_once(db, make_folder, make_prompt, limit):
+    folder = make_folder("Paged")
+    for i in range(7):
+        make_prompt(folder.id, f"match {i}", updated_at=SAME_TIME if i < 5 else datetime(2024, 2, i))
+    make_prompt(folder.id, "unrelated", "nothing")
+    service = PromptService(db)
+
+    seen = []
+    cursor = None
+    while True:
+        hits, _, cursor = service.search_prompts("match", limit=limit, sort="updated", cursor=cursor)
+        seen.extend(hit["prompt"].id for hit in hits)
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+BAD_LIST_CURSORS = [
+    "not base64!",
+    encode_cursor([1.0, SAME_TIME]),
+    encode_cursor(["x", SAME_TIME, 1]),
+    encode_cursor([True, SAME_TIME, 1]),
+    encode_cursor([1.0, "yesterday", 1]),
+    encode_cursor([1.0, SAME_TIME, "1"]),
+    encode_cursor([1.0, SAME_TIME, 1.5]),
+    encode_cursor([1.0, SAME_TIME, None]),
+    encode_cursor([1.0, SAME_TIME, [1]]),
+]
+
+
+@pytest.mark.parametrize("cursor", BAD_LIST_CURSORS)
+def test_malformed_list_cursor_is_rejected(db, make_folder, cursor):
+    folder = make_folder("Paged")
+    with pytest.raises(InvalidCursorException):
+        PromptService(db).get_prompts(folder.id, cursor=cursor)
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor([SAME_TIME, "1"]), encode_cursor([1, 1])])
+def test_malformed_search_cursor_is_rejected(db, cursor):
+    with pytest.raises(InvalidCursorException):
+        PromptService(db).search_prompts("match", sort="updated", cursor=cursor)
+
+
+def test_malformed_cursor_is_a_bad_request():
+    with TestClient(app) as client:
+        response = client.get("/api/prompts", params={"cursor": encode_cursor(["x", SAME_TIME, {}])})
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+def get_prompts(client, path: str, view: str):
+    """GET a prompt list route; return its prompts and the SQL statements it ran."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Every engine, sync or async, read or write
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(path, params={"view": view})
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+    assert response.status_code == 200
+    return response.json()["prompts"], statements
+
+
+@pytest.mark.parametrize("path", ["/api/prompts", "/api/prompts/easy-access/list"])
+def test_summary_view_does_not_load_content(app_db, app_prompt_id, path):
+    app_db.query(Prompt).filter(Prompt.id == app_prompt_id).update({"is_easy_access": True, "easy_access_order": 1})
+    app_db.commit()
+
+    with TestClient(app) as client:
+        summaries, summary_statements = get_prompts(client, path, "summary")
+        prompts, full_statements = get_prompts(client, path, "full")
+
+    assert [(summary["id"], summary["title"]) for summary in summaries] == [(app_prompt_id, "Prompt")]
+    assert not {"content", "original_content", "versions"} & set(summaries[0])
+    assert not any(CONTENT_COLUMN.search(statement) for statement in summary_statements)
+
+    assert prompts[0]["content"] == "Original"
+    assert any(CONTENT_COLUMN.search(statement) for statement in full_statements)
@@ -0,0 +1,142 @@
+"""
+Query plan regression tests.
+
+Each hot repository query runs against a database of each backend; the SQL
+it emits is captured and EXPLAINed. Every plan must be driven by the
+expected index and must neither scan a table without an index nor sort
+(SQLite: temp B-tree, PostgreSQL: Sort node). On PostgreSQL, sequential
+scans, bitmap scans and sorts are disabled for the EXPLAIN so the planner
+picks an index-ordered plan whenever one exists; a remaining Sort or Seq
+Scan node means no index can serve the query. The tables are ANALYZEd
+first, with prompts spread over several folders, so the planner's choice
+between indexes follows the data rather than breaking ties arbitrarily.
+"""
+from typing import List
+
+import pytest
+from sqlalchemy import event
+
+from app.db.models import Prompt, Version
+from app.db.repositories.folder_repository import FolderRepository
+from app.db.repositories.prompt_repository import PromptRepository
+
+# (label, repository call given (db, folder_id, prompt_id), index that must drive it)
+CHECKS = [
+    ("prompt list in folder",
+     lambda db, folder_id, prompt_id: PromptRepository(db).get_all(folder_id=folder_id, limit=50),
+     "ix_prompts_folder_id_list_order"),
+    ("prompt list, all folders",
+     lambda db, folder_id, prompt_id: PromptRepository(db).get_all(limit=50, with_total=False),
+     "ix_prompts_list_order"),
+    ("folder order keys",
+     lambda db, folder_id, prompt_id: PromptRepository(db).get_order_keys(folder_id),
+     "ix_prompts_folder_id_list_order"),
+    ("order key at position",
+     lambda db, folder_id, prompt_id: PromptRepository(db).get_order_key_at(folder_id, 3, exclude_id=prompt_id),
+     "ix_prompts_folder_id_list_order"),
+    ("preceding order key",
+     lambda db, folder_id, prompt_id: PromptRepository(db).get_order_key_before(folder_id, 2.0, exclude_id=prompt_id),
+     "ix_prompts_folder_id_list_order"),
+    ("unkeyed prompt check",
+     lambda db, folder_id, prompt_id: PromptRepository(db).has_unkeyed_prompts(folder_id),
+     "ix_prompts_folder_id_list_order"),
+    ("next display_order",
+     lambda db, folder_id, prompt_id: PromptRepository(db).get_max_display_order(folder_id),
+     "ix_prompts_folder_id_list_order"),
+    ("prompt counts per folder",
+     lambda db, folder_id, prompt_id: PromptRepository(db).count_by_folder(),
+     "ix_prompts_folder_id_list_order"),
+    ("easy access list",
+     lambda db, folder_id, prompt_id: PromptRepository(db).get_easy_access_prompts(),
+     "ix_prompts_easy_access_order_title"),
+    ("easy access count",
+     lambda db, folder_id, prompt_id: PromptRepository(db).count_easy_access(),
+     "ix_prompts_easy_access_order_title"),
+    ("folder children",
+     lambda db, folder_id, prompt_id: FolderRepository(db).get_by_parent_id(folder_id),
+     "ix_folders_parent_id_display_order"),
+    ("version count",
+     lambda db, folder_id, prompt_id: PromptRepository(db).get_version_count(prompt_id),
+     "ix_versions_prompt_id_version_number"),
+    ("version history",
+     lambda db, folder_id, prompt_id: (db.expire_all(), PromptRepository(db).get_by_id(prompt_id).versions),
+     "ix_versions_prompt_id_version_number"),
+]
+
+# Data spread over folders, so the planner statistics favour per-folder indexes
+OTHER_FOLDERS = 10
+PROMPTS_PER_OTHER_FOLDER = 30
+
+# Planner settings for the PostgreSQL EXPLAIN (see module docstring)
+POSTGRES_PLANNER_SETTINGS = ("enable_seqscan", "enable_bitmapscan", "enable_sort")
+
+
+def plan_problems(plan: List[str]) -> List[str]:
+    """Return the full table scans and sorts in one query plan."""
+    problems = []
+    for detail in plan:
+        if "TEMP B-TREE" in detail:
+            problems.append(f"sorts with a temp B-tree: {detail}")
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            problems.append(f"full table scan: {detail}")
+        if detail.startswith("Sort ") or detail.startswith("Incremental Sort "):
+            problems.append(f"sorts: {detail}")
+        if detail.startswith("Seq Scan "):
+            problems.append(f"full table scan: {detail}")
+    return problems
+
+
+def explain(connection, statement: str, parameters) -> List[str]:
+    """Get the plan of one statement as a list of node descriptions."""
+    if connection.dialect.name == "postgresql":
+        rows = connection.exec_driver_sql(f"EXPLAIN (COSTS OFF) {statement}", parameters)
+        return [row[0].strip().lstrip("-> ").strip() for row in rows]
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[3] for row in rows]
+
+
+def capture_plans(engine, call) -> List[List[str]]:
+    """Run call() and return the plans of the SELECT statements it executed."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Fresh tables have no statistics; without them the planner
+            # breaks cost ties between indexes arbitrarily
+            connection.exec_driver_sql("ANALYZE")
+            for setting in POSTGRES_PLANNER_SETTINGS:
+                connection.exec_driver_sql(f"SET {setting} = off")
+        return [explain(connection, statement, parameters) for statement, parameters in statements]
+
+
+@pytest.mark.parametrize("label, call, expected_index", CHECKS, ids=[check[0] for check in CHECKS])
+def test_query_uses_index(db, db_engine, make_folder, make_prompt, label, call, expected_index):
+    folder = make_folder("Folder")
+    prompt = make_prompt(folder.id, "Prompt", is_easy_access=True)
+    db.add(Version(prompt_id=prompt.id, content="Content", version_number=2, created_by="user"))
+    # Other folders, so a per-folder index is clearly more selective than a global one
+    for i in range(OTHER_FOLDERS):
+        other = make_folder(f"Other {i}")
+        db.add_all(
+            Prompt(folder_id=other.id, title=f"Other {j}", content="Content", display_order=float(j))
+            for j in range(PROMPTS_PER_OTHER_FOLDER)
+        )
+    db.commit()
+
+    plans = capture_plans(db_engine, lambda: call(db, folder.id, prompt.id))
+
+    assert plans, f"{label} ran no SELECT"
+    problems = [problem for plan in plans for problem in plan_problems(plan)]
+    assert not problems, f"{label}: {problems} in {plans}"
+    assert any(expected_index in detail for plan in plans for detail in plan), \
+        f"{label} does not use {expected_index}: {plans}"
@@ -0,0 +1,166 @@
+"""
+Repository tests, run against every backend in conftest.BACKENDS.
+"""
+from datetime import datetime, timedelta
+
+from app.db import search_index
+from app.db.repositories.folder_repository import FolderRepository
+from app.db.repositories.prompt_repository import PromptRepository
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def ids(prompts):
+    return [prompt.id for prompt in prompts]
+
+
+def test_search_ranks_title_matches_first(db, make_folder, make_prompt):
+    folder = make_folder("Search")
+    in_content = make_prompt(folder.id, "Misc", "Use python for scripts")
+    in_title = make_prompt(folder.id, "Python tips", "General advice")
+    make_prompt(folder.id, "Other", "Nothing to see")
+
+    rows, total = PromptRepository(db).search("python")
+
+    assert total == 2
+    assert [prompt.id for prompt, _, _ in rows] == [in_title.id, in_content.id]
+
+
+def test_search_matches_prefixes_and_ignores_query_syntax(db, make_folder, make_prompt):
+    folder = make_folder("Search")
+    prompt = make_prompt(folder.id, "Refactoring checklist", "Steps")
+    repo = PromptRepository(db)
+
+    rows, _ = repo.search("refact")
+    assert [p.id for p, _, _ in rows] == [prompt.id]
+
+    rows, total = repo.search('"refact*) -(')
+    assert total == 1
+
+
+def test_search_returns_marked_title_and_snippet(db, make_folder, make_prompt):
+    folder = make_folder("Search")
+    make_prompt(folder.id, "Python tips", "Write small functions. Python rewards readable code.")
+
+    rows, _ = PromptRepository(db).search("python")
+    _, marked_title, marked_snippet = rows[0]
+
+    title, title_matches = search_index.parse_marked_text(marked_title)
+    assert title == "Python tips"
+    assert title_matches == [(0, 6)]
+
+    snippet, snippet_matches = search_index.parse_marked_text(marked_snippet)
+    assert "readable code" in snippet
+    assert len(snippet_matches) == 1
+    start, end = snippet_matches[0]
+    assert snippet[start:end] == "Python"
+
+
+def test_search_keyset_by_updated(db, make_folder, make_prompt):
+    folder = make_folder("Search")
+    prompts = [
+        make_prompt(folder.id, f"Note {i}", "shared word", updated_at=BASE_TIME + timedelta(minutes=i))
+        for i in range(5)
+    ]
+    repo = PromptRepository(db)
+
+    seen = []
+    after = None
+    while True:
+        rows, _ = repo.search("shared", limit=2, sort="updated", after=after, with_total=False)
+        if not rows:
+            break
+        seen.extend(prompt.id for prompt, _, _ in rows)
+        last = rows[-1][0]
+        after = (last.updated_at, last.id)
+
+    assert seen == [prompt.id for prompt in reversed(prompts)]
+
+
+def test_list_order(db, make_folder, make_prompt):
+    folder = make_folder("List")
+    unkeyed_old = make_prompt(folder.id, "a", display_order=None, created_at=BASE_TIME)
+    second = make_prompt(folder.id, "b", display_order=2.5)
+    unkeyed_new = make_prompt(folder.id, "c", display_order=None, created_at=BASE_TIME + timedelta(days=1))
+    first = make_prompt(folder.id, "d", display_order=0.5)
+
+    prompts, total = PromptRepository(db).get_all(folder_id=folder.id)
+
+    assert total == 4
+    assert ids(prompts) == [first.id, second.id, unkeyed_new.id, unkeyed_old.id]
+
+
+def test_list_keyset_continues_after_position(db, make_folder, make_prompt):
+    folder = make_folder("List")
+    for i in range(5):
+        make_prompt(folder.id, f"p{i}")
+    repo = PromptRepository(db)
+    everything, _ = repo.get_all(folder_id=folder.id)
+
+    page, _ = repo.get_all(folder_id=folder.id, limit=2)
+    last = page[-1]
+    rest, _ = repo.get_all(
+        folder_id=folder.id, after=(last.display_order, last.created_at, last.id)
+    )
+
+    assert ids(page) + ids(rest) == ids(everything)
+
+
+def test_tag_filters(db, make_folder, make_prompt):
+    folder = make_folder("Tags")
+    both = make_prompt(folder.id, "both", tags=["Alpha", "beta"])
+    alpha = make_prompt(folder.id, "alpha", tags=["alpha"])
+    gamma = make_prompt(folder.id, "gamma", tags=["gamma"])
+    repo = PromptRepository(db)
+
+    rows, _ = repo.search("", tags=["ALPHA", " beta "])
+    assert [p.id for p, _, _ in rows] == [both.id]
+
+    rows, _ = repo.search("", tags=["beta", "gamma"], match_all_tags=False)
+    assert sorted(p.id for p, _, _ in rows) == sorted([both.id, gamma.id])
+
+    rows, _ = repo.search("", tags=["alpha"])
+    assert sorted(p.id for p, _, _ in rows) == sorted([both.id, alpha.id])
+
+
+def test_long_tags_are_indexed(db, make_folder, make_prompt):
+    # Longer than the VARCHAR(100) tags.name used to allow
+    long_tag = "t" * 300
+    prompt = make_prompt(make_folder("Tags").id, "long", tags=[long_tag])
+
+    rows, _ = PromptRepository(db).search("", tags=[long_tag.upper()])
+    assert [p.id for p, _, _ in rows] == [prompt.id]
+
+
+def test_search_facets(db, make_folder, make_prompt):
+    first = make_folder("First")
+    second = make_folder("Second")
+    make_prompt(first.id, "one", "match", tags=["x", "y"], created_at=datetime(2024, 1, 5))
+    make_prompt(first.id, "two", "match", tags=["x"], created_at=datetime(2024, 2, 5))
+    make_prompt(second.id, "three", "match", created_at=datetime(2024, 2, 6))
+    make_prompt(second.id, "four", "other", tags=["x"], created_at=datetime(2024, 3, 1))
+
+    facets = PromptRepository(db).get_search_facets("match")
+
+    assert sorted(facets["folder"]) == sorted([(str(first.id), 2), (str(second.id), 1)])
+    assert sorted(facets["tag"]) == [("x", 2), ("y", 1)]
+    assert sorted(facets["date"]) == [("2024-01", 1), ("2024-02", 2)]
+
+
+def test_folder_subtree_queries(db, make_folder, make_prompt):
+    top = make_folder("Top")
+    child = make_folder("Child", top.id)
+    grandchild = make_folder("Grandchild", child.id)
+    other = make_folder("Other")
+    in_top = make_prompt(top.id, "top")
+    in_grandchild = make_prompt(grandchild.id, "deep")
+    make_prompt(other.id, "outside")
+    folders = FolderRepository(db)
+
+    assert sorted(folders.get_subtree_ids(top.id)) == sorted([top.id, child.id, grandchild.id])
+    assert folders.get_subtree_ids(grandchild.id) == [grandchild.id]
+    assert folders.is_descendant(grandchild.id, top.id)
+    assert not folders.is_descendant(top.id, grandchild.id)
+    assert not folders.is_descendant(other.id, top.id)
+    assert sorted(ids(PromptRepository(db).get_in_subtree(top.id))) == sorted([in_top.id, in_grandchild.id])
+    assert ids(PromptRepository(db).get_in_subtree(child.id)) == [in_grandchild.id]
@@ -0,0 +1,99 @@
+"""
+Full-text search index tests, run against every backend in conftest.BACKENDS.
+
+SQLite keeps prompts_fts in sync with triggers; PostgreSQL derives the
+tsvector column from the row. Either way a search must see exactly the
+current title, description, content and tags of every prompt.
+"""
+import pytest
+from sqlalchemy import text
+
+from app.db import search_index
+from app.db.repositories.prompt_repository import PromptRepository
+from app.db.search_index import FTS_TABLE, MATCH_END, MATCH_START, SNIPPET_ELLIPSIS
+from app.services.prompt_service import PromptService
+
+
+def found(db, query):
+    """IDs of the prompts a search finds."""
+    rows, _ = PromptRepository(db).search(query)
+    return [prompt.id for prompt, _, _ in rows]
+
+
+def check_fts_table(db, dialect, deleted_term=None):
+    """SQLite: the FTS index matches its content table and holds no entries for deleted_term."""
+    if dialect != "sqlite":
+        return
+    db.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)"))
+    if deleted_term is not None:
+        stale = db.execute(
+            text(f"SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :term"), {"term": deleted_term}
+        ).scalar()
+        assert stale == 0
+    db.commit()
+
+
+def test_index_follows_insert_update_delete(db, dialect, make_folder, make_prompt):
+    folder = make_folder("Search")
+    prompt = make_prompt(folder.id, "Alpha", "zebra stripes", tags=["savanna"], description="striped")
+    other = make_prompt(folder.id, "Other", "zebra crossing")
+    service = PromptService(db)
+
+    assert found(db, "alpha") == [prompt.id]
+    assert sorted(found(db, "zebra")) == sorted([prompt.id, other.id])
+    assert found(db, "savanna") == [prompt.id]
+    assert found(db, "striped") == [prompt.id]
+    check_fts_table(db, dialect)
+
+    service.update_prompt(prompt.id, title="Beta", description="spotted", content="giraffe neck", tags=["desert"])
+
+    for old_term in ("alpha", "savanna", "striped"):
+        assert found(db, old_term) == []
+    assert found(db, "zebra") == [other.id]
+    for new_term in ("beta", "giraffe", "desert", "spotted"):
+        assert found(db, new_term) == [prompt.id]
+    check_fts_table(db, dialect)
+
+    service.delete_prompt(prompt.id)
+
+    assert found(db, "giraffe") == []
+    assert found(db, "zebra") == [other.id]
+    check_fts_table(db, dialect, deleted_term="giraffe")
+
+
+def marked(value):
+    """Turn [..] in a test string into the match markers."""
+    return value.replace("[", MATCH_START).replace("]", MATCH_END)
+
+
+@pytest.mark.parametrize("value, expected_text, expected_matches", [
+    ("no matches", "no matches", []),
+    ("[Café] au lait, [café]", "Café au lait, café", [(0, 4), (14, 18)]),
+    ("[a][b] c", "ab c", [(0, 1), (1, 2)]),
+    ("empty [] marker", "empty  marker", []),
+])
+def test_parse_marked_text_offsets(value, expected_text, expected_matches):
+    assert search_index.parse_marked_text(marked(value)) == (expected_text, expected_matches)
+
+
+def test_search_offsets_cover_every_match(db, make_folder, make_prompt):
+    folder = make_folder("Search")
+    make_prompt(folder.id, "Python and Rust tips", "Python first. Then more python, and PYTHON at the end.")
+
+    rows, _ = PromptRepository(db).search("python rust")
+    _, marked_title, marked_snippet = rows[0]
+
+    title, title_matches = search_index.parse_marked_text(marked_title)
+    assert [title[start:end] for start, end in title_matches] == ["Python", "Rust"]
+
+    snippet, snippet_matches = search_index.parse_marked_text(marked_snippet)
+    assert [snippet[start:end] for start, end in snippet_matches] == ["Python", "python", "PYTHON"]
+
+
+def test_fallback_snippet_offsets():
+    content = "x" * 200 + " needle " + "y" * 30 + " Needle " + "z" * 200
+
+    snippet, matches = search_index.build_snippet(content, ["needle"], max_length=100)
+
+    assert snippet.startswith(SNIPPET_ELLIPSIS) and snippet.endswith(SNIPPET_ELLIPSIS)
+    assert [snippet[start:end] for start, end in matches] == ["needle", "Needle"]
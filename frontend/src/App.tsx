@@ -6,7 +6,7 @@ import { EnhanceCompareModal } from './components/EnhanceCompareModal'
 import { useKeyboardShortcuts } from './hooks/useKeyboardShortcuts'
 import { promptApi } from './services'
 import { hasVariables } from './utils/variables'
-import type { Prompt } from './types/api'
+import type { Prompt, PromptSearchResult } from './types/api'
 
 function App() {
   // Zustand stores
@@ -16,7 +16,7 @@ function App() {
 
   // Search state
   const [searchQuery, setSearchQuery] = useState('')
-  const [searchResults, setSearchResults] = useState<Prompt[]>([])
+  const [searchResults, setSearchResults] = useState<PromptSearchResult[]>([])
   const [searchTotal, setSearchTotal] = useState(0)
   const [isSearching, setIsSearching] = useState(false)
 
@@ -318,7 +318,7 @@ function App() {
   }
 
   // Handle selecting a search result
-  const handleSearchResultSelect = (prompt: Prompt) => {
+  const handleSearchResultSelect = (prompt: PromptSearchResult) => {
     openEditModal(prompt.id)
   }
 
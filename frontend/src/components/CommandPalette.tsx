@@ -1,7 +1,7 @@
 import { useState, useEffect, useRef } from 'react';
 import { useFolderStore, usePromptStore, useUIStore } from '@/store';
 import { promptApi } from '@/services';
-import type { Prompt } from '@/types/api';
+import type { PromptSearchResult } from '@/types/api';
 import './CommandPalette.css';
 
 interface CommandPaletteProps {
@@ -76,7 +76,7 @@ export function CommandPalette({ isOpen, onClose }: CommandPaletteProps) {
     if (searchQuery.trim()) {
       const result = await promptApi.search(searchQuery, { limit: 10 });
       if (result.data) {
-        result.data.prompts.forEach((prompt: Prompt) => {
+        result.data.prompts.forEach((prompt: PromptSearchResult) => {
           const folder = getFolderById(prompt.folder_id);
           allCommands.push({
             id: `prompt-${prompt.id}`,
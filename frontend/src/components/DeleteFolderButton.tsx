@@ -1,6 +1,6 @@
 import { useState } from 'react';
 import { useFolderStore, useUIStore } from '@/store';
-import { promptApi } from '@/services';
+import { folderApi } from '@/services';
 import { ConfirmDialog } from './ConfirmDialog';
 import type { Folder } from '@/types/api';
 import './DeleteFolderButton.css';
@@ -30,31 +30,26 @@ export function DeleteFolderButton() {
     return count;
   };
 
-  // Recursively get all folder IDs including the folder itself
-  const getAllFolderIds = (folder: Folder): number[] => {
-    const ids = [folder.id];
-    if (folder.children) {
-      for (const child of folder.children) {
-        ids.push(...getAllFolderIds(child));
-      }
+  // Find a folder in a tree by ID
+  const findFolder = (tree: Folder[], id: number): Folder | null => {
+    for (const folder of tree) {
+      if (folder.id === id) return folder;
+      const found = findFolder(folder.children || [], id);
+      if (found) return found;
     }
-    return ids;
+    return null;
   };
 
-  // Count all prompts in a folder and its subfolders
+  // Count all prompts in a folder and its subfolders (one tree request with counts)
   const countPrompts = async (folder: Folder): Promise<number> => {
-    const folderIds = getAllFolderIds(folder);
-    let totalPrompts = 0;
-
-    // Fetch prompts for each folder
-    for (const folderId of folderIds) {
-      const result = await promptApi.list({ folder_id: folderId, limit: 1000 });
-      if (result.data) {
-        totalPrompts += result.data.total;
-      }
+    const result = await folderApi.getTree(true);
+    if (result.error) {
+      throw new Error(result.error.message);
     }
 
-    return totalPrompts;
+    // The endpoint responds with { folders: [...] }
+    const tree = (result.data as unknown as { folders: Folder[] })?.folders || [];
+    return findFolder(tree, folder.id)?.subtree_prompt_count ?? 0;
   };
 
   const handleDeleteClick = async () => {
@@ -1,13 +1,13 @@
-import { Prompt } from '@/types/api';
+import { PromptSearchResult } from '@/types/api';
 import { useFolderStore, useUIStore } from '@/store';
-import { highlightText, getSearchContext } from '@/utils/highlightText';
+import { highlightText, highlightRanges } from '@/utils/highlightText';
 import './SearchResults.css';
 
 interface SearchResultsProps {
-  prompts: Prompt[];
+  prompts: PromptSearchResult[];
   query: string;
   total: number;
-  onSelect: (prompt: Prompt) => void;
+  onSelect: (prompt: PromptSearchResult) => void;
 }
 
 export function SearchResults({ prompts, query, total, onSelect }: SearchResultsProps) {
@@ -36,8 +36,6 @@ export function SearchResults({ prompts, query, total, onSelect }: SearchResults
 
       <div className="search-results-list">
         {prompts.map((prompt) => {
-          const contentSnippet = getSearchContext(prompt.content, query, 60);
-
           return (
             <div
               key={prompt.id}
@@ -45,11 +43,11 @@ export function SearchResults({ prompts, query, total, onSelect }: SearchResults
               onClick={() => onSelect(prompt)}
             >
               <div className="result-title">
-                {highlightText(prompt.title, query)}
+                {highlightRanges(prompt.title, prompt.title_matches)}
               </div>
 
               <div className="result-snippet">
-                {highlightText(contentSnippet, query)}
+                {highlightRanges(prompt.snippet, prompt.snippet_matches)}
               </div>
 
               <div className="result-meta">
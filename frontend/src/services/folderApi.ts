@@ -14,10 +14,11 @@ import type {
 export const folderApi = {
   /**
    * Get complete folder tree
+   * @param includeCounts - Add prompt_count and subtree_prompt_count to every folder
    * @returns Hierarchical folder structure
    */
-  async getTree(): Promise<ApiResponse<Folder[]>> {
-    return api.get<Folder[]>('/api/folders');
+  async getTree(includeCounts = false): Promise<ApiResponse<Folder[]>> {
+    return api.get<Folder[]>(includeCounts ? '/api/folders?include_counts=true' : '/api/folders');
   },
 
   /**
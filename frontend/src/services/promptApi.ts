@@ -7,6 +7,7 @@ import type {
   PromptReorder,
   PromptListResponse,
   PromptListParams,
+  PromptSearchResponse,
   ApiResponse,
 } from '@/types/api';
 
@@ -17,7 +18,7 @@ import type {
 export const promptApi = {
   /**
    * List prompts with optional filtering and pagination
-   * @param params - Query parameters (folder_id, limit, offset, search)
+   * @param params - Query parameters (folder_id, limit, offset, cursor, search, view)
    * @returns Paginated list of prompts
    */
   async list(params?: PromptListParams): Promise<ApiResponse<PromptListResponse>> {
@@ -32,9 +33,15 @@ export const promptApi = {
     if (params?.offset !== undefined) {
       queryParams.append('offset', params.offset.toString());
     }
+    if (params?.cursor) {
+      queryParams.append('cursor', params.cursor);
+    }
     if (params?.search) {
       queryParams.append('search', params.search);
     }
+    if (params?.view) {
+      queryParams.append('view', params.view);
+    }
 
     const queryString = queryParams.toString();
     const url = queryString ? `/api/prompts?${queryString}` : '/api/prompts';
@@ -128,9 +135,9 @@ export const promptApi = {
    * Search prompts by query string
    * @param query - Search query
    * @param params - Optional filters (folder_id, tags, limit, offset)
-   * @returns Matching prompts
+   * @returns Matching prompts with snippets and match offsets (no full content)
    */
-  async search(query: string, params?: Omit<PromptListParams, 'search'>): Promise<ApiResponse<PromptListResponse>> {
+  async search(query: string, params?: Omit<PromptListParams, 'search'>): Promise<ApiResponse<PromptSearchResponse>> {
     const queryParams = new URLSearchParams();
     queryParams.append('q', query);
 
@@ -144,7 +151,7 @@ export const promptApi = {
       queryParams.append('offset', params.offset.toString());
     }
 
-    return api.get<PromptListResponse>(`/api/prompts/search?${queryParams.toString()}`);
+    return api.get<PromptSearchResponse>(`/api/prompts/search?${queryParams.toString()}`);
   },
 
   /**
@@ -9,6 +9,9 @@ export interface Folder {
   created_at: string;
   updated_at: string;
   children?: Folder[];
+  // Only present when the tree is requested with include_counts
+  prompt_count?: number;
+  subtree_prompt_count?: number;
 }
 
 export interface FolderCreate {
@@ -71,6 +74,34 @@ export interface PromptListResponse {
   total: number;
   limit: number;
   offset: number;
+  next_cursor?: string | null;
+}
+
+// Search types
+// Match offsets are [start, end) character positions (Unicode code points)
+export type MatchRange = [number, number];
+
+export interface PromptSearchResult {
+  id: number;
+  folder_id: number;
+  title: string;
+  description?: string | null;
+  tags: string[];
+  is_ai_enhanced: boolean;
+  is_easy_access: boolean;
+  created_at: string;
+  updated_at: string;
+  snippet: string;
+  title_matches: MatchRange[];
+  snippet_matches: MatchRange[];
+}
+
+export interface PromptSearchResponse {
+  prompts: PromptSearchResult[];
+  total: number;
+  limit: number;
+  offset: number;
+  next_cursor?: string | null;
 }
 
 // Version types
@@ -99,5 +130,7 @@ export interface PromptListParams {
   folder_id?: number;
   limit?: number;
   offset?: number;
+  cursor?: string;
   search?: string;
+  view?: 'full' | 'summary';
 }
@@ -1,4 +1,12 @@
 import React from 'react';
+import type { MatchRange } from '@/types/api';
+
+const MARK_STYLE: React.CSSProperties = {
+  backgroundColor: '#ffeb3b',
+  padding: '0 2px',
+  borderRadius: '2px',
+  fontWeight: 500,
+};
 
 /**
  * Highlight search terms in text
@@ -24,15 +32,7 @@ export function highlightText(text: string, query: string): React.ReactNode {
     // If part matches query (case-insensitive), highlight it
     if (part.toLowerCase() === query.toLowerCase()) {
       return (
-        <mark
-          key={index}
-          style={{
-            backgroundColor: '#ffeb3b',
-            padding: '0 2px',
-            borderRadius: '2px',
-            fontWeight: 500,
-          }}
-        >
+        <mark key={index} style={MARK_STYLE}>
           {part}
         </mark>
       );
@@ -41,6 +41,44 @@ export function highlightText(text: string, query: string): React.ReactNode {
   });
 }
 
+/**
+ * Highlight ranges that the server already located (search match offsets)
+ * @param text - Text the offsets refer to
+ * @param matches - [start, end) code point offsets of matches, in order
+ * @returns React elements with highlighted matches
+ */
+export function highlightRanges(text: string, matches: MatchRange[]): React.ReactNode {
+  if (!matches.length) {
+    return text;
+  }
+
+  // Offsets are code points, so index by code point rather than UTF-16 unit
+  const chars = Array.from(text);
+  const nodes: React.ReactNode[] = [];
+  let cursor = 0;
+
+  matches.forEach(([start, end], index) => {
+    if (start < cursor) {
+      return;
+    }
+    if (start > cursor) {
+      nodes.push(<React.Fragment key={`t${index}`}>{chars.slice(cursor, start).join('')}</React.Fragment>);
+    }
+    nodes.push(
+      <mark key={`m${index}`} style={MARK_STYLE}>
+        {chars.slice(start, end).join('')}
+      </mark>
+    );
+    cursor = end;
+  });
+
+  if (cursor < chars.length) {
+    nodes.push(<React.Fragment key="rest">{chars.slice(cursor).join('')}</React.Fragment>);
+  }
+
+  return nodes;
+}
+
 /**
  * Truncate text and add ellipsis
  * @param text - Text to truncate
@@ -53,38 +91,3 @@ export function truncateText(text: string, maxLength: number): string {
   }
   return text.substring(0, maxLength) + '...';
 }
-
-/**
- * Get context around search match (like Google search results)
- * @param text - Full text
- * @param query - Search query
- * @param contextLength - Number of characters to show on each side
- * @returns Text snippet with context
- */
-export function getSearchContext(
-  text: string,
-  query: string,
-  contextLength: number = 50
-): string {
-  if (!query.trim()) {
-    return truncateText(text, contextLength * 2);
-  }
-
-  const lowerText = text.toLowerCase();
-  const lowerQuery = query.toLowerCase();
-  const index = lowerText.indexOf(lowerQuery);
-
-  if (index === -1) {
-    return truncateText(text, contextLength * 2);
-  }
-
-  const start = Math.max(0, index - contextLength);
-  const end = Math.min(text.length, index + query.length + contextLength);
-
-  let snippet = text.substring(start, end);
-
-  if (start > 0) snippet = '...' + snippet;
-  if (end < text.length) snippet = snippet + '...';
-
-  return snippet;
-}